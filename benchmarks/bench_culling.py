@@ -0,0 +1,171 @@
+"""Compares ways of culling a region's tile layers while the camera moves.
+
+Run with:
+
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_culling
+
+A screen-sized view is panned across each region at the player's walking speed. The
+tile layers are culled either tile by tile, with every tile kept in a spatial grid, or
+in chunks of tiles that are drawn whole. For each, the time spent working out what to
+draw, the time spent drawing, and the number of sprites and sprite lists drawn per frame
+are reported.
+
+Drawing needs an OpenGL context; without one only the culling is timed.
+"""
+
+import argparse
+import time
+from typing import (
+    List,
+    Optional,
+)
+
+import arcade
+
+from benchmarks import bench_regions
+from engine import core
+from engine.model import (
+    culling,
+    region_cache,
+    spatial,
+    tile_chunks,
+    world,
+)
+from game import main as game_main
+
+DEFAULT_REGIONS = ["Region1", "Region2"]
+DEFAULT_FRAMES = 600
+FRAME_SECS = 1 / 60
+
+
+def _view_path(width: float, height: float, frames: int) -> List[spatial.Rect]:
+    """Pans a screen-sized view back and forth across a map, diagonally."""
+    step = world.PLAYER_MOVEMENT_SPEED * FRAME_SECS
+    span_x = max(width - core.SCREEN_WIDTH, 0.0)
+    span_y = max(height - core.SCREEN_HEIGHT, 0.0)
+
+    views = []
+    for frame in range(frames):
+        distance = frame * step
+        # Bounce off the edges of the map.
+        x = abs((distance + span_x) % (2 * span_x) - span_x) if span_x else 0.0
+        y = abs((distance + span_y) % (2 * span_y) - span_y) if span_y else 0.0
+        views.append((x, y, x + core.SCREEN_WIDTH, y + core.SCREEN_HEIGHT))
+
+    return views
+
+
+def _lists_drawn(culler: culling.SceneCuller, layer_names: List[str]) -> int:
+    """Counts the sprite lists drawn for the tile layers."""
+    drawn = 0
+    static_layers = {}
+    for layer_name in layer_names:
+        static_layer = culler.static_layer(layer_name)
+        if static_layer is None:
+            drawn += 1
+        else:
+            # Layers can share chunks, so count each set of chunks once.
+            static_layers[id(static_layer)] = static_layer
+    return drawn + sum(layer.visible_chunks for layer in static_layers.values())
+
+
+def _bench(
+    name: str,
+    culler: culling.SceneCuller,
+    layer_names: List[str],
+    views: List[spatial.Rect],
+    draw: bool,
+) -> None:
+    view_samples = []
+    draw_samples = []
+    sprites = 0
+    lists = 0
+
+    for view in views:
+        start = time.perf_counter()
+        culler.set_view(view)
+        view_samples.append(time.perf_counter() - start)
+
+        sprites += culler.visible_count
+        lists += _lists_drawn(culler, layer_names)
+
+        if draw:
+            start = time.perf_counter()
+            culler.draw()
+            draw_samples.append(time.perf_counter() - start)
+
+    view_timings = bench_regions.Timings.from_samples(view_samples)
+    draw_ms = (
+        f"{bench_regions.Timings.from_samples(draw_samples).p50_ms:>8.3f}"
+        if draw_samples
+        else f"{'-':>8}"
+    )
+    print(
+        f"{name:>12} {view_timings.mean_ms:>9.3f} {view_timings.p99_ms:>9.3f} "
+        f"{draw_ms} {sprites / len(views):>9.0f} {lists / len(views):>7.1f}"
+    )
+
+
+def run(regions: List[str], frames: int, window: Optional[arcade.Window]) -> None:
+    """Runs the benchmark and prints a table of results."""
+    game_spec = game_main.load_spec()
+
+    for region in regions:
+        tilemap = region_cache.build_region(game_spec.world.regions[region])
+        layer_names = list(tilemap.sprite_lists)
+        scene = arcade.Scene()
+        for layer_name in layer_names:
+            scene.add_sprite_list(
+                layer_name, sprite_list=tilemap.sprite_lists[layer_name]
+            )
+
+        width = tilemap.width * tilemap.tile_width
+        height = tilemap.height * tilemap.tile_height
+        views = _view_path(width, height, frames)
+        tiles = sum(len(sprite_list) for sprite_list in tilemap.sprite_lists.values())
+
+        print(f"{region}: {tiles} tiles in {len(layer_names)} layers, {frames} frames")
+        print(
+            f"{'culling':>12} {'view ms':>9} {'p99 ms':>9} {'draw p50':>8} "
+            f"{'sprites':>9} {'lists':>7}"
+        )
+
+        _bench(
+            "per tile",
+            culling.SceneCuller(scene, layer_names),
+            layer_names,
+            views,
+            window is not None,
+        )
+        _bench(
+            "chunked",
+            culling.SceneCuller(
+                scene,
+                [],
+                static_layer_names=layer_names,
+                chunk_size=(
+                    tile_chunks.CHUNK_TILES * tilemap.tile_width,
+                    tile_chunks.CHUNK_TILES * tilemap.tile_height,
+                ),
+            ),
+            layer_names,
+            views,
+            window is not None,
+        )
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regions", nargs="+", default=DEFAULT_REGIONS)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--no-draw", action="store_true")
+    args = parser.parse_args()
+
+    # Building tile maps needs an OpenGL context, even when not drawing them.
+    window = arcade.Window(visible=False)
+    run(args.regions, args.frames, None if args.no_draw else window)
+
+
+if __name__ == "__main__":
+    main()
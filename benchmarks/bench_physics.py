@@ -0,0 +1,88 @@
+"""Measures physics engine frame time as the number of sprites grows.
+
+Run with:
+
+    python -m benchmarks.bench_physics
+
+Sprites are scattered at a constant density, so a frame time that grows linearly
+with the sprite count means the broad phase is doing its job.
+"""
+
+import argparse
+import math
+import random
+import time
+from typing import (
+    List,
+)
+
+import arcade
+
+from engine.model import (
+    game_sprite,
+    physics,
+)
+
+DEFAULT_COUNTS = [10, 100, 500, 1000, 2000, 5000]
+DEFAULT_FRAMES = 30
+SPRITE_SIZE = 32
+SPEED = 80
+# How much map area each sprite gets, in pixels.
+AREA_PER_SPRITE = 128 * 128
+DELTA_TIME = 1 / 60
+
+
+def _build_engine(count: int, rng: random.Random) -> physics.Engine:
+    side = math.sqrt(count * AREA_PER_SPRITE)
+
+    sprites: List[game_sprite.GameSprite] = []
+    for i in range(count):
+        sprite = game_sprite.GameSprite(
+            name=f"sprite{i}",
+            size=(SPRITE_SIZE, SPRITE_SIZE),
+        )
+        half = SPRITE_SIZE / 2
+        sprite.set_hit_box([(-half, -half), (half, -half), (half, half), (-half, half)])
+        sprite.center_x = rng.uniform(0, side)
+        sprite.center_y = rng.uniform(0, side)
+        sprite.change_x = rng.uniform(-SPEED, SPEED)
+        sprite.change_y = rng.uniform(-SPEED, SPEED)
+        sprites.append(sprite)
+
+    return physics.Engine(
+        sprites,
+        arcade.SpriteList(use_spatial_hash=True),
+        map_size=(side, side),
+    )
+
+
+def run(counts: List[int], frames: int, seed: int) -> None:
+    """Runs the benchmark and prints a table of results."""
+    rng = random.Random(seed)
+
+    print(f"{'sprites':>8} {'ms/frame':>10} {'us/sprite':>10}")
+
+    for count in counts:
+        engine = _build_engine(count, rng)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            engine.update(DELTA_TIME, on_collide=lambda s1, s2: None)
+        elapsed = (time.perf_counter() - start) / frames
+
+        print(f"{count:>8} {elapsed * 1000:>10.3f} {elapsed / count * 1e6:>10.2f}")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.counts, args.frames, args.seed)
+
+
+if __name__ == "__main__":
+    main()
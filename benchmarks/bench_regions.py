@@ -0,0 +1,280 @@
+"""Measures tick throughput for every region in the game spec.
+
+Run with:
+
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_regions --output bench.json
+
+Each region is loaded with a number of extra rats, then the world is updated for a
+fixed number of ticks. The p50/p99 times of `World.on_update`, `physics.Engine.update`
+and `World.draw` are written out as JSON so results can be compared between commits.
+Drawing is culled to a screen-sized view around the player, like the game does, unless
+--no-cull is given.
+
+Drawing needs an OpenGL context. Setting ARCADE_HEADLESS=1 lets arcade create one
+without a display; if no context can be created, draw timings are reported as null.
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+import arcade
+
+from engine import (
+    clock,
+    core,
+    headless,
+)
+from engine.model import world
+from game import (
+    headless as game_headless,
+    main as game_main,
+)
+from game.creatures import forest
+from game.quests import all as quests
+
+DEFAULT_RAT_COUNTS = [0, 10, 100]
+DEFAULT_TICKS = 300
+# Ticks that are run before timing starts, so one-off setup costs aren't counted.
+DEFAULT_WARMUP_TICKS = 10
+RAT_SPEC = "forest.rat"
+# How far from a key point rats are scattered, in pixels.
+SPAWN_SPREAD = 64
+# The most waypoints that each rat wanders between.
+MAX_WAYPOINTS = 4
+
+
+@dataclasses.dataclass
+class Timings:
+    """Summarizes a set of timing samples, in milliseconds."""
+
+    samples: int
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+
+    @classmethod
+    def from_samples(cls, samples: List[float]) -> "Timings":
+        """Builds timings from a list of samples in seconds."""
+        ordered = sorted(samples)
+        return cls(
+            samples=len(ordered),
+            mean_ms=sum(ordered) / len(ordered) * 1000,
+            p50_ms=percentile(ordered, 50) * 1000,
+            p99_ms=percentile(ordered, 99) * 1000,
+        )
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Gets a percentile from a sorted list, using the nearest-rank method."""
+    if not ordered:
+        raise ValueError("Can't take a percentile of no samples.")
+
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _timed(samples: List[float], func: Callable[..., Any]) -> Callable[..., Any]:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+        return result
+
+    return wrapper
+
+
+def _spawn_rats(api: headless.HeadlessCore, count: int, rng: random.Random) -> None:
+    key_points = list(api.get_key_points())
+    if not key_points:
+        return
+
+    for i in range(count):
+        waypoints = rng.sample(key_points, min(MAX_WAYPOINTS, len(key_points)))
+        start_x, start_y = waypoints[0].location
+
+        api.create_sprite(
+            spec_name=RAT_SPEC,
+            name=f"bench_rat{i}",
+            start_location=(
+                start_x + rng.uniform(-SPAWN_SPREAD, SPAWN_SPREAD),
+                start_y + rng.uniform(-SPAWN_SPREAD, SPAWN_SPREAD),
+            ),
+            script=forest.Rat(
+                **{f"waypoint_{n}": point.name for n, point in enumerate(waypoints)}
+            ),
+        )
+
+
+def _follow_player(game_world: world.World) -> None:
+    """Points a screen-sized view at the player, like the game's camera."""
+    player_x, player_y = game_world.interpolated_location(game_world.player_sprite)
+    game_world.set_view_rect(
+        (
+            player_x - core.SCREEN_WIDTH / 2,
+            player_y - core.SCREEN_HEIGHT / 2,
+            player_x + core.SCREEN_WIDTH / 2,
+            player_y + core.SCREEN_HEIGHT / 2,
+        )
+    )
+
+
+def bench_region(
+    region: str,
+    rats: int,
+    ticks: int,
+    warmup_ticks: int,
+    draw: bool,
+    cull: bool,
+    seed: int,
+) -> Dict[str, Any]:
+    """Benchmarks a single region with a certain number of extra rats."""
+    api = headless.HeadlessCore(
+        game_main.load_spec(),
+        game_main.initial_player_state(),
+    )
+    api.start_game()
+    game_world = api.world
+    assert game_world is not None
+
+    if game_world.active_region != region:
+        api.change_region(region, game_headless.first_key_point(game_world, region))
+
+    _spawn_rats(api, rats, random.Random(seed))
+
+    for _ in range(warmup_ticks):
+        game_world.on_update(clock.DEFAULT_STEP_SECS)
+        if draw:
+            if cull:
+                _follow_player(game_world)
+            game_world.draw()
+
+    update_samples: List[float] = []
+    physics_samples: List[float] = []
+    draw_samples: List[float] = []
+
+    for _ in range(ticks):
+        # The engine is rebuilt whenever the region changes, so wrap it every tick.
+        engine = game_world.physics_engine
+        assert engine is not None
+        original_update = engine.update
+        engine.update = _timed(physics_samples, original_update)  # type: ignore
+
+        start = time.perf_counter()
+        game_world.on_update(clock.DEFAULT_STEP_SECS)
+        update_samples.append(time.perf_counter() - start)
+
+        engine.update = original_update  # type: ignore
+
+        if draw:
+            if cull:
+                _follow_player(game_world)
+            start = time.perf_counter()
+            game_world.draw()
+            draw_samples.append(time.perf_counter() - start)
+
+    return {
+        "region": region,
+        "active_region": game_world.active_region,
+        "rats": rats,
+        "culled": draw and cull,
+        "sprites": len(list(game_world.get_sprites(None))),
+        "world_update": dataclasses.asdict(Timings.from_samples(update_samples)),
+        "physics_update": dataclasses.asdict(Timings.from_samples(physics_samples)),
+        "draw": (
+            dataclasses.asdict(Timings.from_samples(draw_samples))
+            if draw_samples
+            else None
+        ),
+    }
+
+
+def _open_window() -> Optional[arcade.Window]:
+    try:
+        return arcade.Window(visible=False)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # There's no display or OpenGL context, so we'll skip drawing.
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regions", nargs="+", default=None)
+    parser.add_argument("--rats", type=int, nargs="+", default=DEFAULT_RAT_COUNTS)
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_TICKS)
+    parser.add_argument("--no-draw", action="store_true")
+    parser.add_argument(
+        "--no-cull",
+        action="store_true",
+        help="Draw every sprite in the region, not just those near the player.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Defaults to stdout.")
+    args = parser.parse_args()
+
+    window = None if args.no_draw else _open_window()
+
+    quests.register()
+    regions = args.regions or list(game_main.load_spec().world.regions)
+
+    results = []
+    for region in regions:
+        for rats in args.rats:
+            print(f"Benchmarking {region} with {rats} rats...", file=sys.stderr)
+            results.append(
+                bench_region(
+                    region,
+                    rats,
+                    args.ticks,
+                    args.warmup,
+                    window is not None,
+                    not args.no_cull,
+                    args.seed,
+                )
+            )
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "ticks": args.ticks,
+        "warmup_ticks": args.warmup,
+        "tick_secs": clock.DEFAULT_STEP_SECS,
+        "results": results,
+    }
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as outfile:
+            json.dump(report, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
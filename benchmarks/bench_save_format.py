@@ -0,0 +1,202 @@
+"""Compares the size of a save, and how long it takes to load, across formats.
+
+Run with:
+
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_save_format
+
+The player visits every region once, so that the world state covers all of them, and
+a number of extra rats are added to the last one. That state is then written as a
+snapshot in the save format, and as pickle and JSON, each with and without zlib. JSON
+can't hold the game's objects, so they're written as dicts naming their type.
+
+Loading is timed from reading the file to having the world state back, including
+rebuilding the game's objects. Each format is loaded a number of times.
+"""
+
+import argparse
+import functools
+import json
+import os
+import pickle
+import random
+import tempfile
+import time
+import zlib
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+)
+
+from benchmarks import bench_regions
+from engine import headless
+from engine.model import (
+    game_sprite,
+    saves,
+    world,
+)
+from game import headless as game_headless
+from game import main as game_main
+from game.quests import base as quests_base
+from game.scripts import health
+
+DEFAULT_LOADS = 50
+DEFAULT_RATS = 100
+
+# The types that can appear in the world state, by name, for JSON.
+_JSON_TYPES: Dict[str, type] = {
+    cls.__name__: cls
+    for cls in [
+        world.WorldState,
+        world.RegionState,
+        game_sprite.SpriteState,
+        health.Health,
+        quests_base.QuestState,
+    ]
+}
+
+
+def _json_default(value: Any) -> Dict[str, Any]:
+    return {"__type__": type(value).__name__, **vars(value)}
+
+
+def _json_object(value: Dict[str, Any]) -> Any:
+    cls = _JSON_TYPES.get(value.get("__type__", ""))
+    if cls is None:
+        return value
+
+    del value["__type__"]
+    result: Any = object.__new__(cls)
+    result.__dict__.update(value)
+    return result
+
+
+def _write_file(path: str, data: bytes) -> int:
+    with open(path, "wb") as outfile:
+        outfile.write(data)
+    return len(data)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as infile:
+        return infile.read()
+
+
+def _load_file(path: str, load: Callable[[bytes], Any]) -> Any:
+    return load(_read_file(path))
+
+
+def _load_snapshot(directory: str) -> world.WorldState:
+    value = saves.SaveJournal(directory, durable=False).load()
+    assert value is not None
+    return saves.state_from_saved(value)
+
+
+def _time_loads(load: Callable[[], Any], count: int) -> List[float]:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        load()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name: str, size: int, samples: List[float]) -> None:
+    timings = bench_regions.Timings.from_samples(samples)
+    print(
+        f"{name:>12} {size:>9} {timings.mean_ms:>9.2f} {timings.p50_ms:>9.2f} "
+        f"{timings.p99_ms:>9.2f}"
+    )
+
+
+def run(num_loads: int, rats: int, seed: int) -> None:
+    """Runs the benchmark and prints a table of results."""
+    game_spec = game_main.load_spec()
+    api = headless.HeadlessCore(game_spec, game_main.initial_player_state())
+    api.start_game()
+    game_world = api.world
+    assert game_world is not None
+
+    for region in game_spec.world.regions:
+        game_world.load_region(
+            region, game_headless.first_key_point(game_world, region)
+        )
+    # pylint: disable=protected-access
+    bench_regions._spawn_rats(api, rats, random.Random(seed))
+    api.player_data["quests"]["bench"] = quests_base.QuestState(
+        current_step="started", data={"rats_killed": 3}, timestamp=12.5
+    )
+    state = game_world.state
+
+    with tempfile.TemporaryDirectory() as directory:
+        save_dir = os.path.join(directory, "save")
+        manager = saves.SaveManager(save_dir, durable=False)
+        # The first save of a new game is folded straight into a snapshot.
+        manager.save(game_world)
+        manager.close()
+        snapshot_size = os.path.getsize(os.path.join(save_dir, saves.SNAPSHOT_NAME))
+
+        pickled = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        encoded_json = json.dumps(state, default=_json_default).encode("utf-8")
+        files: Dict[str, bytes] = {
+            "pickle": pickled,
+            "pickle+zlib": zlib.compress(pickled),
+            "json": encoded_json,
+            "json+zlib": zlib.compress(encoded_json),
+        }
+        loaders: Dict[str, Callable[[bytes], Any]] = {
+            "pickle": pickle.loads,
+            "pickle+zlib": lambda data: pickle.loads(zlib.decompress(data)),
+            "json": lambda data: json.loads(data, object_hook=_json_object),
+            "json+zlib": lambda data: json.loads(
+                zlib.decompress(data), object_hook=_json_object
+            ),
+        }
+
+        loaded = _load_snapshot(save_dir)
+        assert loaded.active_region == state.active_region
+        assert loaded.player_state.data["hp"].hp == state.player_state.data["hp"].hp
+
+        sprites = sum(
+            len(region_state.sprite_states)
+            for region_state in state.region_states.values()
+        )
+        print(
+            f"{len(state.region_states)} regions, {sprites} saved sprites, "
+            f"{num_loads} loads"
+        )
+        print(
+            f"{'format':>12} {'bytes':>9} {'mean ms':>9} {'p50 ms':>9} "
+            f"{'p99 ms':>9}"
+        )
+        _report(
+            "save_codec",
+            snapshot_size,
+            _time_loads(lambda: _load_snapshot(save_dir), num_loads),
+        )
+        for name, data in files.items():
+            path = os.path.join(directory, name)
+            size = _write_file(path, data)
+            _report(
+                name,
+                size,
+                _time_loads(
+                    functools.partial(_load_file, path, loaders[name]), num_loads
+                ),
+            )
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loads", type=int, default=DEFAULT_LOADS)
+    parser.add_argument("--rats", type=int, default=DEFAULT_RATS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.loads, args.rats, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Compares saving the world incrementally with writing out all of it.
+
+Run with:
+
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_saves
+
+The player visits every region once, so that the world state covers all of them, then
+goes back to the initial region. The game then runs headless there, with a number of
+extra rats wandering around, and is saved every so often. Each save is timed both as
+the save system does it, writing only what changed to the journal, and as a full
+serialization of the world state with pickle. Time spent compacting the journal in the
+background isn't counted.
+
+Saving the save system's way only works out what changed on the main thread, and that
+is what "capture" times. Writing it on the writer thread is shown separately, with
+times rounded up to the histogram's buckets. "full" is what a save would cost the main
+thread if it pickled, compressed and synced the whole state itself.
+"""
+
+import argparse
+import os
+import pickle
+import random
+import tempfile
+import time
+import zlib
+from typing import (
+    List,
+    Optional,
+)
+
+from benchmarks import bench_regions
+from engine import (
+    clock,
+    headless,
+    profiler,
+)
+from engine.model import world
+from game import headless as game_headless
+from game import main as game_main
+
+DEFAULT_SAVES = 200
+DEFAULT_SAVE_EVERY_TICKS = 60
+DEFAULT_RATS = 20
+
+
+def _report(
+    name: str,
+    mean: float,
+    p50: float,
+    p99: float,
+    size: Optional[float] = None,
+) -> None:
+    size_text = "-" if size is None else f"{size:.0f}"
+    print(
+        f"{name:>12} {mean * 1e6:>9.1f} {p50 * 1e6:>9.1f} {p99 * 1e6:>9.1f} "
+        f"{size_text:>9}"
+    )
+
+
+def _report_samples(name: str, samples: List[float], size: float) -> None:
+    timings = bench_regions.Timings.from_samples(samples)
+    _report(
+        name,
+        timings.mean_ms / 1000,
+        timings.p50_ms / 1000,
+        timings.p99_ms / 1000,
+        size,
+    )
+
+
+def _report_histogram(name: str, histogram: profiler.Histogram) -> None:
+    _report(
+        name,
+        histogram.mean_secs,
+        histogram.percentile(50),
+        histogram.percentile(99),
+    )
+
+
+def _save_full(path: str, state: world.WorldState) -> int:
+    """Saves the whole state the simple way, returning how many bytes it wrote."""
+    data = zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+    with open(path, "wb") as outfile:
+        outfile.write(data)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    return len(data)
+
+
+def run(num_saves: int, save_every_ticks: int, rats: int, seed: int) -> None:
+    """Runs the benchmark and prints a table of results."""
+    with tempfile.TemporaryDirectory() as directory:
+        game_spec = game_main.load_spec()
+        game_spec.save_dir = directory
+        api = headless.HeadlessCore(game_spec, game_main.initial_player_state())
+        api.start_game()
+        game_world = api.world
+        assert game_world is not None
+        manager = api._saves  # pylint: disable=protected-access
+        assert manager is not None
+
+        home = game_world.active_region
+        for region in [*game_spec.world.regions, home]:
+            game_world.load_region(
+                region, game_headless.first_key_point(game_world, region)
+            )
+
+        # pylint: disable=protected-access
+        bench_regions._spawn_rats(api, rats, random.Random(seed))
+        # The first save writes everything.
+        manager.save(game_world)
+        manager.flush()
+        start_bytes = manager.journal.bytes_written
+        for histogram in [
+            manager.capture_times,
+            manager.write_times,
+            manager.compact_times,
+        ]:
+            histogram.reset()
+        full_path = os.path.join(directory, "full.sav")
+
+        incremental = []
+        full = []
+        full_bytes = 0
+        for _ in range(num_saves):
+            for _ in range(save_every_ticks):
+                game_world.on_update(clock.DEFAULT_STEP_SECS)
+
+            start = time.perf_counter()
+            manager.save(game_world)
+            incremental.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            full_bytes += _save_full(full_path, game_world.state)
+            full.append(time.perf_counter() - start)
+
+        manager.flush()
+        incremental_bytes = manager.journal.bytes_written - start_bytes
+
+        manager.close()
+
+    sprites = len(list(game_world.get_sprites(None)))
+    print(
+        f"{game_world.active_region}: {sprites} sprites, "
+        f"{len(game_world.region_states)} regions, {num_saves} saves every "
+        f"{save_every_ticks} ticks"
+    )
+    print(f"{'save':>12} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9} {'bytes':>9}")
+    _report_samples("capture", incremental, incremental_bytes / num_saves)
+    _report_histogram("write", manager.write_times)
+    _report_histogram("compact", manager.compact_times)
+    _report_samples("full", full, full_bytes / num_saves)
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--saves", type=int, default=DEFAULT_SAVES)
+    parser.add_argument(
+        "--save-every-ticks", type=int, default=DEFAULT_SAVE_EVERY_TICKS
+    )
+    parser.add_argument("--rats", type=int, default=DEFAULT_RATS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.saves, args.save_every_ticks, args.rats, args.seed)
+
+
+if __name__ == "__main__":
+    main()
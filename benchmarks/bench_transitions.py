@@ -0,0 +1,134 @@
+"""Measures how long it takes to move between regions.
+
+Run with:
+
+    ARCADE_HEADLESS=1 python -m benchmarks.bench_transitions
+
+Starting from the initial region, the player walks through each door and back again a
+number of times. The first trip through a door builds the region from scratch; later
+trips should find it warm. Cold and warm timings of `World.load_region` are reported
+separately. With --budget-ms, exits with an error if any warm transition is slower.
+"""
+
+import argparse
+import sys
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+import arcade
+
+from benchmarks import bench_regions
+from engine import headless
+from engine.model import world
+from game import main as game_main
+from game.quests import all as quests
+
+DEFAULT_ROUND_TRIPS = 5
+
+
+def transitions(tilemap: arcade.TileMap) -> List[Tuple[str, str]]:
+    """Finds the (region, start location) pairs that a region's doors lead to."""
+    found = []
+
+    for obj in tilemap.object_lists.get(world.SCRIPTED_OBJECTS, []):
+        properties = obj.properties or {}
+        for event in world.TRANSITION_EVENTS:
+            if properties.get(event) == world.TRANSITION_SCRIPT:
+                found.append(
+                    (
+                        properties[f"{event}_region"],
+                        properties[f"{event}_start_location"],
+                    )
+                )
+
+    return found
+
+
+def bench_transitions(
+    round_trips: int,
+    warm_regions: Optional[int],
+) -> Tuple[List[float], List[float]]:
+    """Walks through every door in the initial region and back.
+
+    Returns the cold and warm transition times in seconds.
+    """
+    game_spec = game_main.load_spec()
+    if warm_regions is not None:
+        game_spec.world.warm_regions = warm_regions
+
+    api = headless.HeadlessCore(game_spec, game_main.initial_player_state())
+    api.start_game()
+    assert api.world is not None
+    game_world = api.world
+
+    home = game_world.active_region
+    cold: List[float] = []
+    warm: List[float] = []
+    seen = {home}
+
+    for region, start_location in transitions(game_world.get_tilemap(home)):
+        way_back = [
+            location
+            for target, location in transitions(game_world.get_tilemap(region))
+            if target == home
+        ]
+        if not way_back:
+            print(f"Skipping {region}, there's no way back.", file=sys.stderr)
+            continue
+
+        for _ in range(round_trips):
+            for target, location in [(region, start_location), (home, way_back[0])]:
+                is_cold = target not in seen
+                api.change_region(target, location)
+                (cold if is_cold else warm).append(game_world.last_load_secs)
+                seen.add(target)
+
+                # Let a few ticks go by, like a player would.
+                api.run(10)
+
+    return cold, warm
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--round-trips", type=int, default=DEFAULT_ROUND_TRIPS)
+    parser.add_argument(
+        "--warm-regions",
+        type=int,
+        default=None,
+        help="Overrides how many regions are kept warm.",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Fail if a warm transition takes longer than this.",
+    )
+    args = parser.parse_args()
+
+    quests.register()
+    cold, warm = bench_transitions(args.round_trips, args.warm_regions)
+
+    for name, samples in [("cold", cold), ("warm", warm)]:
+        if not samples:
+            print(f"{name}: no transitions")
+            continue
+
+        timings = bench_regions.Timings.from_samples(samples)
+        print(
+            f"{name}: {timings.samples} transitions, "
+            f"mean {timings.mean_ms:.2f}ms, p50 {timings.p50_ms:.2f}ms, "
+            f"p99 {timings.p99_ms:.2f}ms, max {max(samples) * 1000:.2f}ms"
+        )
+
+    if args.budget_ms is not None and warm and max(warm) * 1000 > args.budget_ms:
+        print(f"Warm transitions went over {args.budget_ms}ms.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Packs many small images into a few large ones, so they can be loaded in one go.
+
+An atlas is a set of page images plus a JSON manifest that says where each source image
+ended up:
+
+    {
+        "version": 1,
+        "pages": ["atlas-0.png", ...],
+        "images": {
+            "<source path>": {"page": 0, "x": 0, "y": 0, "width": 32, "height": 32,
+                              "mtime": 1700000000.0},
+            ...
+        }
+    }
+
+Once an atlas is installed, textures are cut out of the pages instead of being read
+from disk one file at a time. Any image that isn't in the atlas, or that has changed
+since the atlas was built, is loaded from its own file as before.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import arcade
+from PIL import Image
+
+FORMAT_VERSION = 1
+
+MANIFEST_NAME = "atlas.json"
+PAGE_NAME = "atlas-{index}.png"
+
+DEFAULT_PAGE_SIZE = 2048
+
+# Space between images, so that filtering doesn't bleed one into the next.
+PADDING = 1
+
+logger = logging.getLogger(__name__)
+
+
+class AtlasError(Exception):
+    """Raised when an atlas can't be built or read."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Placement:
+    """Where a source image sits in an atlas."""
+
+    page: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def pack(
+    sizes: Dict[str, Tuple[int, int]],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Dict[str, Placement]:
+    """Works out where to put images of the given sizes.
+
+    Images are placed tallest first on shelves that run left to right, starting a new
+    page when one fills up.
+
+    Raises:
+        AtlasError: if an image is too big to fit on a page.
+    """
+    placements = {}
+    page, x, y, shelf_height = 0, 0, 0, 0
+
+    for name, (width, height) in sorted(
+        sizes.items(),
+        key=lambda item: (-item[1][1], -item[1][0], item[0]),
+    ):
+        if width > page_size or height > page_size:
+            raise AtlasError(f"{name} is too big for a {page_size}px atlas page.")
+
+        if x + width > page_size:
+            x, y, shelf_height = 0, y + shelf_height + PADDING, 0
+
+        if y + height > page_size:
+            page, x, y, shelf_height = page + 1, 0, 0, 0
+
+        placements[name] = Placement(page=page, x=x, y=y, width=width, height=height)
+        x += width + PADDING
+        shelf_height = max(shelf_height, height)
+
+    return placements
+
+
+def build(
+    sources: Iterable[str],
+    output_dir: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> str:
+    """Packs a set of images into an atlas, returning the path of its manifest."""
+    images = {}
+    for source in sorted({os.path.normpath(source) for source in sources}):
+        with Image.open(source) as image:
+            images[source] = image.convert("RGBA")
+
+    placements = pack(
+        {source: image.size for source, image in images.items()},
+        page_size,
+    )
+
+    num_pages = max((p.page for p in placements.values()), default=-1) + 1
+    # Pages are only as big as they need to be to hold their images.
+    page_sizes = [[0, 0] for _ in range(num_pages)]
+    for placement in placements.values():
+        size = page_sizes[placement.page]
+        size[0] = max(size[0], placement.x + placement.width)
+        size[1] = max(size[1], placement.y + placement.height)
+
+    pages = [Image.new("RGBA", (width, height)) for width, height in page_sizes]
+    for source, placement in placements.items():
+        pages[placement.page].paste(images[source], (placement.x, placement.y))
+
+    os.makedirs(output_dir, exist_ok=True)
+    page_names = []
+    for index, page in enumerate(pages):
+        page_name = PAGE_NAME.format(index=index)
+        page.save(os.path.join(output_dir, page_name))
+        page_names.append(page_name)
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "pages": page_names,
+        "images": {
+            source: {
+                **dataclasses.asdict(placement),
+                "mtime": os.path.getmtime(source),
+            }
+            for source, placement in placements.items()
+        },
+    }
+
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    # Write the manifest last, so that a half-built atlas is never used.
+    with open(path, "w") as outfile:
+        json.dump(manifest, outfile, indent=2, sort_keys=True)
+
+    return path
+
+
+class Atlas:
+    """An atlas that has been built, with its pages loaded as they're needed."""
+
+    _directory: str
+    _page_names: List[str]
+    _pages: Dict[int, Image.Image]
+    _placements: Dict[str, Placement]
+    _textures: Dict[Tuple[str, int, int, int, int], arcade.Texture]
+
+    def __init__(
+        self,
+        directory: str,
+        page_names: List[str],
+        placements: Dict[str, Placement],
+    ):
+        self._directory = directory
+        self._page_names = page_names
+        self._pages = {}
+        self._placements = placements
+        self._textures = {}
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "Atlas":
+        """Loads an atlas from its manifest.
+
+        Images that have changed since the atlas was built are left out of it.
+
+        Raises:
+            AtlasError: if the manifest can't be read.
+        """
+        try:
+            with open(manifest_path) as infile:
+                manifest = json.load(infile)
+        except (OSError, ValueError) as error:
+            raise AtlasError(f"Unable to read {manifest_path}: {error}") from error
+
+        if manifest.get("version") != FORMAT_VERSION:
+            raise AtlasError(f"{manifest_path} has an unknown version.")
+
+        placements = {}
+        for source, entry in manifest["images"].items():
+            try:
+                changed = os.path.getmtime(source) > entry["mtime"]
+            except OSError:
+                changed = True
+
+            if changed:
+                logger.info("%s has changed since the atlas was built.", source)
+                continue
+
+            placements[source] = Placement(
+                page=entry["page"],
+                x=entry["x"],
+                y=entry["y"],
+                width=entry["width"],
+                height=entry["height"],
+            )
+
+        return cls(os.path.dirname(manifest_path), manifest["pages"], placements)
+
+    def __contains__(self, source: str) -> bool:
+        return os.path.normpath(source) in self._placements
+
+    def __len__(self) -> int:
+        return len(self._placements)
+
+    def load_texture(
+        self,
+        source: str,
+        x: int = 0,
+        y: int = 0,
+        width: int = 0,
+        height: int = 0,
+    ) -> arcade.Texture:
+        """Cuts a texture out of the atlas, like `arcade.load_texture` would.
+
+        `x`, `y`, `width` and `height` pick out part of the source image, measured from
+        its top left. A width or height of zero means the rest of the image.
+
+        Raises:
+            KeyError: if the source image isn't in the atlas.
+        """
+        source = os.path.normpath(source)
+        placement = self._placements[source]
+        width = width or placement.width - x
+        height = height or placement.height - y
+
+        key = (source, x, y, width, height)
+        texture = self._textures.get(key)
+        if texture is None:
+            left, top = placement.x + x, placement.y + y
+            image = self._page(placement.page).crop(
+                (left, top, left + width, top + height)
+            )
+            texture = arcade.Texture(f"{source}-{x}-{y}-{width}-{height}", image=image)
+            self._textures[key] = texture
+
+        return texture
+
+    def load_spritesheet(
+        self,
+        source: str,
+        sprite_width: int,
+        sprite_height: int,
+        columns: int,
+        count: int,
+    ) -> List[arcade.Texture]:
+        """Cuts the frames of a sprite sheet out of the atlas.
+
+        Takes the same arguments as `arcade.load_spritesheet`.
+
+        Raises:
+            KeyError: if the source image isn't in the atlas.
+        """
+        return [
+            self.load_texture(
+                source,
+                x=(i % columns) * sprite_width,
+                y=(i // columns) * sprite_height,
+                width=sprite_width,
+                height=sprite_height,
+            )
+            for i in range(count)
+        ]
+
+    def _page(self, index: int) -> Image.Image:
+        page = self._pages.get(index)
+        if page is None:
+            path = os.path.join(self._directory, self._page_names[index])
+            with Image.open(path) as image:
+                page = self._pages[index] = image.convert("RGBA")
+        return page
+
+
+_installed: Optional[Atlas] = None
+
+
+def install(manifest_path: str) -> Optional[Atlas]:
+    """Starts loading textures through an atlas.
+
+    If the atlas hasn't been built, or can't be read, textures keep being loaded from
+    their own files.
+    """
+    global _installed  # pylint: disable=global-statement
+
+    if not os.path.exists(manifest_path):
+        logger.info("No atlas at %s, run `make atlas` to build it.", manifest_path)
+        _installed = None
+        return None
+
+    try:
+        _installed = Atlas.load(manifest_path)
+    except AtlasError as error:
+        logger.warning("Not using atlas: %s", error)
+        _installed = None
+
+    return _installed
+
+
+def uninstall() -> None:
+    """Goes back to loading every texture from its own file."""
+    global _installed  # pylint: disable=global-statement
+    _installed = None
+
+
+def load_texture(source: str) -> arcade.Texture:
+    """Loads a whole image as a texture, from the atlas if it's there."""
+    if _installed is not None and source in _installed:
+        return _installed.load_texture(source)
+    return arcade.load_texture(source)
+
+
+def load_spritesheet(
+    source: str,
+    sprite_width: int,
+    sprite_height: int,
+    columns: int,
+    count: int,
+) -> List[arcade.Texture]:
+    """Loads the frames of a sprite sheet, from the atlas if it's there."""
+    if _installed is not None and source in _installed:
+        return _installed.load_spritesheet(
+            source, sprite_width, sprite_height, columns, count
+        )
+    return arcade.load_spritesheet(
+        file_name=source,
+        sprite_width=sprite_width,
+        sprite_height=sprite_height,
+        columns=columns,
+        count=count,
+    )
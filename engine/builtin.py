@@ -35,6 +35,11 @@ def resume_game(api: scripts.GameAPI) -> None:
     api.start_game()
 
 
+def load_game(api: scripts.GameAPI) -> None:
+    """Starts the game from where it was last saved."""
+    api.load_game()
+
+
 def exit_game(api: scripts.GameAPI) -> None:
     """Exits the game."""
     # pylint: disable=unused-argument
@@ -63,6 +68,9 @@ class Spawner(scripts.SavesAPI, scripts.Script):
     spawn_cooldown_secs: float
     id_counter: int
 
+    # Spawning can happen a little late without anyone noticing.
+    tick_priority = scripts.TICK_PRIORITY_LOW
+
     def __init__(
         self,
         sprite_spec: str,
@@ -0,0 +1,60 @@
+"""Utilities for keeping the simulation clock separate from the render clock."""
+
+# How long a single simulation step lasts, in seconds.
+DEFAULT_STEP_SECS = 1 / 60
+
+# The most simulation steps we'll run for a single rendered frame. If a frame takes
+# longer than this, the simulation slows down rather than trying to catch up, since
+# catching up would make the next frame take even longer.
+DEFAULT_MAX_STEPS = 5
+
+
+class FixedTimestep:
+    """Converts variable frame times into a whole number of fixed-size steps.
+
+    Any time left over after the last whole step is carried into the next frame. The
+    fraction of a step that is left over is exposed as `alpha`, which views can use to
+    interpolate between the last two simulation steps.
+    """
+
+    step: float
+    max_steps: int
+    _accumulator: float
+
+    def __init__(
+        self,
+        step: float = DEFAULT_STEP_SECS,
+        max_steps: int = DEFAULT_MAX_STEPS,
+    ):
+        if step <= 0:
+            raise ValueError("Step must be positive.")
+        if max_steps < 1:
+            raise ValueError("Must allow at least one step per frame.")
+
+        self.step = step
+        self.max_steps = max_steps
+        self._accumulator = 0.0
+
+    def advance(self, delta_time: float) -> int:
+        """Adds a frame's worth of time, returning how many steps should be run."""
+        self._accumulator += delta_time
+
+        steps = int(self._accumulator // self.step)
+
+        if steps > self.max_steps:
+            # Drop the backlog, but keep the partial step so that alpha stays smooth.
+            steps = self.max_steps
+            self._accumulator %= self.step
+        else:
+            self._accumulator -= steps * self.step
+
+        return steps
+
+    def reset(self) -> None:
+        """Throws away any accumulated time."""
+        self._accumulator = 0.0
+
+    @property
+    def alpha(self) -> float:
+        """Gets how far we are between the last step and the next one, from 0 to 1."""
+        return min(1.0, max(0.0, self._accumulator / self.step))
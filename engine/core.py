@@ -2,35 +2,37 @@ from typing import (
     Any,
     Callable,
     Dict,
-    Iterable,
     Optional,
-    Tuple,
 )
 
 import arcade
 import arcade.tilemap
 
 from engine import (
+    atlas,
     event_manager,
-    events,
     game_state,
+    model_api,
     scripts,
     spec,
 )
 from engine.gui import game_state as gui_game_state
 from engine.ingame import game_state as ingame_state
-from engine.model import world
+from engine.model import (
+    game_sprite,
+    saves,
+    world,
+)
 
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 650
 SCREEN_TITLE = "OSSU Game Project"
 
 
-class GameNotInitializedError(Exception):
-    """Raised when functions are called before the game was properly initialized."""
+GameNotInitializedError = model_api.GameNotInitializedError
 
 
-class Core(arcade.Window):
+class Core(model_api.ModelAPI, arcade.Window):
     """
     Main application class, wraps everything.
     Implements scripts.GameAPI.
@@ -61,6 +63,7 @@ class Core(arcade.Window):
 
     _sounds: Dict[str, arcade.Sound]
     _events: event_manager.EventManager
+    _saves: Optional[saves.SaveManager]
 
     def __init__(
         self,
@@ -81,6 +84,9 @@ class Core(arcade.Window):
             SCREEN_TITLE,
         )
 
+        if game_spec.atlas is not None:
+            atlas.install(game_spec.atlas)
+
         self._spec = game_spec
         self.world = None
         self.initial_gui = initial_gui(self)
@@ -100,6 +106,7 @@ class Core(arcade.Window):
             self._sounds[name] = sound
 
         self._events = event_manager.EventManager()
+        self._saves = saves.SaveManager.from_spec(game_spec)
 
     def setup(self) -> None:
         """Resets the game state."""
@@ -108,6 +115,9 @@ class Core(arcade.Window):
     def start_game(self) -> None:
         """Switches to the "in game" state."""
         if self.world is None:
+            game_sprite.warm_texture_cache(
+                [self._spec.player_spec, *self._spec.sprites.values()]
+            )
             self.world = world.World(self, self._spec, self.initial_player_state)
 
         if self.ingame_state is None:
@@ -121,98 +131,15 @@ class Core(arcade.Window):
 
         self.current_state = self.ingame_state
 
-    def change_region(self, name: str, start_location: str) -> None:
-        """Changes the region of the game."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        self.world.load_region(name, start_location)
-
     def show_gui(self, gui: scripts.GUI) -> None:
         """Switches to the "GUI" state, and displays a certain GUI."""
         self.gui_state.set_gui(gui)
         self.current_state = self.gui_state
 
-    def create_sprite(
-        self,
-        spec_name: str,
-        name: str,
-        start_location: Tuple[int, int],
-        script: Optional[scripts.Script],
-    ) -> scripts.Entity:
-        """Creates a sprite."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        _spec = self._spec.sprites[spec_name]
-        return self.world.create_sprite(_spec, name, start_location, script)
-
-    def get_key_points(self, name: Optional[str] = None) -> Iterable[scripts.KeyPoint]:
-        """Queries for key points in the current region."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        return self.world.get_key_points(name)
-
-    def get_sprites(self, name: Optional[str] = None) -> Iterable[arcade.Sprite]:
-        """Gets all sprites with the given name."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        return self.world.get_sprites(name)
-
-    def remove_sprite(self, name: str) -> None:
-        """Removes a sprite by name."""
-        self.fire_event(events.SPRITE_REMOVED, events.SpriteRemoved(name))
-
     def play_sound(self, name: str) -> None:
         """Plays a sound."""
         self._sounds[name].play()
 
-    def register_handler(self, event_name: str, handler: scripts.EventHandler) -> None:
-        """Registers an event handler for a custom event."""
-        self._events.register_handler(event_name, handler)
-
-    def unregister_handler(
-        self,
-        event_name: str,
-        handler: scripts.EventHandler,
-    ) -> None:
-        """Unregisters an event handler."""
-        self._events.unregister_handler(event_name, handler)
-
-    def fire_event(self, event_name: str, data: Any) -> None:
-        """Fires an event."""
-        self._events.fire_event(event_name, data)
-
-    def clear_events(self) -> None:
-        """Clears all events."""
-        self._events.clear_events()
-
-    @property
-    def player_data(self) -> Dict[str, Any]:
-        """Gets the player's data."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        return self.world.player_sprite.data
-
-    @player_data.setter
-    def player_data(self, value: Dict[str, Any]):
-        """Sets the player's data."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        self.world.player_sprite.data = value
-
-    @property
-    def current_time_secs(self) -> float:
-        """Gets the current time in seconds."""
-        if self.world is None:
-            raise GameNotInitializedError()
-
-        return self.world.game_time_sec
-
     def run(self):
         """Runs the game."""
         self.setup()
@@ -278,3 +205,21 @@ class Core(arcade.Window):
             raise GameNotInitializedError()
 
         self.current_state.on_update(delta_time)
+
+        if (
+            self._saves is not None
+            and self.world is not None
+            and self.current_state is self.ingame_state
+        ):
+            # Only working out what changed happens here, the rest is on another thread.
+            with self.world.profiler.span("autosave"):
+                self._saves.save_if_due(self.world, self.world.game_time_sec)
+
+    def on_close(self) -> None:
+        """Finishes writing saves and stops background work before the window closes."""
+        if self._saves is not None:
+            self._saves.close()
+        if self.world is not None:
+            self.world.close()
+
+        super().on_close()
@@ -8,7 +8,10 @@ from typing import (
 import arcade
 from arcade import gui
 
-from engine import scripts
+from engine import (
+    atlas,
+    scripts,
+)
 from engine.gui import widgets
 
 
@@ -63,7 +66,7 @@ class SpecGUI:
         self.sprites = arcade.SpriteList()
 
         for asset in self.spec.assets:
-            self.textures[asset.name] = arcade.load_texture(asset.path)
+            self.textures[asset.name] = atlas.load_texture(asset.path)
 
         for image_spec in self.spec.images:
             image = arcade.Sprite(texture=self.textures[image_spec.image_asset])
@@ -0,0 +1,105 @@
+"""Runs the game simulation without a window.
+
+This is useful for soak-testing regions, benchmarking scripts, and running the game on
+machines without a display. Nothing is rendered and no sounds are played.
+"""
+
+import dataclasses
+import time
+from typing import (
+    Any,
+    Dict,
+    Optional,
+)
+
+from engine import (
+    atlas,
+    clock,
+    event_manager,
+    model_api,
+    scripts,
+    spec,
+)
+from engine.model import (
+    game_sprite,
+    saves,
+    world,
+)
+
+
+@dataclasses.dataclass
+class RunStats:
+    """Statistics from running the simulation for a while."""
+
+    ticks: int
+    elapsed_secs: float
+    game_time_secs: float
+
+    @property
+    def ticks_per_sec(self) -> float:
+        """Gets the number of ticks that were run per second of real time."""
+        if self.elapsed_secs <= 0:
+            return float("inf")
+        return self.ticks / self.elapsed_secs
+
+
+class HeadlessCore(model_api.ModelAPI):
+    """A core that only runs the model.
+
+    Implements scripts.GameAPI.
+    """
+
+    initial_player_state: Dict[str, Any]
+    # The last GUI that a script asked to show. It's never drawn.
+    gui: Optional[scripts.GUI]
+
+    def __init__(
+        self,
+        game_spec: spec.GameSpec,
+        initial_player_state: Dict[str, Any],
+    ):
+        if game_spec.atlas is not None:
+            atlas.install(game_spec.atlas)
+
+        self._spec = game_spec
+        self.world = None
+        self.initial_player_state = initial_player_state
+        self.gui = None
+        self._events = event_manager.EventManager()
+        self._saves = saves.SaveManager.from_spec(game_spec)
+
+    def start_game(self) -> None:
+        """Creates the world, if it hasn't been already."""
+        if self.world is None:
+            game_sprite.warm_texture_cache(
+                [self._spec.player_spec, *self._spec.sprites.values()]
+            )
+            self.world = world.World(self, self._spec, self.initial_player_state)
+
+    def run(
+        self,
+        ticks: int,
+        delta_time: float = clock.DEFAULT_STEP_SECS,
+    ) -> RunStats:
+        """Runs the simulation for a number of ticks as fast as possible."""
+        self.start_game()
+        assert self.world is not None
+
+        start_game_time = self.world.game_time_sec
+        start = time.perf_counter()
+
+        for _ in range(ticks):
+            self.world.on_update(delta_time)
+
+        return RunStats(
+            ticks=ticks,
+            elapsed_secs=time.perf_counter() - start,
+            game_time_secs=self.world.game_time_sec - start_game_time,
+        )
+
+    def show_gui(self, _gui: scripts.GUI) -> None:
+        """Remembers the GUI, but doesn't show anything."""
+        self.gui = _gui
+
+    def play_sound(self, name: str) -> None:
+        """Does nothing, there's no sound when running headless."""
@@ -10,6 +10,9 @@ from engine import (
 )
 from engine.model import world
 
+# Where the profiler's trace is written when the user asks for it.
+TRACE_PATH = "trace.json"
+
 
 class InGameController:
     """
@@ -50,6 +53,18 @@ class InGameController:
         if symbol == arcade.key.ESCAPE:
             self._api.show_gui(self._menu_gui)
 
+        if symbol == arcade.key.F3:
+            self._toggle_profiler()
+
+        if symbol == arcade.key.F4:
+            self._world.profiler.dump_chrome_trace(TRACE_PATH)
+
+    def _toggle_profiler(self) -> None:
+        frame_profiler = self._world.profiler
+        frame_profiler.enabled = not frame_profiler.enabled
+        if frame_profiler.enabled:
+            frame_profiler.reset()
+
     def on_mouse_motion(self, screen_x: int, screen_y: int, dx: int, dy: int) -> None:
         """Handles when the mouse is moved."""
         # pylint: disable=unused-argument
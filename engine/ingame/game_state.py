@@ -45,6 +45,9 @@ class InGameState:
 
     def on_update(self, delta_time: float) -> None:
         """Triggers an update for the game."""
-        self.game_world.on_update(delta_time)
+        # Each update starts a new frame, so the last frame's draw calls are included
+        # in its totals.
+        self.game_world.profiler.end_frame()
+        self.game_world.advance(delta_time)
         self.view.on_update(delta_time)
         self.controller.on_update(delta_time)
@@ -16,6 +16,7 @@ class InGameViewTest(unittest.TestCase):
         world.tile_height = 32
         world.width = 100
         world.height = 100
+        world.interpolated_location = lambda sprite: (sprite.center_x, sprite.center_y)
         return world
 
     def create_camera(self):
@@ -38,6 +39,24 @@ class InGameViewTest(unittest.TestCase):
         camera.move_to.assert_called_with(
             pmath.Vec2(500 - CAMERA_SIZE / 2, 500 - CAMERA_SIZE / 2),
         )
+        # The world is told what's on screen, so it only draws that.
+        world.set_view_rect.assert_called_with(
+            (
+                500 - CAMERA_SIZE / 2,
+                500 - CAMERA_SIZE / 2,
+                500 + CAMERA_SIZE / 2,
+                500 + CAMERA_SIZE / 2,
+            )
+        )
+        # Scripts tick at full rate anywhere the camera can see, plus a margin.
+        world.set_script_focus.assert_called_with(
+            (
+                500 - CAMERA_SIZE / 2 - view.SCRIPT_FOCUS_MARGIN,
+                500 - CAMERA_SIZE / 2 - view.SCRIPT_FOCUS_MARGIN,
+                500 + CAMERA_SIZE / 2 + view.SCRIPT_FOCUS_MARGIN,
+                500 + CAMERA_SIZE / 2 + view.SCRIPT_FOCUS_MARGIN,
+            )
+        )
 
     @mock.patch("arcade.Camera")
     def test_camera_centering_edges(self, mock_camera):
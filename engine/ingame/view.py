@@ -9,10 +9,21 @@ import arcade
 import arcade.tilemap
 
 from engine import (
+    profiler,
     scripts,
 )
 from engine.model import world
 
+OVERLAY_MARGIN = 10
+OVERLAY_LINE_HEIGHT = 16
+OVERLAY_FONT_SIZE = 10
+OVERLAY_FONT = "Courier New"
+OVERLAY_COLOR = (255, 255, 0)
+
+# How far in pixels past the edges of the camera scripts still tick at full rate. This
+# keeps things that are about to walk on screen looking natural.
+SCRIPT_FOCUS_MARGIN = 128
+
 
 class InGameView:
     """
@@ -56,12 +67,32 @@ class InGameView:
 
     def on_draw(self) -> None:
         """Renders the view."""
-        self.camera.use()
-        self.game_world.draw()
+        frame_profiler = self.game_world.profiler
+
+        with frame_profiler.span("draw.scene"):
+            self.camera.use()
+            self.game_world.draw()
 
-        if self.gui is not None:
+        with frame_profiler.span("draw.gui"):
+            if self.gui is not None:
+                self.gui_camera.use()
+                self.gui.draw()
+
+        if frame_profiler.enabled:
             self.gui_camera.use()
-            self.gui.draw()
+            self._draw_profiler_overlay(frame_profiler)
+
+    def _draw_profiler_overlay(self, frame_profiler: profiler.Profiler) -> None:
+        top = self.gui_camera.viewport_height - OVERLAY_MARGIN
+        for i, line in enumerate(frame_profiler.overlay_lines()):
+            arcade.draw_text(
+                text=line,
+                start_x=OVERLAY_MARGIN,
+                start_y=top - (i + 1) * OVERLAY_LINE_HEIGHT,
+                color=OVERLAY_COLOR,
+                font_size=OVERLAY_FONT_SIZE,
+                font_name=OVERLAY_FONT,
+            )
 
     def on_update(self, delta_time: float) -> None:
         """Triggers an update for the view."""
@@ -76,7 +107,9 @@ class InGameView:
         )
 
     def _center_camera_to_player(self) -> None:
-        player = self.game_world.player_sprite
+        player_x, player_y = self.game_world.interpolated_location(
+            self.game_world.player_sprite,
+        )
 
         v_width = self.camera.viewport_width
         v_height = self.camera.viewport_height
@@ -88,7 +121,7 @@ class InGameView:
                 self.world_width - v_width,
                 max(
                     0,
-                    player.center_x - v_width / 2,
+                    player_x - v_width / 2,
                 ),
             )
 
@@ -99,8 +132,21 @@ class InGameView:
                 self.world_height - v_height,
                 max(
                     0,
-                    player.center_y - v_height / 2,
+                    player_y - v_height / 2,
                 ),
             )
 
         self.camera.move_to(pmath.Vec2(camera_x, camera_y))
+        self.game_world.set_view_rect(
+            (camera_x, camera_y, camera_x + v_width, camera_y + v_height)
+        )
+
+        # Let scripts that are well out of view tick less often.
+        self.game_world.set_script_focus(
+            (
+                camera_x - SCRIPT_FOCUS_MARGIN,
+                camera_y - SCRIPT_FOCUS_MARGIN,
+                camera_x + v_width + SCRIPT_FOCUS_MARGIN,
+                camera_y + v_height + SCRIPT_FOCUS_MARGIN,
+            )
+        )
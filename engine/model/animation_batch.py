@@ -0,0 +1,148 @@
+"""Advances the animations of many sprites at once.
+
+Each sprite in a batch has a slot in a set of arrays holding how far it is through its
+current animation, how long each frame lasts and how many frames there are. Every tick
+the arrays are advanced in one step, and only the sprites that have moved on to a new
+frame are told about it.
+
+A sprite can be in more than one batch, such as the player, who is in the physics
+engine of every region that's loaded. Each batch keeps its own slot for it, and the
+sprite restarts its animation in all of them.
+"""
+
+from typing import (
+    Dict,
+    List,
+    Protocol,
+    Tuple,
+)
+
+import numpy as np
+
+INITIAL_CAPACITY = 64
+
+
+class Animated(Protocol):
+    """Something whose animation is advanced by a batch."""
+
+    # The batches the sprite is in, kept up to date by the batches.
+    batches: List["AnimationBatch"]
+
+    @property
+    def frame_timing(self) -> Tuple[float, int]:
+        """Gets the seconds per frame and number of frames of the current animation."""
+
+    def show_frame(self, frame: int) -> None:
+        """Switches to a frame of the current animation."""
+
+
+class AnimationBatch:
+    """Holds the animation timing for a group of sprites in arrays."""
+
+    _members: List[Animated]
+    # Each member's slot.
+    _slots: Dict[Animated, int]
+
+    # All of these are indexed by slot. Only the first len(_members) entries are used.
+    _time_index: np.ndarray
+    _frame_speed: np.ndarray
+    _num_frames: np.ndarray
+    _frame: np.ndarray
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._members = []
+        self._slots = {}
+        self._time_index = np.zeros(capacity, dtype=np.float64)
+        self._frame_speed = np.ones(capacity, dtype=np.float64)
+        self._num_frames = np.ones(capacity, dtype=np.int64)
+        self._frame = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member: Animated) -> bool:
+        return member in self._slots
+
+    def add(self, member: Animated) -> None:
+        """Adds a sprite to the batch, starting its current animation from the top."""
+        if member in self:
+            return
+
+        slot = len(self._members)
+        if slot == len(self._time_index):
+            self._grow()
+
+        self._members.append(member)
+        self._slots[member] = slot
+        member.batches.append(self)
+        self.restart(member)
+
+    def remove(self, member: Animated) -> None:
+        """Takes a sprite out of the batch."""
+        slot = self._slots.pop(member, None)
+        if slot is None:
+            return
+
+        last = len(self._members) - 1
+
+        # Fill the gap with the last sprite, so the used slots stay together.
+        if slot != last:
+            moved = self._members[last]
+            self._members[slot] = moved
+            self._slots[moved] = slot
+            for array in self._arrays():
+                array[slot] = array[last]
+
+        self._members.pop()
+        member.batches.remove(self)
+
+    def restart(self, member: Animated) -> None:
+        """Starts a sprite's current animation from its first frame.
+
+        Call this whenever the sprite switches animations.
+        """
+        slot = self._slots[member]
+        frame_speed, num_frames = member.frame_timing
+
+        self._time_index[slot] = 0.0
+        self._frame_speed[slot] = frame_speed
+        self._num_frames[slot] = num_frames
+        self._frame[slot] = 0
+
+    def update(self, delta_time: float) -> int:
+        """Moves every animation on by a time step.
+
+        Returns how many sprites changed frames.
+        """
+        size = len(self._members)
+        if size == 0:
+            return 0
+
+        time_index = self._time_index[:size]
+        frame_speed = self._frame_speed[:size]
+        num_frames = self._num_frames[:size]
+
+        time_index += delta_time
+        np.fmod(time_index, frame_speed * num_frames, out=time_index)
+
+        frames = np.floor(time_index / frame_speed).astype(np.int64)
+        # Rounding can put the time right at the end of the last frame.
+        np.minimum(frames, num_frames - 1, out=frames)
+
+        changed = np.flatnonzero(frames != self._frame[:size])
+        self._frame[:size] = frames
+
+        for slot in changed.tolist():
+            self._members[slot].show_frame(int(frames[slot]))
+
+        return len(changed)
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return (self._time_index, self._frame_speed, self._num_frames, self._frame)
+
+    def _grow(self) -> None:
+        capacity = len(self._time_index) * 2
+        self._time_index = np.resize(self._time_index, capacity)
+        self._frame_speed = np.resize(self._frame_speed, capacity)
+        self._num_frames = np.resize(self._num_frames, capacity)
+        self._frame = np.resize(self._frame, capacity)
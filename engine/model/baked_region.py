@@ -0,0 +1,207 @@
+"""A cache of parsed Tiled maps, so that regions don't need their files parsed again.
+
+Baking a region pickles the map that pytiled_parser parsed from it, along with the
+list of files it was parsed from, into a file next to the map:
+
+    header:  magic, format version
+    body:    a pickle of {"sources": [paths relative to the baked file], "tiled_map": ...}
+
+A baked map is only used while its file is newer than the map and every tileset and
+image the map uses.
+
+This only saves parsing, which is a few milliseconds for the biggest region. Building
+the region's sprite lists from the parsed map still happens whenever it's loaded, and
+takes much longer.
+
+Unpickling can run arbitrary code, so only pytiled_parser's own classes and paths are
+allowed in a baked file. A file holding anything else is treated as corrupt.
+"""
+
+import dataclasses
+import io
+import json
+import os
+import pathlib
+import pickle
+import struct
+from typing import (
+    Any,
+    Iterable,
+    List,
+    Optional,
+)
+from xml.etree import ElementTree
+
+import pytiled_parser
+
+from engine import spec
+
+MAGIC = b"RGNB"
+FORMAT_VERSION = 3
+
+BAKED_SUFFIX = ".baked"
+
+_HEADER = struct.Struct("<4sH")
+
+# The only classes outside of pytiled_parser that a parsed map holds.
+_PATH_CLASSES = frozenset(
+    ("pathlib", name)
+    for name in ["Path", "PosixPath", "WindowsPath", "PurePosixPath", "PureWindowsPath"]
+)
+
+# What unpickling a map can raise, if pytiled_parser has changed since it was baked.
+_UNPICKLE_ERRORS = (
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+    EOFError,
+    TypeError,
+    ValueError,
+    IndexError,
+    KeyError,
+)
+
+
+class BakeError(Exception):
+    """Raised when a baked file can't be read."""
+
+
+def baked_path(region: spec.RegionSpec) -> str:
+    """Gets where the baked version of a region lives."""
+    return os.path.splitext(region.tiled_mapfile)[0] + BAKED_SUFFIX
+
+
+def is_fresh(region: spec.RegionSpec) -> bool:
+    """Determines if a region has a baked file that is newer than its sources."""
+    try:
+        return BakedRegion.read(baked_path(region)).is_fresh()
+    except (OSError, BakeError):
+        return False
+
+
+def bake(region: spec.RegionSpec) -> str:
+    """Bakes a region, returning the path of the baked file."""
+    tiled_map = pytiled_parser.parse_map(pathlib.Path(region.tiled_mapfile))
+    path = baked_path(region)
+    sources = [
+        os.path.relpath(source, os.path.dirname(path))
+        for source in sorted(set(_sources(region.tiled_mapfile, tiled_map)))
+    ]
+
+    # Write to a temporary file first so that a half-written file is never used.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+        pickle.dump(
+            {"sources": sources, "tiled_map": tiled_map},
+            out,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def _sources(mapfile: str, tiled_map: pytiled_parser.TiledMap) -> Iterable[str]:
+    """Finds the files that a map was parsed from."""
+    yield mapfile
+
+    # The parsed map doesn't say which tilesets were in files of their own.
+    directory = os.path.dirname(mapfile)
+    if mapfile.endswith(".json"):
+        with open(mapfile, encoding="utf-8") as infile:
+            tilesets = json.load(infile).get("tilesets", [])
+        sources = [tileset.get("source") for tileset in tilesets]
+    else:
+        root = ElementTree.parse(mapfile).getroot()
+        sources = [tileset.get("source") for tileset in root.iter("tileset")]
+    for source in sources:
+        if source:
+            yield os.path.join(directory, source)
+
+    for tileset in tiled_map.tilesets.values():
+        if tileset.image is not None:
+            yield str(tileset.image)
+        for tile in (tileset.tiles or {}).values():
+            if tile.image is not None:
+                yield str(tile.image)
+
+
+class _MapUnpickler(pickle.Unpickler):
+    """Unpickles a parsed map, refusing to load anything else."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) in _PATH_CLASSES:
+            return super().find_class(module, name)
+
+        if module.startswith("pytiled_parser."):
+            cls = super().find_class(module, name)
+            # Only classes defined there, not anything else the module imported.
+            if isinstance(cls, type) and cls.__module__.startswith("pytiled_parser."):
+                return cls
+
+        raise pickle.UnpicklingError(f"{module}.{name} isn't allowed in a baked map.")
+
+
+@dataclasses.dataclass
+class BakedRegion:
+    """A region's parsed map, read from its baked file."""
+
+    path: str
+    # The files it was baked from, relative to it.
+    sources: List[str]
+    tiled_map: pytiled_parser.TiledMap
+
+    @classmethod
+    def read(cls, path: str) -> "BakedRegion":
+        """Reads a baked file.
+
+        Raises:
+            OSError: if the file can't be read.
+            BakeError: if it isn't a baked region, or its map can't be unpickled, such
+                       as after pytiled_parser was upgraded.
+        """
+        with open(path, "rb") as infile:
+            data = infile.read()
+
+        if len(data) < _HEADER.size:
+            raise BakeError(f"{path} is too short.")
+        magic, version = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise BakeError(f"{path} isn't a baked region.")
+        if version != FORMAT_VERSION:
+            raise BakeError(f"{path} has unsupported format version {version}.")
+
+        try:
+            body = _MapUnpickler(io.BytesIO(data[_HEADER.size :])).load()
+            sources = [str(source) for source in body["sources"]]
+            tiled_map = body["tiled_map"]
+        except _UNPICKLE_ERRORS as error:
+            raise BakeError(f"Could not unpickle {path}: {error!r}") from error
+
+        if not isinstance(tiled_map, pytiled_parser.TiledMap):
+            raise BakeError(f"{path} doesn't hold a map.")
+        return cls(path=path, sources=sources, tiled_map=tiled_map)
+
+    def is_fresh(self) -> bool:
+        """Determines if the file is newer than everything it was baked from."""
+        directory = os.path.dirname(self.path)
+        try:
+            baked_time = os.path.getmtime(self.path)
+            return all(
+                os.path.getmtime(os.path.join(directory, source)) <= baked_time
+                for source in self.sources
+            )
+        except OSError:
+            # A source was removed.
+            return False
+
+
+def load_tiled_map(region: spec.RegionSpec) -> Optional[pytiled_parser.TiledMap]:
+    """Loads a region's Tiled map from its baked file, if there's a fresh one."""
+    try:
+        baked = BakedRegion.read(baked_path(region))
+    except (OSError, BakeError):
+        return None
+
+    return baked.tiled_map if baked.is_fresh() else None
@@ -0,0 +1,314 @@
+"""Draws only the parts of a scene that the camera can see.
+
+Each culled layer of a scene keeps its sprites in a spatial index, along with a second
+sprite list holding just the ones near the camera. Drawing a layer draws that list, so
+the cost of drawing a region depends on how much of it is on screen rather than how
+big it is.
+
+Tile layers that never change are split into chunks instead (see tile_chunks.py), and
+only the chunks near the camera are drawn.
+
+Working out what's near the camera only happens when the view moves into a different
+block of the map, rather than every frame. Layers whose sprites move have them
+re-indexed as they go.
+"""
+
+import math
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import arcade
+
+from engine.model import (
+    spatial,
+    tile_chunks,
+)
+
+# How far past the edges of the view sprites are still drawn, in pixels. This covers
+# sprites being drawn a little away from where they are, and sprites partly on screen.
+DEFAULT_MARGIN = 32
+
+# The view is rounded out to multiples of this many pixels. The visible sprites are
+# only worked out again when the rounded view changes.
+VIEW_SNAP = 128
+
+
+def _has_texture(sprite: arcade.Sprite) -> bool:
+    """Determines if a sprite has anything to draw, like a script zone doesn't."""
+    return sprite.texture is not None
+
+
+class CulledLayer:
+    """Keeps the sprites of a layer that are near the view in their own sprite list."""
+
+    source: arcade.SpriteList
+
+    _grid: spatial.SpatialGrid[arcade.Sprite]
+    _view: Optional[spatial.Rect]
+    # Created the first time there's a view.
+    _visible: Optional[arcade.SpriteList]
+    _visible_set: Set[arcade.Sprite]
+
+    def __init__(
+        self,
+        source: arcade.SpriteList,
+        cell_size: float = spatial.DEFAULT_CELL_SIZE,
+    ):
+        self.source = source
+        self._grid = spatial.SpatialGrid(cell_size)
+        self._view = None
+        self._visible = None
+        self._visible_set = set()
+
+        for sprite in source:
+            self._grid.insert(sprite, spatial.draw_rect(sprite))
+
+    def __len__(self) -> int:
+        return len(self._grid)
+
+    @property
+    def visible_count(self) -> int:
+        """Gets how many sprites would be drawn."""
+        return len(self._visible_set)
+
+    def set_view(self, rect: spatial.Rect) -> None:
+        """Sets the area to draw sprites from."""
+        if rect == self._view:
+            return
+
+        self._view = rect
+        if self._visible is None:
+            # Lazy, so that it's only given GL buffers once it's drawn.
+            self._visible = arcade.SpriteList(lazy=True)
+
+        now_visible = {
+            sprite for sprite in self._grid.query(rect) if _has_texture(sprite)
+        }
+
+        for sprite in self._visible_set - now_visible:
+            self._visible.remove(sprite)
+        for sprite in now_visible - self._visible_set:
+            self._visible.append(sprite)
+
+        self._visible_set = now_visible
+
+    def add(self, sprite: arcade.Sprite) -> None:
+        """Indexes a sprite that was added to the layer."""
+        self._grid.insert(sprite, spatial.draw_rect(sprite))
+        self._update_visibility(sprite)
+
+    def remove(self, sprite: arcade.Sprite) -> None:
+        """Forgets a sprite that was removed from the layer."""
+        self._grid.remove(sprite)
+        self._hide(sprite)
+
+    def clear(self) -> None:
+        """Forgets every sprite in the layer."""
+        self._grid.clear()
+        for sprite in list(self._visible_set):
+            self._hide(sprite)
+
+    def move(self, sprite: arcade.Sprite) -> None:
+        """Re-indexes a sprite after it has moved, if it's in the layer."""
+        if sprite not in self._grid:
+            return
+
+        rect = spatial.draw_rect(sprite)
+        if rect == self._grid.rect(sprite):
+            return
+
+        self._grid.insert(sprite, rect)
+        self._update_visibility(sprite)
+
+    def draw(self) -> None:
+        """Draws the layer, or the part of it near the view if there is one."""
+        if self._visible is None:
+            self.source.draw()
+        else:
+            self._visible.draw()
+
+    def _update_visibility(self, sprite: arcade.Sprite) -> None:
+        if self._view is None or self._visible is None:
+            return
+
+        if _has_texture(sprite) and spatial.rects_overlap(
+            self._view, self._grid.rect(sprite)
+        ):
+            if sprite not in self._visible_set:
+                self._visible_set.add(sprite)
+                self._visible.append(sprite)
+        else:
+            self._hide(sprite)
+
+    def _hide(self, sprite: arcade.Sprite) -> None:
+        if sprite in self._visible_set:
+            self._visible_set.remove(sprite)
+            assert self._visible is not None
+            self._visible.remove(sprite)
+
+
+class SceneCuller:
+    """Draws a scene, skipping sprites in chosen layers that are far from the view."""
+
+    scene: arcade.Scene
+    margin: float
+
+    _layers: Dict[str, CulledLayer]
+    _static_layers: Dict[str, tile_chunks.ChunkedLayer]
+    # Culled layers by the identity of the sprite list they replace when drawing.
+    _by_list: Dict[int, Union[CulledLayer, tile_chunks.ChunkedLayer]]
+    # Sprite lists that are drawn as part of an earlier static layer's chunks.
+    _merged: Set[int]
+    _view: Optional[spatial.Rect]
+
+    def __init__(
+        self,
+        scene: arcade.Scene,
+        layer_names: Iterable[str],
+        static_layer_names: Iterable[str] = (),
+        chunk_size: Tuple[float, float] = tile_chunks.DEFAULT_CHUNK_SIZE,
+        margin: float = DEFAULT_MARGIN,
+    ):
+        """Constructs a culler.
+
+        Args:
+            scene: The scene to draw.
+            layer_names: The layers of the scene to cull. Any others are always drawn
+                         in full.
+            static_layer_names: Layers to cull whose sprites never move, added or
+                                removed. These are drawn in chunks, with layers that
+                                are drawn one after another sharing them.
+            chunk_size: The size in pixels of the chunks that static layers are split
+                        into.
+            margin: How far past the edges of the view to keep drawing sprites.
+        """
+        self.scene = scene
+        self.margin = margin
+        self._layers = {}
+        self._static_layers = {}
+        self._by_list = {}
+        self._merged = set()
+        self._view = None
+
+        for name in layer_names:
+            layer = CulledLayer(scene.get_sprite_list(name))
+            self._layers[name] = layer
+            self._by_list[id(layer.source)] = layer
+
+        static_names = {
+            id(scene.get_sprite_list(name)): name for name in static_layer_names
+        }
+        run: List[arcade.SpriteList] = []
+        for sprite_list in [*scene.sprite_lists, None]:
+            if sprite_list is not None and id(sprite_list) in static_names:
+                run.append(sprite_list)
+                continue
+
+            if run:
+                self._add_static_run(run, static_names, chunk_size)
+                run = []
+
+    def _add_static_run(
+        self,
+        run: List[arcade.SpriteList],
+        static_names: Dict[int, str],
+        chunk_size: Tuple[float, float],
+    ) -> None:
+        """Chunks static layers that are drawn one after another."""
+        merged = tile_chunks.ChunkedLayer(run, chunk_size)
+        if len(run) > 1 and merged.spills:
+            # Sharing chunks would draw these layers in the wrong order.
+            static_layers = [
+                tile_chunks.ChunkedLayer([sprite_list], chunk_size)
+                for sprite_list in run
+            ]
+        else:
+            static_layers = [merged]
+
+        for static_layer in static_layers:
+            first, *rest = static_layer.sources
+            self._by_list[id(first)] = static_layer
+            for sprite_list in static_layer.sources:
+                self._static_layers[static_names[id(sprite_list)]] = static_layer
+            self._merged.update(id(sprite_list) for sprite_list in rest)
+
+    def layer(self, name: str) -> Optional[CulledLayer]:
+        """Gets one of the culled layers."""
+        return self._layers.get(name)
+
+    def static_layer(self, name: str) -> Optional[tile_chunks.ChunkedLayer]:
+        """Gets the static layer that draws one of the scene's layers."""
+        return self._static_layers.get(name)
+
+    def add(self, name: str, sprites: Iterable[arcade.Sprite]) -> None:
+        """Indexes sprites that were added to a layer."""
+        layer = self._layers.get(name)
+        if layer is not None:
+            for sprite in sprites:
+                layer.add(sprite)
+
+    def remove(self, name: str, sprite: arcade.Sprite) -> None:
+        """Forgets a sprite that was removed from a layer."""
+        layer = self._layers.get(name)
+        if layer is not None:
+            layer.remove(sprite)
+
+    def clear(self, name: str) -> None:
+        """Forgets every sprite in a layer."""
+        layer = self._layers.get(name)
+        if layer is not None:
+            layer.clear()
+
+    @property
+    def visible_count(self) -> int:
+        """Gets how many sprites in culled layers would be drawn."""
+        return sum(layer.visible_count for layer in self._by_list.values())
+
+    def set_view(self, rect: Optional[spatial.Rect]) -> None:
+        """Sets the area of the map that is on screen. None draws everything."""
+        if rect is None:
+            self._view = None
+            return
+
+        left, bottom, right, top = rect
+        snapped = (
+            math.floor((left - self.margin) / VIEW_SNAP) * VIEW_SNAP,
+            math.floor((bottom - self.margin) / VIEW_SNAP) * VIEW_SNAP,
+            math.ceil((right + self.margin) / VIEW_SNAP) * VIEW_SNAP,
+            math.ceil((top + self.margin) / VIEW_SNAP) * VIEW_SNAP,
+        )
+        if snapped == self._view:
+            return
+
+        self._view = snapped
+        for layer in self._by_list.values():
+            layer.set_view(snapped)
+
+    def move(self, sprites: Iterable[arcade.Sprite]) -> None:
+        """Re-indexes sprites that may have moved."""
+        for layer in self._layers.values():
+            for sprite in sprites:
+                layer.move(sprite)
+
+    def draw(self) -> None:
+        """Draws the scene in its usual order."""
+        if self._view is None:
+            self.scene.draw()
+            return
+
+        for sprite_list in self.scene.sprite_lists:
+            if id(sprite_list) in self._merged:
+                continue
+
+            layer = self._by_list.get(id(sprite_list))
+            if layer is None:
+                sprite_list.draw()
+            else:
+                layer.draw()
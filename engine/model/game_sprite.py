@@ -1,21 +1,146 @@
 import dataclasses
+import enum
 import math
 from os import path
 from typing import (
     Any,
     Dict,
+    FrozenSet,
+    Iterable,
     List,
     Optional,
     Tuple,
+    Union,
 )
 
 import arcade
 import arcade.texture
 
 from engine import (
+    atlas,
     scripts,
     spec,
 )
+from engine.model import animation_batch
+
+
+# Textures for each animation, shared by every sprite that uses the same sheet. Keyed by
+# (sprite root directory, animation name, frame width, frame height, frame count).
+_TextureKey = Tuple[str, str, int, int, int]
+_TEXTURE_CACHE: Dict[_TextureKey, List[arcade.texture.Texture]] = {}
+
+
+def load_animation_textures(
+    sprite_spec: spec.GameSpriteSpec,
+    name: str,
+) -> List[arcade.texture.Texture]:
+    """Gets the frames for one of a sprite's animations.
+
+    Sheets are only loaded the first time they're asked for, from the installed atlas if
+    they're in it.
+    """
+    animation_spec = sprite_spec.animations[name]
+    key = (
+        sprite_spec.root_directory,
+        name,
+        sprite_spec.width,
+        sprite_spec.height,
+        animation_spec.num_frames,
+    )
+
+    textures = _TEXTURE_CACHE.get(key)
+    if textures is None:
+        textures = atlas.load_spritesheet(
+            path.join(sprite_spec.root_directory, f"{name}.png"),
+            sprite_width=sprite_spec.width,
+            sprite_height=sprite_spec.height,
+            columns=animation_spec.num_frames,
+            count=animation_spec.num_frames,
+        )
+        _TEXTURE_CACHE[key] = textures
+
+    return textures
+
+
+def warm_texture_cache(sprite_specs: Iterable[spec.GameSpriteSpec]) -> None:
+    """Loads the animations for some sprites so that creating them later is cheap."""
+    for sprite_spec in sprite_specs:
+        for name in sprite_spec.animations:
+            load_animation_textures(sprite_spec, name)
+
+
+def clear_texture_cache() -> None:
+    """Forgets every loaded animation."""
+    _TEXTURE_CACHE.clear()
+
+
+class AnimationState(str, enum.Enum):
+    """What a sprite is doing, which picks the animation it shows."""
+
+    IDLE = "idle"
+    WALK = "walk"
+    ACTIVATE = "activate"
+
+
+class Direction(str, enum.Enum):
+    """Which way a sprite is facing."""
+
+    UP = "up"
+    DOWN = "down"
+    LEFT = "left"
+    RIGHT = "right"
+
+
+class AnimationTable:
+    """Works out which animation a sprite shows for a state and a direction.
+
+    A sprite shows "<state>-<direction>" if its spec has that animation, otherwise just
+    "<state>". The answers for the built-in states are worked out up front. Custom
+    states, which scripts can set to any string, are added the first time they're seen.
+    """
+
+    __slots__ = ("_names", "_resolved")
+
+    _names: FrozenSet[str]
+    _resolved: Dict[Tuple[str, Direction], str]
+
+    def __init__(self, names: Iterable[str]):
+        self._names = frozenset(names)
+        self._resolved = {}
+
+        for state in AnimationState:
+            for direction in Direction:
+                self.resolve(state, direction)
+
+    def resolve(self, state: Union[AnimationState, str], direction: Direction) -> str:
+        """Gets the name of the animation to show."""
+        # AnimationStates hash and compare like their values, so custom states that
+        # match a built-in one share its entry.
+        name = self._resolved.get((state, direction))
+        if name is None:
+            base = state.value if isinstance(state, AnimationState) else state
+            name = f"{base}-{direction.value}"
+            if name not in self._names:
+                name = base
+            self._resolved[(state, direction)] = name
+
+        return name
+
+
+# Tables only depend on which animations a spec has, so specs with the same set share
+# one.
+_ANIMATION_TABLES: Dict[FrozenSet[str], AnimationTable] = {}
+
+
+def animation_table(sprite_spec: spec.GameSpriteSpec) -> AnimationTable:
+    """Gets the animation table for a sprite spec."""
+    names = frozenset(sprite_spec.animations)
+
+    table = _ANIMATION_TABLES.get(names)
+    if table is None:
+        table = _ANIMATION_TABLES[names] = AnimationTable(names)
+
+    return table
 
 
 @dataclasses.dataclass
@@ -31,10 +156,14 @@ class Animations:
 
     # Mapping from animation name to the animation details.
     animations: Dict[str, Animation]
+    # Picks which of the animations to show.
+    table: AnimationTable
     # Name of the animation that is currently selected.
     current_animation: str
     # How much time we we've spent in the current animation.
     time_index: float
+    # Which frame of the current animation is showing.
+    current_frame: int
 
     texture: arcade.Texture
 
@@ -42,16 +171,11 @@ class Animations:
         self.animations = {
             name: Animation(
                 spec=animation_spec,
-                textures=arcade.load_spritesheet(
-                    file_name=path.join(sprite_spec.root_directory, f"{name}.png"),
-                    sprite_width=sprite_spec.width,
-                    sprite_height=sprite_spec.height,
-                    columns=animation_spec.num_frames,
-                    count=animation_spec.num_frames,
-                ),
+                textures=load_animation_textures(sprite_spec, name),
             )
             for name, animation_spec in sprite_spec.animations.items()
         }
+        self.table = animation_table(sprite_spec)
         self._reset_animation(sprite_spec.initial_animation)
 
     def _reset_animation(self, name: str) -> None:
@@ -60,28 +184,48 @@ class Animations:
         current_animation = self.animations[name]
 
         self.time_index = 0.0
+        self.current_frame = 0
         self.texture = current_animation.textures[0]
 
     def has_animation(self, name: str) -> bool:
         """Determines if the sequence has an animation with this name."""
         return name in self.animations
 
-    def set_animation(self, name: str) -> None:
+    def set_animation(self, name: str) -> bool:
         """Changes the current animation for the sprite.
 
         Args:
             name: Which animation to show, as defined in the sprite's spec.
 
+        Returns:
+            Whether the animation changed.
+
         Raises:
             KeyError: if there is no animation with that name.
         """
         if self.current_animation == name:
-            return
+            return False
 
         self._reset_animation(name)
+        return True
 
-    def update(self, delta_time: float):
-        """Progresses the animation by a certain time step."""
+    @property
+    def frame_timing(self) -> Tuple[float, int]:
+        """Gets the seconds per frame and number of frames of the current animation."""
+        current_animation = self.animations[self.current_animation]
+        return (current_animation.spec.frame_speed, len(current_animation.textures))
+
+    def show_frame(self, frame: int) -> None:
+        """Switches to a frame of the current animation."""
+        self.current_frame = frame
+        self.texture = self.animations[self.current_animation].textures[frame]
+
+    def update(self, delta_time: float) -> bool:
+        """Progresses the animation by a certain time step.
+
+        Returns:
+            Whether a new frame is showing.
+        """
         current_animation = self.animations[self.current_animation]
         sequence_duration = (
             len(current_animation.textures) * current_animation.spec.frame_speed
@@ -89,7 +233,11 @@ class Animations:
         self.time_index = (self.time_index + delta_time) % sequence_duration
         current_frame = math.floor(self.time_index / current_animation.spec.frame_speed)
 
-        self.texture = current_animation.textures[current_frame]
+        if current_frame == self.current_frame:
+            return False
+
+        self.show_frame(current_frame)
+        return True
 
 
 @dataclasses.dataclass
@@ -113,6 +261,9 @@ class GameSprite(arcade.Sprite):
     animations: Optional[Animations] = None
     script: Optional[scripts.Script] = None
 
+    # The batches advancing the sprite's animation, if it isn't doing that itself.
+    batches: List[animation_batch.AnimationBatch]
+
     # X and Y directions that the character is facing.
     facing_x: float
     facing_y: float
@@ -138,6 +289,7 @@ class GameSprite(arcade.Sprite):
             image_height=height,
         )
         self._name = name
+        self.batches = []
         self.set_facing(x=1.0, y=1.0)
         self._spec = sprite_spec
         self.script = script
@@ -160,35 +312,59 @@ class GameSprite(arcade.Sprite):
         if self.animations is None:
             return
 
-        animation = self._animation_state()
-        direction = self._get_direction()
+        key = self.animations.table.resolve(
+            self._animation_state(),
+            self._get_direction(),
+        )
+
+        # Changing the texture makes arcade update the sprite's hit box and re-upload
+        # its sprite lists' texture data, so only do it when there's a new frame.
+        changed = self.animations.set_animation(key)
 
-        key = f"{animation}-{direction}"
+        if self.batches:
+            # The batches move the frames along, this only has to notice new animations.
+            if changed:
+                for batch in self.batches:
+                    batch.restart(self)
+                self.texture = self.animations.texture
+            return
 
-        if not self.animations.has_animation(key):
-            key = animation
+        changed = self.animations.update(delta_time) or changed
+        if changed:
+            self.texture = self.animations.texture
 
-        self.animations.set_animation(key)
-        self.animations.update(delta_time)
+    @property
+    def frame_timing(self) -> Tuple[float, int]:
+        """Gets the seconds per frame and number of frames of the current animation."""
+        assert self.animations is not None
+        return self.animations.frame_timing
+
+    def show_frame(self, frame: int) -> None:
+        """Switches to a frame of the current animation."""
+        assert self.animations is not None
+        self.animations.show_frame(frame)
         self.texture = self.animations.texture
 
-    def _animation_state(self) -> str:
-        """Determines which 'animation state' we're in."""
+    def _animation_state(self) -> Union[AnimationState, str]:
+        """Determines which 'animation state' we're in.
+
+        Custom animations set by scripts are returned as they are.
+        """
         if self.custom_animation:
             return self.custom_animation
 
         if self.change_x != 0 or self.change_y != 0:
-            return "walk"
+            return AnimationState.WALK
 
-        return "idle"
+        return AnimationState.IDLE
 
-    def _get_direction(self) -> str:
+    def _get_direction(self) -> Direction:
         afx, afy = abs(self.facing_x), abs(self.facing_y)
 
         if afy > afx:
-            return "up" if self.facing_y > 0 else "down"
+            return Direction.UP if self.facing_y > 0 else Direction.DOWN
 
-        return "right" if self.facing_x > 0 else "left"
+        return Direction.RIGHT if self.facing_x > 0 else Direction.LEFT
 
     @property
     def name(self) -> str:
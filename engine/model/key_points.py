@@ -0,0 +1,92 @@
+"""A table of a region's key points, built once when the region loads."""
+
+import types
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import arcade
+
+from engine import scripts
+from engine.model import (
+    prefix_index,
+    shapes,
+    spatial,
+)
+
+
+class KeyPointTable:
+    """Holds the key points for a region.
+
+    Key points never change while a region is loaded, so they are parsed once and the
+    same instances are handed out to everyone who asks for them.
+    """
+
+    __slots__ = ("_points", "_by_name", "_by_prefix", "_grid")
+
+    # In the order they appear in the map.
+    _points: Tuple[scripts.KeyPoint, ...]
+    _by_name: Dict[str, scripts.KeyPoint]
+    _by_prefix: prefix_index.PrefixIndex[scripts.KeyPoint]
+    # Holds indices into _points.
+    _grid: spatial.SpatialGrid[int]
+
+    def __init__(self, points: Tuple[scripts.KeyPoint, ...] = ()):
+        self._points = points
+        self._by_name = {}
+        self._by_prefix = prefix_index.PrefixIndex()
+        self._grid = spatial.SpatialGrid()
+
+        for i, point in enumerate(points):
+            # If names are repeated, the first one wins, like it would for a search.
+            if point.name not in self._by_name:
+                self._by_name[point.name] = point
+                self._by_prefix.insert(point.name, point)
+
+            self._grid.insert(i, point.location + point.location)
+
+    @classmethod
+    def from_objects(cls, objects: List[arcade.TiledObject]) -> "KeyPointTable":
+        """Builds a table from the objects in a "Key Points" layer."""
+        points = []
+
+        for obj in objects:
+            if obj.name is None:
+                continue
+
+            shape = shapes.tiled_object_shape(obj)
+            points.append(
+                scripts.KeyPoint(
+                    name=obj.name,
+                    location=(shape.center_x, shape.center_y),
+                    properties=types.MappingProxyType(dict(obj.properties or {})),
+                )
+            )
+
+        return cls(tuple(points))
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __iter__(self) -> Iterator[scripts.KeyPoint]:
+        return iter(self._points)
+
+    def get(self, name: str) -> Optional[scripts.KeyPoint]:
+        """Gets a key point by its exact name."""
+        return self._by_name.get(name)
+
+    def containing(self, text: str) -> List[scripts.KeyPoint]:
+        """Gets the key points with some text in their names, in map order."""
+        return [point for point in self._points if text in point.name]
+
+    def with_prefix(self, prefix: str) -> List[scripts.KeyPoint]:
+        """Gets the key points whose names start with a prefix, in name order."""
+        return sorted(self._by_prefix.with_prefix(prefix), key=lambda p: p.name)
+
+    def within(self, rect: spatial.Rect) -> List[scripts.KeyPoint]:
+        """Gets the key points inside a rectangle, in map order."""
+        return [self._points[i] for i in sorted(self._grid.query(rect))]
@@ -2,26 +2,69 @@ from typing import (
     Callable,
     Iterable,
     List,
+    Optional,
     Tuple,
 )
 
 import arcade
 
-from engine.model import game_sprite
+from engine import profiler
+from engine.model import (
+    animation_batch,
+    game_sprite,
+    spatial,
+    wall_grid,
+)
+
+# How many times a swept sprite may hit a wall and slide along it in a single update.
+MAX_SWEEP_ITERATIONS = 3
+
+# Swept sprites stop this many pixels short of a wall, so that floating point error
+# doesn't leave them overlapping it and snagging on the next tile along.
+SWEEP_SKIN = 0.01
 
 
 class Engine:
     """Our implementation of a physics engine."""
 
     moveable_sprites: List[game_sprite.GameSprite]
+    static_sprites: List[game_sprite.GameSprite]
     wall_sprite_list: arcade.SpriteList
     map_size: Tuple[float, float]
 
+    # Broad phase for sprite-vs-sprite collisions, keyed by index in moveable_sprites.
+    # Sprites are only moved in it when their bounding box changes.
+    _grid: spatial.SpatialGrid[int]
+    # Index of the static sprites, keyed by index in static_sprites. Since they never
+    # move, this is only rebuilt when one is removed.
+    _static_grid: spatial.SpatialGrid[int]
+
+    # When set, sprites are swept along their path against the walls instead of only
+    # having their end position tested.
+    swept: bool
+    _wall_grid: spatial.SpatialGrid[arcade.Sprite]
+
+    # When set, walls are looked up by tile instead of checking the wall sprite list.
+    _wall_bitmap: Optional[wall_grid.WallGrid]
+
+    # The moveable sprites whose positions changed in the last update.
+    moved_sprites: List[game_sprite.GameSprite]
+
+    # Advances the animations of every moveable sprite together.
+    _animations: animation_batch.AnimationBatch
+
+    _profiler: profiler.Profiler
+
     def __init__(
         self,
         moveable_sprites: Iterable[game_sprite.GameSprite],
         wall_sprite_list: arcade.SpriteList,
         map_size: Tuple[float, float],
+        cell_size: float = spatial.DEFAULT_CELL_SIZE,
+        static_sprites: Iterable[game_sprite.GameSprite] = (),
+        swept: bool = False,
+        frame_profiler: Optional[profiler.Profiler] = None,
+        walls: Optional[wall_grid.WallGrid] = None,
     ):
         """Constructs a new physics engine.
 
@@ -33,21 +76,74 @@ class Engine:
                               have a truthy "solid" property will not move.
             wall_sprite_list: A sprite list representing immoveable wall tiles.
             map_size: The size of the map in pixels.
+            cell_size: The size in pixels of the cells used to find which sprites are
+                       near each other.
+            static_sprites: Sprites that never move, like script zones. These are not
+                            moved or animated, and are only checked for collisions
+                            against moveable sprites.
+            swept: Turns on continuous collision detection against walls. Each sprite
+                   stops at the point where it first touches a wall and slides along
+                   it, rather than tunnelling through thin walls or stopping dead.
+            frame_profiler: Used to time each phase of an update.
+            walls: A grid of the tiles in wall_sprite_list. If given, it's used to
+                   check for collisions with walls instead of the sprite list.
         """
 
-        self.moveable_sprites = list(moveable_sprites)
+        self.moveable_sprites = []
+        self.moved_sprites = []
+        self._animations = animation_batch.AnimationBatch()
+        self._grid = spatial.SpatialGrid(cell_size)
+        self.add_sprites(moveable_sprites)
         self.wall_sprite_list = wall_sprite_list
         self.map_size = map_size
 
+        self.static_sprites = []
+        self._static_grid = spatial.SpatialGrid(cell_size)
+        self.add_static_sprites(static_sprites)
+
+        self._profiler = frame_profiler or profiler.Profiler()
+        self.swept = swept
+        self._wall_bitmap = walls
+        self._wall_grid = spatial.SpatialGrid(cell_size)
+        if swept:
+            for wall in wall_sprite_list:
+                self._wall_grid.insert(wall, spatial.sprite_rect(wall))
+
     def add_sprites(self, sprites: Iterable[game_sprite.GameSprite]) -> None:
         """Adds a number of sprites to the engine."""
-        self.moveable_sprites.extend(sprites)
+        for sprite in sprites:
+            self._grid.insert(len(self.moveable_sprites), spatial.sprite_rect(sprite))
+            self.moveable_sprites.append(sprite)
+            if sprite.animations is not None:
+                self._animations.add(sprite)
+
+    def add_static_sprites(self, sprites: Iterable[game_sprite.GameSprite]) -> None:
+        """Adds a number of sprites that never move to the engine."""
+        for sprite in sprites:
+            self._static_grid.insert(
+                len(self.static_sprites), spatial.sprite_rect(sprite)
+            )
+            self.static_sprites.append(sprite)
 
     def remove_sprite(self, name: str) -> None:
         """Removes a sprite from the physics engine."""
+        for sprite in self.moveable_sprites:
+            if sprite.name == name:
+                self._animations.remove(sprite)
         self.moveable_sprites = [
             sprite for sprite in self.moveable_sprites if sprite.name != name
         ]
+        # The indices after the removed sprite have all shifted down.
+        self._grid.clear()
+        for i, sprite in enumerate(self.moveable_sprites):
+            self._grid.insert(i, spatial.sprite_rect(sprite))
+
+        self.static_sprites = [
+            sprite for sprite in self.static_sprites if sprite.name != name
+        ]
+        self._static_grid.clear()
+        for i, sprite in enumerate(self.static_sprites):
+            self._static_grid.insert(i, spatial.sprite_rect(sprite))
 
     def update(
         self,
@@ -58,55 +154,157 @@ class Engine:
 
         self._move_sprites(delta_time, on_collide)
 
-        for sprite in self.moveable_sprites:
-            sprite.on_update(delta_time)
+        with self._profiler.span("physics.animations"):
+            # Sprites pick which animation to show, then the batch moves them all on.
+            for sprite in self.moveable_sprites:
+                sprite.on_update(delta_time)
+            self._animations.update(delta_time)
 
     def _move_sprites(
         self,
         delta_time: float,
         on_collide: Callable[[game_sprite.GameSprite, game_sprite.GameSprite], None],
     ) -> None:
-        collisions = set()
+        # Collisions are reported in the order of the sprite lists, so that scripts
+        # reacting to them behave the same way every time.
+        collisions = []
+        static_collisions = []
 
         original_positions = [
             (sprite.center_x, sprite.center_y) for sprite in self.moveable_sprites
         ]
 
         # First, check against walls.
-        for i, sprite in enumerate(self.moveable_sprites):
-            if sprite.change_x != 0:
-                sprite.center_x += sprite.change_x * delta_time
+        with self._profiler.span("physics.walls"):
+            for i, sprite in enumerate(self.moveable_sprites):
+                if self.swept:
+                    self._sweep_sprite(sprite, delta_time)
+                    continue
+
+                if sprite.change_x != 0:
+                    sprite.center_x += sprite.change_x * delta_time
 
-                if self._collides_with_wall(sprite) or self._is_oob(sprite):
-                    sprite.center_x = original_positions[i][0]
+                    if self._collides_with_wall(sprite) or self._is_oob(sprite):
+                        sprite.center_x = original_positions[i][0]
 
-            if sprite.change_y != 0:
-                sprite.center_y += sprite.change_y * delta_time
+                if sprite.change_y != 0:
+                    sprite.center_y += sprite.change_y * delta_time
 
-                if self._collides_with_wall(sprite) or self._is_oob(sprite):
-                    sprite.center_y = original_positions[i][1]
+                    if self._collides_with_wall(sprite) or self._is_oob(sprite):
+                        sprite.center_y = original_positions[i][1]
 
-        # Now check against other moving sprites.
-        sprites_to_revert = set()
+        # Now check against other moving sprites. Only sprites whose bounding boxes
+        # overlap get the more expensive polygon check.
+        with self._profiler.span("physics.collisions"):
+            sprites_to_revert = set()
 
-        for i, sprite1 in enumerate(self.moveable_sprites):
-            is_solid = sprite1.properties.get("solid", False)
-            for j in range(i + 1, len(self.moveable_sprites)):
-                sprite2 = self.moveable_sprites[j]
-                if arcade.check_for_collision(sprite1, sprite2):
-                    if is_solid or sprite2.properties.get("solid", False):
-                        sprites_to_revert.add(i)
-                        sprites_to_revert.add(j)
-                    collisions.add((i, j))
+            # Hit boxes can change with the animation frame as well as the position,
+            # so this compares the whole bounding box.
+            for i, sprite in enumerate(self.moveable_sprites):
+                rect = spatial.sprite_rect(sprite)
+                if rect != self._grid.rect(i):
+                    self._grid.insert(i, rect)
 
-        for idx in sprites_to_revert:
-            sprite = self.moveable_sprites[idx]
-            sprite.center_x, sprite.center_y = original_positions[idx]
+            for i, sprite1 in enumerate(self.moveable_sprites):
+                is_solid = sprite1.properties.get("solid", False)
+                rect = self._grid.rect(i)
 
-        for idx1, idx2 in collisions:
-            on_collide(self.moveable_sprites[idx1], self.moveable_sprites[idx2])
+                for j in sorted(self._grid.query(rect)):
+                    if j <= i:
+                        continue
+                    sprite2 = self.moveable_sprites[j]
+                    if arcade.check_for_collision(sprite1, sprite2):
+                        if is_solid or sprite2.properties.get("solid", False):
+                            sprites_to_revert.add(i)
+                            sprites_to_revert.add(j)
+                        collisions.append((i, j))
+
+                for k in sorted(self._static_grid.query(rect)):
+                    static_sprite = self.static_sprites[k]
+                    if arcade.check_for_collision(sprite1, static_sprite):
+                        if is_solid or static_sprite.properties.get("solid", False):
+                            sprites_to_revert.add(i)
+                        static_collisions.append((sprite1, static_sprite))
+
+            for idx in sprites_to_revert:
+                sprite = self.moveable_sprites[idx]
+                sprite.center_x, sprite.center_y = original_positions[idx]
+
+        self.moved_sprites = [
+            sprite
+            for sprite, position in zip(self.moveable_sprites, original_positions)
+            if (sprite.center_x, sprite.center_y) != position
+        ]
+
+        with self._profiler.span("physics.on_collide"):
+            for idx1, idx2 in collisions:
+                on_collide(self.moveable_sprites[idx1], self.moveable_sprites[idx2])
+
+            for sprite, static_sprite in static_collisions:
+                on_collide(sprite, static_sprite)
+
+    def _sweep_sprite(self, sprite: game_sprite.GameSprite, delta_time: float) -> None:
+        """Moves a sprite along its path, sliding along any walls that it hits."""
+        dx = sprite.change_x * delta_time
+        dy = sprite.change_y * delta_time
+        if dx == 0 and dy == 0:
+            return
+
+        original_x, original_y = sprite.center_x, sprite.center_y
+        rect = spatial.sprite_rect(sprite)
+        offset_x, offset_y = 0.0, 0.0
+
+        for _ in range(MAX_SWEEP_ITERATIONS):
+            if dx == 0 and dy == 0:
+                break
+
+            hit = self._first_wall_hit(rect, dx, dy)
+            if hit is None:
+                rect = spatial.translate(rect, dx, dy)
+                offset_x += dx
+                offset_y += dy
+                break
+
+            time, normal_x, normal_y = hit
+            move_x = dx * time + normal_x * SWEEP_SKIN
+            move_y = dy * time + normal_y * SWEEP_SKIN
+            rect = spatial.translate(rect, move_x, move_y)
+            offset_x += move_x
+            offset_y += move_y
+
+            # Slide along the wall with whatever movement is left over.
+            remaining = 1.0 - time
+            dx = 0.0 if normal_x != 0 else dx * remaining
+            dy = 0.0 if normal_y != 0 else dy * remaining
+
+        sprite.center_x = original_x + offset_x
+        if self._is_oob(sprite):
+            sprite.center_x = original_x
+
+        sprite.center_y = original_y + offset_y
+        if self._is_oob(sprite):
+            sprite.center_y = original_y
+
+    def _first_wall_hit(
+        self,
+        rect: spatial.Rect,
+        dx: float,
+        dy: float,
+    ) -> Optional[Tuple[float, float, float]]:
+        hits = []
+
+        for wall in self._wall_grid.query(spatial.swept_bounds(rect, dx, dy)):
+            hit = spatial.sweep(rect, dx, dy, self._wall_grid.rect(wall))
+            if hit is not None:
+                hits.append(hit)
+
+        # Tuples compare by their first element, which is the time of impact.
+        return min(hits, default=None)
 
     def _collides_with_wall(self, sprite: game_sprite.GameSprite) -> bool:
+        if self._wall_bitmap is not None:
+            return self._wall_bitmap.collides(sprite)
+
         collisions = arcade.check_for_collision_with_list(sprite, self.wall_sprite_list)
         return len(collisions) > 0
 
@@ -1,6 +1,7 @@
 from typing import (
     Any,
     Dict,
+    Union,
 )
 
 from engine import (
@@ -31,10 +32,10 @@ class PlayerSprite(game_sprite.GameSprite):
         self._api = api
         self._data = initial_data
 
-    def _animation_state(self) -> str:
+    def _animation_state(self) -> Union[game_sprite.AnimationState, str]:
         next_activate = self._last_activate + ACTIVATE_ANIMATION_LENGTH
         if next_activate > self._api.current_time_secs:
-            return "activate"
+            return game_sprite.AnimationState.ACTIVATE
         return super()._animation_state()
 
     def on_activate(self) -> None:
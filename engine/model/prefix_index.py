@@ -0,0 +1,119 @@
+"""A trie for finding things by name or by the start of their name."""
+
+from typing import (
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    cast,
+)
+
+T = TypeVar("T")
+
+
+class _Node(Generic[T]):
+    __slots__ = ("children", "item", "has_item")
+
+    children: Dict[str, "_Node[T]"]
+    item: Optional[T]
+    has_item: bool
+
+    def __init__(self):
+        self.children = {}
+        self.item = None
+        self.has_item = False
+
+
+class PrefixIndex(Generic[T]):
+    """Maps unique names to items, with lookups by exact name or by prefix.
+
+    A prefix lookup only visits the part of the trie under the prefix, so it costs time
+    proportional to the number of matches rather than the number of items.
+    """
+
+    _root: _Node[T]
+    _size: int
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        node = self._find(name)
+        return node is not None and node.has_item
+
+    def clear(self) -> None:
+        """Removes everything from the index."""
+        self._root = _Node()
+        self._size = 0
+
+    def insert(self, name: str, item: T) -> None:
+        """Adds an item. Inserting a name that's already there replaces its item."""
+        node = self._root
+        for char in name:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+
+        if not node.has_item:
+            self._size += 1
+        node.item = item
+        node.has_item = True
+
+    def remove(self, name: str) -> None:
+        """Removes an item by name, if it's there."""
+        path: List[_Node[T]] = [self._root]
+        for char in name:
+            child = path[-1].children.get(char)
+            if child is None:
+                return
+            path.append(child)
+
+        node = path[-1]
+        if not node.has_item:
+            return
+
+        node.item = None
+        node.has_item = False
+        self._size -= 1
+
+        # Prune the branch back up to the last node that's still needed.
+        for i in range(len(name), 0, -1):
+            if path[i].has_item or path[i].children:
+                break
+            del path[i - 1].children[name[i - 1]]
+
+    def get(self, name: str) -> Optional[T]:
+        """Gets an item by its exact name."""
+        node = self._find(name)
+        if node is None or not node.has_item:
+            return None
+        return node.item
+
+    def with_prefix(self, prefix: str) -> Iterator[T]:
+        """Gets every item whose name starts with a prefix."""
+        node = self._find(prefix)
+        if node is None:
+            return
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.has_item:
+                yield cast(T, node.item)
+            stack.extend(node.children.values())
+
+    def _find(self, name: str) -> Optional[_Node[T]]:
+        node = self._root
+        for char in name:
+            child = node.children.get(char)
+            if child is None:
+                return None
+            node = child
+        return node
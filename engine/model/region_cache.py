@@ -0,0 +1,215 @@
+"""Loads region tile maps on demand and keeps the recently used ones in memory."""
+
+import collections
+import logging
+import pathlib
+from concurrent import futures
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+import arcade
+import arcade.tilemap
+import pytiled_parser
+
+from engine import spec
+from engine.model import baked_region
+
+logger = logging.getLogger(__name__)
+
+TILE_SCALING = 1
+
+# A rough estimate of how much memory a single tile sprite takes up, including its
+# share of the sprite list buffers and spatial hash.
+BYTES_PER_TILE_SPRITE = 2048
+
+# How much memory loaded tile maps may take up before the least recently used ones are
+# dropped.
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+ParseFn = Callable[[spec.RegionSpec], pytiled_parser.TiledMap]
+BuildFn = Callable[
+    [spec.RegionSpec, Optional[pytiled_parser.TiledMap]],
+    arcade.tilemap.TileMap,
+]
+
+
+def parse_region(region: spec.RegionSpec) -> pytiled_parser.TiledMap:
+    """Parses the Tiled file for a region. This is safe to run on any thread.
+
+    If the region has been baked since it was last changed, the baked file is used.
+    """
+    tiled_map = baked_region.load_tiled_map(region)
+    if tiled_map is not None:
+        return tiled_map
+
+    return pytiled_parser.parse_map(pathlib.Path(region.tiled_mapfile))
+
+
+def build_region(
+    region: spec.RegionSpec,
+    tiled_map: Optional[pytiled_parser.TiledMap] = None,
+) -> arcade.tilemap.TileMap:
+    """Builds the tile map for a region, loading it first if it hasn't been.
+
+    This creates sprite lists, which need the OpenGL context, so it must be run on the
+    main thread.
+    """
+    layer_options = {
+        region.wall_layer: {
+            "use_spatial_hash": True,
+        },
+    }
+
+    if tiled_map is None:
+        tiled_map = baked_region.load_tiled_map(region)
+
+    if tiled_map is None:
+        return arcade.load_tilemap(region.tiled_mapfile, TILE_SCALING, layer_options)
+
+    return arcade.tilemap.TileMap(
+        tiled_map=tiled_map,
+        scaling=TILE_SCALING,
+        layer_options=layer_options,
+    )
+
+
+def estimate_bytes(tilemap: arcade.tilemap.TileMap) -> int:
+    """Makes a rough guess at how much memory a tile map is using."""
+    num_sprites = sum(len(sprite_list) for sprite_list in tilemap.sprite_lists.values())
+    return num_sprites * BYTES_PER_TILE_SPRITE
+
+
+class RegionCache:
+    """Holds the tile maps for regions, loading them when they're first needed.
+
+    Regions that are likely to be needed soon can be prefetched, which parses their
+    files on a background thread. Once the built tile maps take up more than the memory
+    budget, the least recently used ones are dropped and will be loaded again if they
+    are needed. Only the cache's own references are dropped, so the budget doesn't
+    cover tile maps that something else, like a warm region in the world, holds on to.
+    """
+
+    budget_bytes: int
+
+    _regions: Dict[str, spec.RegionSpec]
+    _parse: ParseFn
+    _build: BuildFn
+    _executor: Optional[futures.Executor]
+    # Built tile maps, ordered from least to most recently used.
+    _tilemaps: "collections.OrderedDict[str, arcade.tilemap.TileMap]"
+    _sizes: Dict[str, int]
+    # Regions being parsed in the background.
+    _pending: Dict[str, "futures.Future[pytiled_parser.TiledMap]"]
+
+    def __init__(
+        self,
+        regions: Dict[str, spec.RegionSpec],
+        budget_bytes: int = DEFAULT_BUDGET_BYTES,
+        executor: Optional[futures.Executor] = None,
+        parse: ParseFn = parse_region,
+        build: BuildFn = build_region,
+    ):
+        """Constructor.
+
+        Args:
+            regions: The specs for all the regions that can be loaded.
+            budget_bytes: How much memory loaded tile maps may use.
+            executor: Used to parse prefetched regions. If None, prefetching does
+                      nothing.
+            parse: Parses a region's file. Overridable for tests.
+            build: Builds a region's tile map. Overridable for tests.
+        """
+        self.budget_bytes = budget_bytes
+        self._regions = regions
+        self._parse = parse
+        self._build = build
+        self._executor = executor
+        self._tilemaps = collections.OrderedDict()
+        self._sizes = {}
+        self._pending = {}
+
+    def __contains__(self, region_name: str) -> bool:
+        return region_name in self._tilemaps
+
+    @property
+    def loaded_regions(self) -> List[str]:
+        """Gets the regions that are loaded, from least to most recently used."""
+        return list(self._tilemaps.keys())
+
+    @property
+    def used_bytes(self) -> int:
+        """Gets roughly how much memory the loaded tile maps are using."""
+        return sum(self._sizes.values())
+
+    def get(self, region_name: str) -> arcade.tilemap.TileMap:
+        """Gets the tile map for a region, loading it if needed."""
+        tilemap = self._tilemaps.get(region_name)
+        if tilemap is not None:
+            self._tilemaps.move_to_end(region_name)
+            return tilemap
+
+        region = self._regions[region_name]
+        tiled_map = None
+
+        pending = self._pending.pop(region_name, None)
+        if pending is not None:
+            try:
+                tiled_map = pending.result()
+            except Exception:  # pylint: disable=broad-except
+                # Try again on this thread, so the error surfaces in the usual place.
+                logger.exception("Prefetching region %s failed.", region_name)
+
+        tilemap = self._build(region, tiled_map)
+        self._tilemaps[region_name] = tilemap
+        self._sizes[region_name] = estimate_bytes(tilemap)
+        self._evict()
+
+        return tilemap
+
+    def prefetch(self, region_names: Iterable[str]) -> None:
+        """Starts parsing regions in the background so that they load faster later.
+
+        Prefetches from earlier calls for regions that aren't asked for again are
+        dropped, so parsed maps that won't be used don't stay in memory.
+        """
+        if self._executor is None:
+            return
+
+        region_names = list(region_names)
+        for region_name in set(self._pending) - set(region_names):
+            self._pending.pop(region_name).cancel()
+
+        for region_name in region_names:
+            if (
+                region_name in self._tilemaps
+                or region_name in self._pending
+                or region_name not in self._regions
+            ):
+                continue
+
+            self._pending[region_name] = self._executor.submit(
+                self._parse,
+                self._regions[region_name],
+            )
+
+    def close(self) -> None:
+        """Stops prefetching. Parses that haven't started yet are cancelled."""
+        for pending in self._pending.values():
+            pending.cancel()
+        self._pending = {}
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _evict(self) -> None:
+        # The most recently used map is always kept, even if it's over budget alone.
+        while len(self._tilemaps) > 1 and self.used_bytes > self.budget_bytes:
+            region_name, _ = self._tilemaps.popitem(last=False)
+            del self._sizes[region_name]
+            logger.info("Evicted region %s from the cache.", region_name)
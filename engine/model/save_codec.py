@@ -0,0 +1,495 @@
+"""A compact binary format for saved values.
+
+Values are written as a one byte tag followed by their contents. Integers and lengths
+are varints, so small ones take a single byte, and floats that survive the round trip
+are stored in four bytes rather than eight.
+
+Types other than the built in ones must be registered, with a stable id and a stable
+number for each of their fields. Objects are written as their id and a list of
+(field number, value) pairs. Fields that a reader doesn't know about are skipped, and
+fields that are missing are left to the type's constructor, so types can gain and lose
+fields without breaking old saves.
+
+Streams of values are written as frames, each holding one value and optionally
+compressed. Frames are read one at a time, so a large stream never has to be in memory
+all at once.
+"""
+
+import dataclasses
+import struct
+import zlib
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+)
+
+# Written at the start of every stream, before the stream's version.
+MAGIC = b"OSAV"
+
+# Frames smaller than this aren't worth compressing.
+DEFAULT_COMPRESS_MIN_BYTES = 512
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT64 = 4
+_FLOAT32 = 5
+_STR = 6
+_BYTES = 7
+_LIST = 8
+_TUPLE = 9
+_DICT = 10
+_OBJECT = 11
+# A tuple of two floats that fit in four bytes each, such as a sprite's location.
+_FLOAT32_PAIR = 12
+
+_FRAME_COMPRESSED = 0x1
+
+_DOUBLE = struct.Struct("<d")
+_SINGLE = struct.Struct("<f")
+_SINGLE_PAIR = struct.Struct("<2f")
+
+_EMPTY_DICT = bytes([_DICT, 0])
+
+
+class Readable(Protocol):
+    """A stream that can be read from, like a file opened in binary mode."""
+
+    def read(self, size: int = -1, /) -> bytes:
+        """Reads up to `size` bytes, or everything if it's negative."""
+
+
+class Writable(Protocol):
+    """A stream that can be written to, like a file opened in binary mode."""
+
+    def write(self, data: bytes, /) -> Any:
+        """Writes some bytes."""
+
+
+class EncodeError(TypeError):
+    """Raised when a value can't be encoded."""
+
+
+class DecodeError(ValueError):
+    """Raised when data can't be decoded."""
+
+
+class TruncatedError(DecodeError):
+    """Raised when a stream ends part way through a value."""
+
+
+@dataclasses.dataclass(frozen=True)
+class _Codec:
+    """How to encode and decode a registered type."""
+
+    cls: type
+    type_id: int
+    # Field names to their numbers, and back.
+    fields: Tuple[Tuple[str, int], ...]
+    names: Mapping[int, str]
+    make: Callable[..., Any]
+
+
+_codecs_by_type: Dict[type, _Codec] = {}
+_codecs_by_id: Dict[int, _Codec] = {}
+
+
+def register(
+    cls: Type[Any],
+    type_id: int,
+    fields: Mapping[str, int],
+    make: Optional[Callable[..., Any]] = None,
+) -> None:
+    """Registers a type so that it can be encoded.
+
+    Args:
+        cls: The type.
+        type_id: A number for the type, which must never change once something has
+                 been saved with it.
+        fields: The attributes to save, mapped to numbers that must never change
+                either.
+        make: Builds an object from its saved fields, given as keyword arguments. By
+              default the type is called with them.
+
+    Raises:
+        ValueError: if the type or its id is already registered.
+    """
+    if cls in _codecs_by_type:
+        raise ValueError(f"{cls.__name__} is already registered.")
+    if type_id in _codecs_by_id:
+        raise ValueError(
+            f"Type id {type_id} is already used by {_codecs_by_id[type_id].cls}."
+        )
+
+    builder: Callable[..., Any] = cls
+    if make is not None:
+        builder = make
+
+    codec = _Codec(
+        cls=cls,
+        type_id=type_id,
+        fields=tuple(fields.items()),
+        names={number: name for name, number in fields.items()},
+        make=builder,
+    )
+    _codecs_by_type[cls] = codec
+    _codecs_by_id[type_id] = codec
+
+
+def unregister(cls: Type[Any]) -> None:
+    """Forgets a registered type. Mostly useful for tests."""
+    codec = _codecs_by_type.pop(cls)
+    del _codecs_by_id[codec.type_id]
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes a value.
+
+    Raises:
+        EncodeError: if the value holds something that can't be encoded.
+    """
+    if type(value) is dict and not value:  # pylint: disable=unidiomatic-typecheck
+        # By far the most common sprite data.
+        return _EMPTY_DICT
+
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def loads(data: bytes) -> Any:
+    """Decodes a value.
+
+    Raises:
+        DecodeError: if the data isn't a single encoded value.
+    """
+    try:
+        value, position = _decode(data, 0)
+    except (IndexError, struct.error) as error:
+        raise TruncatedError("The data ends part way through a value.") from error
+    except UnicodeDecodeError as error:
+        raise DecodeError(f"A string is corrupt: {error}") from error
+
+    if position != len(data):
+        raise DecodeError(f"There are {len(data) - position} bytes after the value.")
+    return value
+
+
+def write_header(stream: Writable, version: int) -> None:
+    """Starts a stream."""
+    out = bytearray(MAGIC)
+    _write_varint(out, version)
+    stream.write(out)
+
+
+def read_header(stream: Readable) -> int:
+    """Reads the start of a stream, returning its version.
+
+    Raises:
+        TruncatedError: if the stream ends part way through the header.
+        DecodeError: if the stream wasn't written by `write_header`.
+    """
+    magic = stream.read(len(MAGIC))
+    if magic != MAGIC:
+        if MAGIC.startswith(magic):
+            raise TruncatedError("The stream ends part way through its header.")
+        raise DecodeError("This isn't a save.")
+    return _read_stream_varint(stream)
+
+
+def write_frame(
+    stream: Writable,
+    value: Any,
+    compress_min_bytes: Optional[int] = DEFAULT_COMPRESS_MIN_BYTES,
+) -> int:
+    """Writes a value to a stream as a frame, returning how many bytes it took.
+
+    Args:
+        stream: Where to write the frame.
+        value: What to write.
+        compress_min_bytes: The size from which the value is compressed, or None to
+                            never compress it.
+
+    Raises:
+        EncodeError: if the value holds something that can't be encoded.
+    """
+    payload = dumps(value)
+    flags = 0
+    if compress_min_bytes is not None and len(payload) >= compress_min_bytes:
+        payload = zlib.compress(payload)
+        flags |= _FRAME_COMPRESSED
+
+    out = bytearray()
+    _write_varint(out, len(payload))
+    out.append(flags)
+    out += payload
+    stream.write(out)
+    return len(out)
+
+
+def iter_frames(stream: Readable) -> Iterator[Any]:
+    """Reads the values of frames from a stream, one at a time, until it ends.
+
+    Raises:
+        TruncatedError: if the stream ends part way through a frame.
+        DecodeError: if a frame can't be decoded.
+    """
+    while True:
+        first = stream.read(1)
+        if not first:
+            return
+
+        length = _read_stream_varint(stream, first)
+        flags = stream.read(1)
+        payload = stream.read(length)
+        if not flags or len(payload) != length:
+            raise TruncatedError("The stream ends part way through a frame.")
+
+        if flags[0] & _FRAME_COMPRESSED:
+            try:
+                payload = zlib.decompress(payload)
+            except zlib.error as error:
+                raise DecodeError(f"A frame is corrupt: {error}") from error
+
+        yield loads(payload)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_stream_varint(stream: Readable, first: bytes = b"") -> int:
+    byte = first or stream.read(1)
+    value = 0
+    shift = 0
+    while True:
+        if not byte:
+            raise TruncatedError("The stream ends part way through a number.")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+        byte = stream.read(1)
+
+
+def _encode_int(value: int, out: bytearray) -> None:
+    out.append(_INT)
+    # Zigzag, so that small negative numbers are small too.
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _encode_float(value: float, out: bytearray) -> None:
+    try:
+        single = _SINGLE.pack(value)
+    except OverflowError:
+        # Too big for four bytes.
+        single = b""
+
+    if single and _SINGLE.unpack(single)[0] == value:
+        out.append(_FLOAT32)
+        out += single
+    else:
+        out.append(_FLOAT64)
+        out += _DOUBLE.pack(value)
+
+
+def _encode_str(value: str, out: bytearray) -> None:
+    data = value.encode("utf-8")
+    out.append(_STR)
+    _write_varint(out, len(data))
+    out += data
+
+
+def _encode_bytes(value: bytes, out: bytearray) -> None:
+    out.append(_BYTES)
+    _write_varint(out, len(value))
+    out += value
+
+
+def _encode_list(value: list, out: bytearray) -> None:
+    out.append(_LIST)
+    _write_varint(out, len(value))
+    for item in value:
+        _encode(item, out)
+
+
+def _encode_tuple(value: tuple, out: bytearray) -> None:
+    # pylint: disable=unidiomatic-typecheck
+    if len(value) == 2 and type(value[0]) is float and type(value[1]) is float:
+        try:
+            pair = _SINGLE_PAIR.pack(*value)
+        except OverflowError:
+            pair = b""
+
+        if pair and _SINGLE_PAIR.unpack(pair) == value:
+            out.append(_FLOAT32_PAIR)
+            out += pair
+            return
+
+    out.append(_TUPLE)
+    _write_varint(out, len(value))
+    for item in value:
+        _encode(item, out)
+
+
+def _encode_dict(value: dict, out: bytearray) -> None:
+    out.append(_DICT)
+    _write_varint(out, len(value))
+    for key, item in value.items():
+        _encode(key, out)
+        _encode(item, out)
+
+
+def _encode_object(value: Any, codec: _Codec, out: bytearray) -> None:
+    out.append(_OBJECT)
+    _write_varint(out, codec.type_id)
+    _write_varint(out, len(codec.fields))
+    for name, number in codec.fields:
+        _write_varint(out, number)
+        _encode(getattr(value, name), out)
+
+
+_ENCODERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    list: _encode_list,
+    tuple: _encode_tuple,
+    dict: _encode_dict,
+}
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    else:
+        encoder = _ENCODERS.get(type(value))
+        if encoder is not None:
+            encoder(value, out)
+            return
+
+        codec = _codecs_by_type.get(type(value))
+        if codec is None:
+            raise EncodeError(
+                f"{type(value).__name__} can't be saved, it needs to be registered "
+                "with engine.model.save_codec."
+            )
+        _encode_object(value, codec, out)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _decode(data: bytes, position: int) -> Tuple[Any, int]:
+    # pylint: disable=too-many-return-statements
+    # The most common tags come first.
+    tag = data[position]
+    position += 1
+
+    if tag in (_STR, _BYTES):
+        # Almost every length fits in one byte, so skip the call for those.
+        length = data[position]
+        if length & 0x80:
+            length, position = _read_varint(data, position)
+        else:
+            position += 1
+        end = position + length
+        if end > len(data):
+            raise IndexError()
+        raw = data[position:end]
+        return (raw.decode("utf-8") if tag == _STR else bytes(raw)), end
+
+    if tag == _OBJECT:
+        return _decode_object(data, position)
+
+    if tag == _FLOAT32_PAIR:
+        return _SINGLE_PAIR.unpack_from(data, position), position + _SINGLE_PAIR.size
+
+    if tag == _DICT:
+        length = data[position]
+        if length & 0x80:
+            length, position = _read_varint(data, position)
+        else:
+            position += 1
+        result = {}
+        for _ in range(length):
+            key, position = _decode(data, position)
+            result[key], position = _decode(data, position)
+        return result, position
+
+    if tag == _INT:
+        value, position = _read_varint(data, position)
+        return (value >> 1) ^ -(value & 1), position
+
+    if tag == _FLOAT32:
+        return _SINGLE.unpack_from(data, position)[0], position + _SINGLE.size
+
+    if tag == _FLOAT64:
+        return _DOUBLE.unpack_from(data, position)[0], position + _DOUBLE.size
+
+    if tag in (_LIST, _TUPLE):
+        length, position = _read_varint(data, position)
+        items = []
+        for _ in range(length):
+            item, position = _decode(data, position)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), position
+
+    if tag <= _TRUE:
+        return (None, False, True)[tag], position
+
+    raise DecodeError(f"Unknown tag {tag}.")
+
+
+def _decode_object(data: bytes, position: int) -> Tuple[Any, int]:
+    type_id, position = _read_varint(data, position)
+    codec = _codecs_by_id.get(type_id)
+    if codec is None:
+        raise DecodeError(f"Unknown type id {type_id}.")
+
+    num_fields, position = _read_varint(data, position)
+    names = codec.names
+    fields = {}
+    for _ in range(num_fields):
+        number = data[position]
+        if number & 0x80:
+            number, position = _read_varint(data, position)
+        else:
+            position += 1
+        value, position = _decode(data, position)
+        name = names.get(number)
+        # Fields that have since been dropped are skipped.
+        if name is not None:
+            fields[name] = value
+
+    try:
+        return codec.make(**fields), position
+    except TypeError as error:
+        raise DecodeError(
+            f"Unable to rebuild a {codec.cls.__name__}: {error}"
+        ) from error
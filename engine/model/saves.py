@@ -0,0 +1,786 @@
+"""Saves the state of the world a little at a time.
+
+A save is a directory holding a snapshot of the whole world state and a journal of the
+changes made since it was taken:
+
+    snapshot.sav           The state, and the last journal segment it includes.
+    journal-<N>.log        Change records, oldest first.
+
+Each save only works out and writes which sprites, regions and player details changed
+since the last one, by comparing against what was last written. That keeps records
+small, but it doesn't make them free: comparing costs a few microseconds per sprite in
+the active region, and syncing a record to disk typically takes around 100µs however
+small it is. So only the comparing happens on the main thread. What it finds is made of
+immutable `SavedSprite`s, shared with what the tracker remembers, so it can be handed to
+a writer thread as it is. That thread encodes, compresses and writes it, and syncs it
+to disk before the next save is written.
+
+The journal is split into segments. Every so often the current segment is sealed and
+the writer folds the sealed segments into a new snapshot, which replaces the old one
+with an atomic rename, and deletes them. Loading reads the snapshot and replays any
+segments newer than it. A half-written last record, from the game stopping mid-save,
+is ignored.
+
+Both kinds of file are streams in the `save_codec` format, starting with
+`FORMAT_VERSION`, so anything scripts keep in their state needs to be registered with
+it. Each record in a segment is a frame holding a dict of:
+
+    {"reset": True (only on the first save of a new game),
+     "active_region": str,
+     "player": SavedSprite,
+     "sprites": {<region>: {<sprite name>: SavedSprite or None, ...}, ...}}
+
+Everything in a record is optional, and None means the sprite was removed. The snapshot
+starts with a frame of {"segment": int}, followed by records that rebuild the state,
+with a region's sprites split across several of them if there are a lot. Its frames
+are compressed together, as one gzip stream, and loading decompresses and decodes
+them one at a time.
+"""
+
+import gzip
+import logging
+import os
+import re
+import time
+import zlib
+from concurrent import futures
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Protocol,
+    Tuple,
+)
+
+from engine import (
+    profiler,
+    spec,
+)
+from engine.model import (
+    game_sprite,
+    save_codec,
+    world,
+)
+
+FORMAT_VERSION = 3
+
+SNAPSHOT_NAME = "snapshot.sav"
+SEGMENT_NAME = "journal-{segment:06d}.log"
+_SEGMENT_PATTERN = re.compile(r"journal-(\d+)\.log")
+
+# Records smaller than this aren't worth compressing.
+COMPRESS_MIN_BYTES = save_codec.DEFAULT_COMPRESS_MIN_BYTES
+
+# The most sprites written in one frame of a snapshot.
+SNAPSHOT_SPRITES_PER_FRAME = 256
+# The gzip level the snapshot is compressed at.
+SNAPSHOT_COMPRESS_LEVEL = 6
+
+# The save_codec type ids of engine types. Games should use ids from 100 up.
+SAVED_SPRITE_TYPE_ID = 1
+
+# How many records are written to a segment before it's sealed and compacted.
+DEFAULT_COMPACT_EVERY = 64
+
+logger = logging.getLogger(__name__)
+
+
+class SaveError(Exception):
+    """Raised when a save can't be read."""
+
+
+class SavedWorld(Protocol):
+    """The parts of the world that are saved."""
+
+    active_region: str
+    region_states: Dict[str, world.RegionState]
+
+    @property
+    def player_sprite(self) -> game_sprite.GameSprite:
+        """Gets the player sprite."""
+
+    def get_sprites(self, name: Optional[str]) -> Iterable[game_sprite.GameSprite]:
+        """Gets the sprites in the active region."""
+
+
+class SavedSprite(NamedTuple):
+    """A sprite's state as it's saved."""
+
+    location: Tuple[float, float]
+    facing: Tuple[float, float]
+    # The sprite's data, encoded. Comparing these is how changes to it are found.
+    data: bytes
+
+    @classmethod
+    def from_state(cls, state: game_sprite.SpriteState) -> "SavedSprite":
+        """Captures a sprite's state."""
+        return cls(
+            location=state.location,
+            facing=state.facing,
+            data=save_codec.dumps(state.data),
+        )
+
+    def to_state(self) -> game_sprite.SpriteState:
+        """Gets the sprite's state back."""
+        return game_sprite.SpriteState(
+            location=self.location,
+            facing=self.facing,
+            data=save_codec.loads(self.data),
+        )
+
+
+save_codec.register(
+    SavedSprite,
+    SAVED_SPRITE_TYPE_ID,
+    {"location": 1, "facing": 2, "data": 3},
+)
+
+
+def state_from_saved(value: Dict[str, Any]) -> world.WorldState:
+    """Converts a saved state back to a world state."""
+    return world.WorldState(
+        active_region=value["active_region"],
+        player_state=value["player"].to_state(),
+        region_states={
+            region: world.RegionState(
+                sprite_states={
+                    name: sprite.to_state() for name, sprite in sprites.items()
+                }
+            )
+            for region, sprites in value["regions"].items()
+        },
+    )
+
+
+def apply_record(state: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Applies a journal record to a saved state."""
+    if record.get("reset"):
+        state.clear()
+        state["regions"] = {}
+
+    if "active_region" in record:
+        state["active_region"] = record["active_region"]
+    if "player" in record:
+        state["player"] = record["player"]
+
+    regions = state.setdefault("regions", {})
+    for region, sprites in record.get("sprites", {}).items():
+        region_sprites = regions.setdefault(region, {})
+        for name, sprite in sprites.items():
+            if sprite is None:
+                region_sprites.pop(name, None)
+            else:
+                region_sprites[name] = sprite
+
+
+def _changed(saved: Optional[SavedSprite], state: game_sprite.SpriteState) -> bool:
+    """Determines if a sprite's state differs from what was saved for it."""
+    return (
+        saved is None
+        or saved.location != state.location
+        or saved.facing != state.facing
+        or saved.data != save_codec.dumps(state.data)
+    )
+
+
+def _capture(
+    name: str,
+    saved: Optional[SavedSprite],
+    state: game_sprite.SpriteState,
+) -> Optional[SavedSprite]:
+    """Captures a sprite's state if it differs from what was saved for it.
+
+    Returns None if it's unchanged, or if it holds something that can't be saved, which
+    is logged rather than stopping the rest of the world from being saved.
+    """
+    try:
+        if not _changed(saved, state):
+            return None
+        return SavedSprite.from_state(state)
+    except save_codec.EncodeError as error:
+        logger.error("Unable to save %s: %s", name, error)
+        return None
+
+
+class StateTracker:
+    """Works out what has changed in the world since it was last saved."""
+
+    # What was last saved for each sprite, by region.
+    _saved: Dict[str, Dict[str, SavedSprite]]
+    _saved_player: Optional[SavedSprite]
+    _saved_region: Optional[str]
+    # The region states that were last compared for each inactive region. The world
+    # replaces a region's state whenever the player leaves it, so one that's still here
+    # is unchanged.
+    _seen: Dict[str, world.RegionState]
+    # Set until the first record of a new game, which replaces anything saved before.
+    _fresh: bool
+
+    def __init__(self):
+        self._saved = {}
+        self._saved_player = None
+        self._saved_region = None
+        self._seen = {}
+        self._fresh = True
+
+    def reset(self, state: world.WorldState) -> None:
+        """Starts tracking from a state that was loaded."""
+        self._saved = {
+            region: {
+                name: SavedSprite.from_state(sprite)
+                for name, sprite in region_state.sprite_states.items()
+            }
+            for region, region_state in state.region_states.items()
+        }
+        self._saved_player = SavedSprite.from_state(state.player_state)
+        self._saved_region = state.active_region
+        self._seen = dict(state.region_states)
+        self._fresh = False
+
+    def record(self, game_world: SavedWorld) -> Optional[Dict[str, Any]]:
+        """Builds a record of what changed since the last call.
+
+        Returns None if nothing did.
+        """
+        record: Dict[str, Any] = {}
+        if self._fresh:
+            record["reset"] = True
+            self._fresh = False
+
+        if game_world.active_region != self._saved_region:
+            self._saved_region = record["active_region"] = game_world.active_region
+
+        player = _capture("player", self._saved_player, game_world.player_sprite.state)
+        if player is not None:
+            self._saved_player = record["player"] = player
+
+        sprites = {}
+        for region, region_state in game_world.region_states.items():
+            if (
+                region == game_world.active_region
+                or self._seen.get(region) is region_state
+            ):
+                continue
+
+            self._seen[region] = region_state
+            changes = self._diff(region, region_state.sprite_states)
+            if changes is not None:
+                sprites[region] = changes
+
+        if game_world.active_region != "":
+            changes = self._diff(
+                game_world.active_region,
+                {sprite.name: sprite.state for sprite in game_world.get_sprites(None)},
+            )
+            if changes is not None:
+                sprites[game_world.active_region] = changes
+
+        if sprites:
+            record["sprites"] = sprites
+
+        return record or None
+
+    def _diff(
+        self,
+        region: str,
+        states: Mapping[str, game_sprite.SpriteState],
+    ) -> Optional[Dict[str, Optional[SavedSprite]]]:
+        """Finds the sprites in a region that changed, updating what was saved."""
+        saved = self._saved.get(region)
+        is_new = saved is None
+        if saved is None:
+            saved = self._saved[region] = {}
+
+        changes: Dict[str, Optional[SavedSprite]] = {}
+        # Sprites that couldn't be saved, and weren't saved before either.
+        unsaved = 0
+        for name, state in states.items():
+            captured = _capture(name, saved.get(name), state)
+            if captured is not None:
+                saved[name] = changes[name] = captured
+            elif name not in saved:
+                unsaved += 1
+
+        # New sprites were added above, so any extra ones were removed.
+        if len(saved) + unsaved != len(states):
+            for name in saved.keys() - states.keys():
+                del saved[name]
+                changes[name] = None
+
+        # A region with no sprites still needs to be recorded, so it counts as visited.
+        return changes if changes or is_new else None
+
+
+class SaveJournal:
+    """Reads and writes the files of a save.
+
+    It isn't thread safe. Only one thread at a time should use it.
+    """
+
+    directory: str
+    # Whether to wait for writes to reach the disk.
+    durable: bool
+    # How many bytes of records have been written since the journal was opened.
+    bytes_written: int
+
+    _segment: int
+    _file: Optional[BinaryIO]
+    _records: int
+
+    def __init__(self, directory: str, durable: bool = True):
+        """Opens a save. Its directory is created when something is first written.
+
+        Raises:
+            SaveError: if the snapshot can't be read.
+        """
+        self.directory = directory
+        self.durable = durable
+        self.bytes_written = 0
+        self._file = None
+        self._records = 0
+
+        # Start a new segment, rather than risk appending after a half-written record.
+        self._segment = max([self._snapshot_segment(), *self._segments()]) + 1
+
+    @property
+    def records(self) -> int:
+        """Gets how many records are in the current segment."""
+        return self._records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Adds a record to the end of the journal."""
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(  # pylint: disable=consider-using-with
+                self._segment_path(self._segment), "ab"
+            )
+
+        try:
+            if self._file.tell() == 0:
+                save_codec.write_header(self._file, FORMAT_VERSION)
+            written = save_codec.write_frame(self._file, record, COMPRESS_MIN_BYTES)
+            self._file.flush()
+            if self.durable:
+                _sync_data(self._file.fileno())
+        except OSError:
+            # Whatever was written can't be appended to, so start a new segment.
+            self._seal()
+            raise
+
+        self._records += 1
+        self.bytes_written += written
+
+    def compact(self) -> None:
+        """Seals the current segment and folds the journal into the snapshot."""
+        if self._file is None:
+            return
+
+        self._fold(self._seal())
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Reads the saved state, or None if nothing was saved.
+
+        Raises:
+            SaveError: if the snapshot can't be read.
+        """
+        state, segment = self._read_snapshot()
+        for number in self._segments():
+            if number > segment:
+                for record in self._read_segment(number):
+                    apply_record(state, record)
+
+        return state if "active_region" in state else None
+
+    def close(self) -> None:
+        """Finishes writing the journal."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def start_over(self) -> Optional[str]:
+        """Moves whatever was saved aside, so that the next record starts a new save.
+
+        Returns where the old save was moved to, or None if nothing was saved.
+        """
+        self.close()
+        self._segment = 1
+        self._records = 0
+
+        if not self._segments() and not os.path.exists(
+            os.path.join(self.directory, SNAPSHOT_NAME)
+        ):
+            return None
+
+        return move_aside(self.directory, "previous")
+
+    def _seal(self) -> int:
+        """Closes the current segment and starts a new one, returning the old one."""
+        self.close()
+        sealed = self._segment
+        self._segment += 1
+        self._records = 0
+        return sealed
+
+    def _fold(self, through: int) -> None:
+        """Replaces the snapshot with one including segments up to `through`."""
+        state, segment = self._read_snapshot()
+        folded = [number for number in self._segments() if segment < number <= through]
+
+        for number in folded:
+            for record in self._read_segment(number):
+                apply_record(state, record)
+
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as outfile:
+            _write_snapshot(outfile, state, through)
+            outfile.flush()
+            if self.durable:
+                os.fsync(outfile.fileno())
+        os.replace(temp_path, path)
+        if self.durable:
+            _sync_directory(self.directory)
+
+        # The snapshot covers these now, so it doesn't matter if deleting them fails.
+        for number in folded:
+            try:
+                os.remove(self._segment_path(number))
+            except OSError as error:
+                logger.warning("Unable to remove journal segment: %s", error)
+
+    def _segments(self) -> List[int]:
+        if not os.path.isdir(self.directory):
+            return []
+
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_PATTERN.fullmatch(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_NAME.format(segment=segment))
+
+    def _read_snapshot(self, segment_only: bool = False) -> Tuple[Dict[str, Any], int]:
+        """Reads the snapshot's state and the last segment it includes.
+
+        Args:
+            segment_only: Whether to stop after the segment, leaving the state empty.
+        """
+        state: Dict[str, Any] = {"regions": {}}
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        if not os.path.exists(path):
+            return state, 0
+
+        try:
+            with open(path, "rb") as infile:
+                if save_codec.read_header(infile) != FORMAT_VERSION:
+                    raise SaveError(f"{path} has an unknown version.")
+
+                with gzip.GzipFile(fileobj=infile, mode="rb") as stream:
+                    frames = save_codec.iter_frames(stream)
+                    segment = next(frames)["segment"]
+                    if not segment_only:
+                        for record in frames:
+                            apply_record(state, record)
+        except (
+            OSError,
+            EOFError,
+            zlib.error,
+            StopIteration,
+            KeyError,
+            TypeError,
+            AttributeError,
+            save_codec.DecodeError,
+        ) as error:
+            raise SaveError(f"Unable to read {path}: {error}") from error
+
+        return state, segment
+
+    def _snapshot_segment(self) -> int:
+        _, segment = self._read_snapshot(segment_only=True)
+        return segment
+
+    def _read_segment(self, segment: int) -> Iterator[Dict[str, Any]]:
+        path = self._segment_path(segment)
+        with open(path, "rb") as infile:
+            try:
+                if save_codec.read_header(infile) != FORMAT_VERSION:
+                    raise SaveError(f"{path} has an unknown version.")
+                yield from save_codec.iter_frames(infile)
+            except save_codec.TruncatedError:
+                # The game stopped part way through writing this record.
+                logger.warning("Ignoring a partial record in segment %d.", segment)
+            except save_codec.DecodeError as error:
+                raise SaveError(f"Unable to read {path}: {error}") from error
+
+
+def _write_snapshot(outfile: BinaryIO, state: Dict[str, Any], segment: int) -> None:
+    """Writes a saved state as records that rebuild it, a few sprites at a time."""
+    save_codec.write_header(outfile, FORMAT_VERSION)
+    with gzip.GzipFile(
+        fileobj=outfile,
+        mode="wb",
+        compresslevel=SNAPSHOT_COMPRESS_LEVEL,
+        mtime=0,
+    ) as stream:
+        # The whole stream is compressed, so the frames aren't.
+        save_codec.write_frame(stream, {"segment": segment}, None)
+        save_codec.write_frame(
+            stream,
+            {key: state[key] for key in ["active_region", "player"] if key in state},
+            None,
+        )
+
+        for region, sprites in state["regions"].items():
+            names = list(sprites)
+            # Regions without sprites still get a frame, so they're remembered.
+            for start in range(0, max(len(names), 1), SNAPSHOT_SPRITES_PER_FRAME):
+                chunk = names[start : start + SNAPSHOT_SPRITES_PER_FRAME]
+                save_codec.write_frame(
+                    stream,
+                    {"sprites": {region: {name: sprites[name] for name in chunk}}},
+                    None,
+                )
+
+
+def move_aside(directory: str, label: str) -> Optional[str]:
+    """Renames a save's directory out of the way, so a new save can start there.
+
+    The new name is the old one with the label and the time added. Returns it, or None
+    if there was no directory.
+    """
+    directory = os.path.normpath(directory)
+    if not os.path.isdir(directory):
+        return None
+
+    base = f"{directory}.{label}-{time.strftime('%Y%m%d-%H%M%S')}"
+    target = base
+    count = 1
+    while os.path.exists(target):
+        target = f"{base}-{count}"
+        count += 1
+
+    os.rename(directory, target)
+    return target
+
+
+def _sync_data(descriptor: int) -> None:
+    """Makes sure what was appended to a file has reached the disk.
+
+    Where it's available, this skips syncing metadata the journal doesn't need, such as
+    the file's modification time.
+    """
+    getattr(os, "fdatasync", os.fsync)(descriptor)
+
+
+def _sync_directory(directory: str) -> None:
+    """Makes sure a rename in a directory has reached the disk, where that's possible."""
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories can't be opened on Windows, and renames there are durable anyway.
+        return
+
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class SaveManager:
+    """Saves and loads the world, a few changes at a time.
+
+    Saving only works out what changed on the calling thread. Everything else happens
+    on a writer thread.
+
+    The first save after it's created starts a new game, unless the saved game was
+    loaded first. Whatever was saved before is moved aside rather than replaced, to a
+    directory named after the save's with ".previous-<time>" added.
+    """
+
+    journal: SaveJournal
+    tracker: StateTracker
+    # How often to save while the game runs, in seconds of game time.
+    autosave_secs: Optional[float]
+    compact_every: int
+
+    # How long saves took on the calling thread, working out what changed.
+    capture_times: profiler.Histogram
+    # How long the writer took to write each save, and to compact the journal.
+    write_times: profiler.Histogram
+    compact_times: profiler.Histogram
+
+    _executor: futures.Executor
+    # The last write handed to the writer. Writes happen in order, so once it's done
+    # they all are.
+    _last_write: Optional["futures.Future[None]"]
+    # Set by the writer when a write fails, so the next save writes everything.
+    _write_failed: bool
+    # Whether this save has been loaded or written to. Until it has, a new game moves
+    # the old save aside.
+    _started: bool
+    _last_save_secs: float
+
+    def __init__(
+        self,
+        directory: str,
+        autosave_secs: Optional[float] = None,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+        executor: Optional[futures.Executor] = None,
+        durable: bool = True,
+    ):
+        """Opens a save.
+
+        Args:
+            directory: Where the save's files are.
+            autosave_secs: How often `save_if_due` saves.
+            compact_every: How many saves to write before compacting the journal.
+            executor: Where saves are written. It must run one thing at a time, in the
+                      order they're submitted. By default, a thread is started.
+            durable: Whether to wait for saves to reach the disk.
+
+        Raises:
+            SaveError: if the snapshot can't be read.
+        """
+        if executor is None:
+            executor = futures.ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="save-writer",
+            )
+
+        self.journal = SaveJournal(directory, durable=durable)
+        self.tracker = StateTracker()
+        self.autosave_secs = autosave_secs
+        self.compact_every = compact_every
+        self.capture_times = profiler.Histogram()
+        self.write_times = profiler.Histogram()
+        self.compact_times = profiler.Histogram()
+        self._executor = executor
+        self._last_write = None
+        self._write_failed = False
+        self._started = False
+        self._last_save_secs = 0.0
+
+    @classmethod
+    def from_spec(cls, game_spec: spec.GameSpec) -> Optional["SaveManager"]:
+        """Creates a save manager for a game, or None if the game can't be saved.
+
+        A save that can't be read doesn't stop the game from starting. It's moved aside,
+        and a new one is started.
+        """
+        if game_spec.save_dir is None:
+            return None
+
+        try:
+            return cls(game_spec.save_dir, autosave_secs=game_spec.autosave_secs)
+        except SaveError as error:
+            logger.error("Unable to open the save: %s", error)
+
+        try:
+            moved = move_aside(game_spec.save_dir, "corrupt")
+            logger.error("Moved the save to %s and started a new one.", moved)
+            return cls(game_spec.save_dir, autosave_secs=game_spec.autosave_secs)
+        except (OSError, SaveError) as error:
+            logger.error("Saving is turned off: %s", error)
+            return None
+
+    def save(self, game_world: SavedWorld) -> bool:
+        """Hands whatever changed since the last save to the writer.
+
+        Returns whether there was anything to write.
+        """
+        start = time.perf_counter()
+        if self._write_failed:
+            # Nobody knows what made it to the disk, so start again from scratch.
+            self._write_failed = False
+            self.tracker = StateTracker()
+
+        record = self.tracker.record(game_world)
+        if record is not None:
+            self._last_write = self._executor.submit(self._write, record)
+
+        self.capture_times.record(time.perf_counter() - start)
+        return record is not None
+
+    def save_if_due(self, game_world: SavedWorld, game_time_secs: float) -> bool:
+        """Saves if it's been long enough since the last save."""
+        if self.autosave_secs is None:
+            return False
+
+        if game_time_secs - self._last_save_secs < self.autosave_secs:
+            return False
+
+        self._last_save_secs = game_time_secs
+        return self.save(game_world)
+
+    def flush(self) -> None:
+        """Waits for every save so far to be written."""
+        if self._last_write is not None:
+            self._last_write.result()
+            self._last_write = None
+
+    def load(self) -> Optional[world.WorldState]:
+        """Reads the saved state, or None if nothing was saved.
+
+        Saves made after this only record changes from the loaded state.
+
+        Raises:
+            SaveError: if the save can't be read.
+        """
+        self.flush()
+        value = self.journal.load()
+        if value is None:
+            return None
+
+        try:
+            state = state_from_saved(value)
+        except (KeyError, AttributeError, save_codec.DecodeError) as error:
+            raise SaveError(f"The save is corrupt: {error}") from error
+
+        self.tracker.reset(state)
+        self._write_failed = False
+        self._started = True
+        self._last_save_secs = 0.0
+        return state
+
+    def close(self) -> None:
+        """Finishes writing, and stops the writer."""
+        self.flush()
+        self._executor.shutdown()
+        self.journal.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Writes a record to the journal. Runs on the writer."""
+        start = time.perf_counter()
+        try:
+            if record.get("reset") and not self._started:
+                moved = self.journal.start_over()
+                if moved is not None:
+                    logger.info("Moved the previous save to %s.", moved)
+            self.journal.append(record)
+        except (OSError, save_codec.EncodeError) as error:
+            logger.error("Unable to save: %s", error)
+            self._write_failed = True
+            return
+        self._started = True
+        self.write_times.record(time.perf_counter() - start)
+
+        if self.journal.records >= self.compact_every or record.get("reset"):
+            start = time.perf_counter()
+            try:
+                self.journal.compact()
+            except (OSError, SaveError) as error:
+                # The journal still has everything, so the next compaction can retry.
+                logger.error("Unable to compact the save: %s", error)
+                return
+            self.compact_times.record(time.perf_counter() - start)
@@ -0,0 +1,209 @@
+"""Runs script ticks while keeping track of what they cost."""
+
+import dataclasses
+import time
+import zlib
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from engine import scripts
+from engine.model import (
+    game_sprite,
+    spatial,
+)
+
+# A low priority script's tick won't be put off if it has already waited this long.
+MAX_DEFERRAL_SECS = 1.0
+
+
+class ScriptScheduler:
+    """Calls `on_tick` for scripts, timing each one.
+
+    Timings are attributed both to the script's class and to the sprite that owns it. If
+    there's a budget, once the scripts for a tick have used it up any remaining low
+    priority scripts are put off until a later tick. Their time keeps adding up while
+    they wait, and when they do run they get all of it as their `delta_time`. The
+    scripts that have waited the longest go first.
+
+    Scripts whose owners are outside the focus rectangle (usually what the camera can
+    see) only tick once every `far_tick_interval` ticks, again with the time they
+    missed added up. Which tick they get is spread out by sprite name so that they
+    don't all land on the same one.
+    """
+
+    budget_secs: Optional[float]
+    far_tick_interval: int
+    # Owners outside of this rectangle tick less often. None means everything is near.
+    focus: Optional[spatial.Rect]
+
+    _timer: Callable[[], float]
+    _by_class: Dict[str, scripts.ScriptCost]
+    _by_sprite: Dict[str, scripts.ScriptCost]
+    # How much time has built up for each deferred sprite.
+    _pending_secs: Dict[str, float]
+    _tick_count: int
+    _last_tick_secs: float
+    _deferred_last_tick: int
+    _far_skipped_last_tick: int
+
+    def __init__(
+        self,
+        budget_secs: Optional[float] = None,
+        far_tick_interval: int = 1,
+        timer: Callable[[], float] = time.perf_counter,
+    ):
+        """Constructor.
+
+        Args:
+            budget_secs: How long scripts get to spend ticking each tick, or None for no
+                         limit. High and normal priority scripts always run, so this is
+                         a target rather than a hard limit.
+            far_tick_interval: How often scripts outside of the focus rectangle tick.
+            timer: Returns the current time in seconds. Overridable for tests.
+        """
+        if far_tick_interval < 1:
+            raise ValueError("Far tick interval must be at least 1.")
+
+        self.budget_secs = budget_secs
+        self.far_tick_interval = far_tick_interval
+        self.focus = None
+        self._timer = timer
+        self._by_class = {}
+        self._by_sprite = {}
+        self._pending_secs = {}
+        self._tick_count = 0
+        self._last_tick_secs = 0.0
+        self._deferred_last_tick = 0
+        self._far_skipped_last_tick = 0
+
+    def tick(
+        self,
+        sprites: Iterable[game_sprite.GameSprite],
+        game_time: float,
+        delta_time: float,
+    ) -> None:
+        """Ticks the scripts for a set of sprites."""
+        start = self._timer()
+        deferrable: List[Tuple[game_sprite.GameSprite, scripts.Script]] = []
+        far_skipped = 0
+
+        for sprite in sprites:
+            script = sprite.script
+            if script is None:
+                continue
+
+            if self._skip_far(sprite, script):
+                self._pending_secs[sprite.name] = (
+                    self._pending_secs.get(sprite.name, 0.0) + delta_time
+                )
+                far_skipped += 1
+                continue
+
+            if script.tick_priority < scripts.TICK_PRIORITY_NORMAL:
+                deferrable.append((sprite, script))
+            else:
+                self._run(sprite, script, game_time, delta_time)
+
+        # Whoever has been waiting the longest goes first.
+        deferrable.sort(key=lambda item: -self._pending_secs.get(item[0].name, 0.0))
+
+        deferred = 0
+        for sprite, script in deferrable:
+            pending = self._pending_secs.get(sprite.name, 0.0)
+
+            if self._over_budget(start) and pending + delta_time < MAX_DEFERRAL_SECS:
+                self._pending_secs[sprite.name] = pending + delta_time
+                self._cost(self._by_class, _class_name(script)).deferrals += 1
+                self._cost(self._by_sprite, sprite.name).deferrals += 1
+                deferred += 1
+                continue
+
+            self._run(sprite, script, game_time, delta_time)
+
+        self._tick_count += 1
+        self._last_tick_secs = self._timer() - start
+        self._deferred_last_tick = deferred
+        self._far_skipped_last_tick = far_skipped
+
+    def forget_sprite(self, name: str) -> None:
+        """Drops everything kept for a sprite, once it has been removed."""
+        self._by_sprite.pop(name, None)
+        self._pending_secs.pop(name, None)
+
+    def forget_pending(self) -> None:
+        """Drops any time built up by deferred scripts, e.g. when the region changes."""
+        self._pending_secs = {}
+
+    @property
+    def stats(self) -> scripts.ScriptStats:
+        """Gets a snapshot of the time spent by scripts."""
+        return scripts.ScriptStats(
+            by_class={
+                name: dataclasses.replace(cost) for name, cost in self._by_class.items()
+            },
+            by_sprite={
+                name: dataclasses.replace(cost)
+                for name, cost in self._by_sprite.items()
+            },
+            budget_secs=self.budget_secs,
+            last_tick_secs=self._last_tick_secs,
+            deferred_last_tick=self._deferred_last_tick,
+            far_skipped_last_tick=self._far_skipped_last_tick,
+        )
+
+    def _over_budget(self, start: float) -> bool:
+        return self.budget_secs is not None and self._timer() - start > self.budget_secs
+
+    def _skip_far(
+        self,
+        sprite: game_sprite.GameSprite,
+        script: scripts.Script,
+    ) -> bool:
+        if self.focus is None or self.far_tick_interval == 1 or script.always_tick:
+            return False
+
+        x, y = sprite.center_x, sprite.center_y
+        if spatial.rects_overlap(self.focus, (x, y, x, y)):
+            return False
+
+        phase = zlib.crc32(sprite.name.encode()) % self.far_tick_interval
+        return (self._tick_count + phase) % self.far_tick_interval != 0
+
+    def _run(
+        self,
+        sprite: game_sprite.GameSprite,
+        script: scripts.Script,
+        game_time: float,
+        delta_time: float,
+    ) -> None:
+        delta_time += self._pending_secs.pop(sprite.name, 0.0)
+
+        start = self._timer()
+        script.on_tick(game_time, delta_time)
+        elapsed = self._timer() - start
+
+        for cost in (
+            self._cost(self._by_class, _class_name(script)),
+            self._cost(self._by_sprite, sprite.name),
+        ):
+            cost.ticks += 1
+            cost.total_secs += elapsed
+            cost.max_secs = max(cost.max_secs, elapsed)
+
+    @staticmethod
+    def _cost(costs: Dict[str, scripts.ScriptCost], key: str) -> scripts.ScriptCost:
+        cost = costs.get(key)
+        if cost is None:
+            cost = costs[key] = scripts.ScriptCost()
+        return cost
+
+
+def _class_name(script: scripts.Script) -> str:
+    cls = type(script)
+    return f"{cls.__module__}.{cls.__qualname__}"
@@ -0,0 +1,236 @@
+"""Spatial indexing helpers so we don't have to compare everything against everything."""
+
+import math
+from typing import (
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import arcade
+
+# An axis-aligned bounding box, stored as (left, bottom, right, top).
+Rect = Tuple[float, float, float, float]
+
+# The default size of a grid cell in pixels. This is two tiles wide, which is about the
+# size of the largest moving sprites we have.
+DEFAULT_CELL_SIZE = 64.0
+
+T = TypeVar("T", bound=Hashable)
+
+
+def sprite_rect(sprite: arcade.Sprite) -> Rect:
+    """Gets the axis-aligned bounding box of a sprite's hit box."""
+    points = sprite.get_adjusted_hit_box()
+
+    if len(points) == 0:
+        return (sprite.center_x, sprite.center_y, sprite.center_x, sprite.center_y)
+
+    x_points = [point[0] for point in points]
+    y_points = [point[1] for point in points]
+
+    return (min(x_points), min(y_points), max(x_points), max(y_points))
+
+
+def draw_rect(sprite: arcade.Sprite) -> Rect:
+    """Gets the area a sprite covers when it's drawn, ignoring rotation."""
+    half_width = sprite.width / 2
+    half_height = sprite.height / 2
+    return (
+        sprite.center_x - half_width,
+        sprite.center_y - half_height,
+        sprite.center_x + half_width,
+        sprite.center_y + half_height,
+    )
+
+
+def rects_overlap(rect1: Rect, rect2: Rect) -> bool:
+    """Determines if two rectangles overlap. Touching edges count as overlapping."""
+    return (
+        rect1[0] <= rect2[2]
+        and rect2[0] <= rect1[2]
+        and rect1[1] <= rect2[3]
+        and rect2[1] <= rect1[3]
+    )
+
+
+def translate(rect: Rect, dx: float, dy: float) -> Rect:
+    """Moves a rectangle by an offset."""
+    return (rect[0] + dx, rect[1] + dy, rect[2] + dx, rect[3] + dy)
+
+
+def swept_bounds(rect: Rect, dx: float, dy: float) -> Rect:
+    """Gets the rectangle covering everything a rectangle touches while it moves."""
+    return (
+        min(rect[0], rect[0] + dx),
+        min(rect[1], rect[1] + dy),
+        max(rect[2], rect[2] + dx),
+        max(rect[3], rect[3] + dy),
+    )
+
+
+def _axis_times(
+    low: float,
+    high: float,
+    delta: float,
+    obstacle_low: float,
+    obstacle_high: float,
+) -> Optional[Tuple[float, float]]:
+    """Gets the entry and exit times of a moving span against a fixed one on one axis."""
+    if delta > 0:
+        return (obstacle_low - high) / delta, (obstacle_high - low) / delta
+
+    if delta < 0:
+        return (obstacle_high - low) / delta, (obstacle_low - high) / delta
+
+    # Not moving on this axis, so we're either always overlapping or never.
+    if high > obstacle_low and low < obstacle_high:
+        return -math.inf, math.inf
+
+    return None
+
+
+def sweep(
+    rect: Rect,
+    dx: float,
+    dy: float,
+    obstacle: Rect,
+) -> Optional[Tuple[float, float, float]]:
+    """Finds when a moving rectangle first hits a fixed one.
+
+    Args:
+        rect: The rectangle at the start of the move.
+        dx: How far the rectangle moves along the X axis.
+        dy: How far the rectangle moves along the Y axis.
+        obstacle: The fixed rectangle.
+
+    Returns:
+        None if the rectangles don't touch during the move, otherwise a tuple of the
+        time of impact as a fraction of the move in [0, 1), and the X and Y components
+        of the normal of the surface that was hit. Rectangles that already overlap at
+        the start are not considered to hit each other, so that anything stuck in a
+        wall can get back out.
+    """
+    x_times = _axis_times(rect[0], rect[2], dx, obstacle[0], obstacle[2])
+    if x_times is None:
+        return None
+
+    y_times = _axis_times(rect[1], rect[3], dy, obstacle[1], obstacle[3])
+    if y_times is None:
+        return None
+
+    entry = max(x_times[0], y_times[0])
+    exit_time = min(x_times[1], y_times[1])
+
+    if entry > exit_time or entry < 0 or entry >= 1:
+        return None
+
+    if x_times[0] >= y_times[0]:
+        return entry, -math.copysign(1.0, dx), 0.0
+
+    return entry, 0.0, -math.copysign(1.0, dy)
+
+
+class SpatialGrid(Generic[T]):
+    """A uniform grid that buckets items by the cells their bounding box covers.
+
+    Queries only look at the cells that overlap the query rectangle, so the cost is
+    proportional to the number of nearby items rather than the number of items overall.
+    """
+
+    _cell_size: float
+    _cells: Dict[Tuple[int, int], List[T]]
+    _rects: Dict[T, Rect]
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive.")
+
+        self._cell_size = cell_size
+        self._cells = {}
+        self._rects = {}
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._rects
+
+    def clear(self) -> None:
+        """Removes all items from the grid."""
+        self._cells = {}
+        self._rects = {}
+
+    def insert(self, item: T, rect: Rect) -> None:
+        """Adds an item to the grid. Re-inserting an item moves it.
+
+        Moving an item only touches the cells if it ends up covering different ones.
+        """
+        old_rect = self._rects.get(item)
+        if old_rect is not None:
+            if self._cell_range(old_rect) == self._cell_range(rect):
+                self._rects[item] = rect
+                return
+            self.remove(item)
+
+        self._rects[item] = rect
+        for cell in self._cells_for(rect):
+            self._cells.setdefault(cell, []).append(item)
+
+    def remove(self, item: T) -> None:
+        """Removes an item from the grid, if it is there."""
+        rect = self._rects.pop(item, None)
+        if rect is None:
+            return
+
+        for cell in self._cells_for(rect):
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            bucket.remove(item)
+            if not bucket:
+                del self._cells[cell]
+
+    def rect(self, item: T) -> Rect:
+        """Gets the bounding box an item was inserted with."""
+        return self._rects[item]
+
+    def query(self, rect: Rect) -> Set[T]:
+        """Gets all items whose bounding box overlaps the given rectangle."""
+        found: Set[T] = set()
+
+        for cell in self._cells_for(rect):
+            for item in self._cells.get(cell, ()):
+                if item not in found and rects_overlap(rect, self._rects[item]):
+                    found.add(item)
+
+        return found
+
+    def query_point(self, x: float, y: float, radius: float = 0.0) -> Set[T]:
+        """Gets all items whose bounding box is within a radius of a point."""
+        return self.query((x - radius, y - radius, x + radius, y + radius))
+
+    def items(self) -> Iterable[T]:
+        """Gets every item in the grid."""
+        return self._rects.keys()
+
+    def _cell_range(self, rect: Rect) -> Tuple[int, int, int, int]:
+        return (
+            math.floor(rect[0] / self._cell_size),
+            math.floor(rect[1] / self._cell_size),
+            math.floor(rect[2] / self._cell_size),
+            math.floor(rect[3] / self._cell_size),
+        )
+
+    def _cells_for(self, rect: Rect) -> Iterable[Tuple[int, int]]:
+        min_x, min_y, max_x, max_y = self._cell_range(rect)
+
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                yield (cell_x, cell_y)
@@ -0,0 +1,83 @@
+"""Indexes of a region's sprites, for scripts that look them up by name or location."""
+
+from typing import (
+    Iterable,
+    List,
+    Tuple,
+)
+
+from engine.model import (
+    game_sprite,
+    prefix_index,
+    spatial,
+)
+
+
+class SpriteIndex:
+    """Finds the sprites in a region by name prefix or by distance from a point.
+
+    Sprites are indexed by their centers. The index is updated as sprites are added,
+    removed and moved, so a query costs time proportional to the number of sprites it
+    finds rather than the number in the region.
+    """
+
+    __slots__ = ("_names", "_grid")
+
+    _names: prefix_index.PrefixIndex[game_sprite.GameSprite]
+    _grid: spatial.SpatialGrid[game_sprite.GameSprite]
+
+    def __init__(self, sprites: Iterable[game_sprite.GameSprite] = ()):
+        self._names = prefix_index.PrefixIndex()
+        self._grid = spatial.SpatialGrid()
+
+        for sprite in sprites:
+            self.add(sprite)
+
+    def __len__(self) -> int:
+        return len(self._grid)
+
+    def add(self, sprite: game_sprite.GameSprite) -> None:
+        """Adds a sprite to the index."""
+        self._names.insert(sprite.name, sprite)
+        self._grid.insert(sprite, _center_rect(sprite))
+
+    def remove(self, sprite: game_sprite.GameSprite) -> None:
+        """Removes a sprite from the index, if it is there."""
+        if sprite in self._grid:
+            self._names.remove(sprite.name)
+            self._grid.remove(sprite)
+
+    def move(self, sprite: game_sprite.GameSprite) -> None:
+        """Updates where a sprite is. Sprites that aren't in the index are ignored."""
+        if sprite in self._grid:
+            self._grid.insert(sprite, _center_rect(sprite))
+
+    def with_prefix(self, prefix: str) -> List[game_sprite.GameSprite]:
+        """Gets the sprites whose names start with a prefix, sorted by name."""
+        return sorted(self._names.with_prefix(prefix), key=_by_name)
+
+    def within(
+        self,
+        location: Tuple[float, float],
+        radius: float,
+    ) -> List[game_sprite.GameSprite]:
+        """Gets the sprites whose centers are within a radius of a location."""
+        x, y = location
+        return sorted(
+            (
+                sprite
+                for sprite in self._grid.query_point(x, y, radius)
+                if (sprite.center_x - x) ** 2 + (sprite.center_y - y) ** 2
+                <= radius**2
+            ),
+            key=_by_name,
+        )
+
+
+def _center_rect(sprite: game_sprite.GameSprite) -> spatial.Rect:
+    center = (sprite.center_x, sprite.center_y)
+    return center + center
+
+
+def _by_name(sprite: game_sprite.GameSprite) -> str:
+    return sprite.name
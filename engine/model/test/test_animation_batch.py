@@ -0,0 +1,136 @@
+import unittest
+from unittest import mock
+
+import arcade
+from PIL import Image
+
+from engine.model import (
+    animation_batch,
+    game_sprite,
+)
+from engine.test import factories
+
+
+class FakeAnimated:
+    def __init__(self, frame_speed=1.0, num_frames=3):
+        self.batches = []
+        self.frame_timing = (frame_speed, num_frames)
+        self.frames = []
+
+    def show_frame(self, frame):
+        self.frames.append(frame)
+
+
+class AnimationBatchTest(unittest.TestCase):
+    def test_only_changed_frames_are_shown(self):
+        batch = animation_batch.AnimationBatch()
+        slow = FakeAnimated(frame_speed=1.0)
+        fast = FakeAnimated(frame_speed=0.5)
+        batch.add(slow)
+        batch.add(fast)
+
+        self.assertEqual(batch.update(0.25), 0)
+        self.assertEqual(batch.update(0.5), 1)
+        self.assertEqual(fast.frames, [1])
+        self.assertEqual(slow.frames, [])
+
+        batch.update(0.5)
+        self.assertEqual(fast.frames, [1, 2])
+        self.assertEqual(slow.frames, [1])
+
+    def test_wraps_around(self):
+        batch = animation_batch.AnimationBatch()
+        member = FakeAnimated(frame_speed=1.0, num_frames=2)
+        batch.add(member)
+
+        for _ in range(4):
+            batch.update(1.0)
+
+        self.assertEqual(member.frames, [1, 0, 1, 0])
+
+    def test_restart(self):
+        batch = animation_batch.AnimationBatch()
+        member = FakeAnimated(frame_speed=1.0, num_frames=4)
+        batch.add(member)
+        batch.update(2.5)
+
+        member.frame_timing = (1.0, 2)
+        batch.restart(member)
+        batch.update(0.5)
+        self.assertEqual(member.frames, [2])
+
+        batch.update(0.5)
+        self.assertEqual(member.frames, [2, 1])
+
+    def test_several_batches(self):
+        first = animation_batch.AnimationBatch()
+        second = animation_batch.AnimationBatch()
+        member = FakeAnimated(frame_speed=1.0, num_frames=4)
+        first.add(FakeAnimated())
+        first.add(member)
+        second.add(member)
+        self.assertEqual(member.batches, [first, second])
+
+        member.frame_timing = (1.0, 2)
+        for batch in member.batches:
+            batch.restart(member)
+        first.update(3.0)
+        self.assertEqual(member.frames, [1])
+
+        second.remove(member)
+        self.assertIn(member, first)
+        self.assertEqual(member.batches, [first])
+
+    def test_remove_keeps_other_slots(self):
+        batch = animation_batch.AnimationBatch(capacity=2)
+        members = [FakeAnimated(frame_speed=i + 1.0) for i in range(5)]
+        for member in members:
+            batch.add(member)
+
+        batch.remove(members[0])
+        batch.remove(members[0])
+
+        self.assertEqual(len(batch), 4)
+        self.assertNotIn(members[0], batch)
+        self.assertEqual(members[0].batches, [])
+
+        batch.update(2.0)
+        self.assertEqual(members[0].frames, [])
+        self.assertEqual(members[1].frames, [1])
+        self.assertEqual(members[4].frames, [])
+
+
+def _frames(count):
+    return [
+        arcade.Texture(f"frame{i}", image=Image.new("RGBA", (10, 10), (i, 0, 0, 255)))
+        for i in range(count)
+    ]
+
+
+class GameSpriteBatchTest(unittest.TestCase):
+    def setUp(self):
+        game_sprite.clear_texture_cache()
+        self.addCleanup(game_sprite.clear_texture_cache)
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_matches_unbatched(self, load_spritesheet):
+        load_spritesheet.side_effect = lambda *args, count, **kwargs: _frames(count)
+        sprite_spec = factories.fake_sprite_spec(
+            animations={
+                "idle": {"frame_speed": 0.3, "num_frames": 2},
+                "walk-right": {"frame_speed": 0.2, "num_frames": 3},
+            }
+        )
+        alone = game_sprite.GameSprite("alone", sprite_spec)
+        batched = game_sprite.GameSprite("batched", sprite_spec)
+        batch = animation_batch.AnimationBatch()
+        batch.add(batched)
+
+        for tick in range(40):
+            speed = 1.0 if 10 <= tick < 25 else 0.0
+            for sprite in [alone, batched]:
+                sprite.change_x = speed
+                sprite.on_update(0.05)
+            batch.update(0.05)
+
+            self.assertIs(batched.texture, alone.texture, f"tick {tick}")
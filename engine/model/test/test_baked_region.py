@@ -0,0 +1,110 @@
+import os
+import pathlib
+import pickle
+import shutil
+import struct
+import tempfile
+import unittest
+
+import pytiled_parser
+
+from engine.model import baked_region
+from engine.test import factories
+
+REGIONS_DIR = os.path.join("assets", "regions")
+REGION_FILE = "Region1Building1.json"
+TILESET_FILES = ["Interior.tsx", "interior-tileset.png"]
+
+
+HEADER = baked_region.MAGIC + struct.pack("<H", baked_region.FORMAT_VERSION)
+
+
+class BakedRegionTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+        for name in [REGION_FILE] + TILESET_FILES:
+            shutil.copy(os.path.join(REGIONS_DIR, name), self.dir)
+
+        self.region = factories.fake_region_spec(
+            tiled_mapfile=os.path.join(self.dir, REGION_FILE),
+        )
+        self.source = pytiled_parser.parse_map(pathlib.Path(self.region.tiled_mapfile))
+
+    def write_baked(self, body):
+        with open(baked_region.baked_path(self.region), "wb") as out:
+            out.write(HEADER)
+            out.write(pickle.dumps(body))
+
+    def test_round_trip(self):
+        path = baked_region.bake(self.region)
+
+        self.assertTrue(baked_region.is_fresh(self.region))
+        self.assertEqual(baked_region.load_tiled_map(self.region), self.source)
+
+        baked = baked_region.BakedRegion.read(path)
+        self.assertEqual(baked.tiled_map, self.source)
+        self.assertEqual(sorted(baked.sources), sorted([REGION_FILE] + TILESET_FILES))
+
+    def test_stale_bake_is_ignored(self):
+        path = baked_region.bake(self.region)
+        source_time = os.path.getmtime(path) + 10
+        os.utime(self.region.tiled_mapfile, (source_time, source_time))
+
+        self.assertFalse(baked_region.is_fresh(self.region))
+        self.assertIsNone(baked_region.load_tiled_map(self.region))
+
+    def test_changed_tilesets_make_the_bake_stale(self):
+        path = baked_region.bake(self.region)
+
+        for name in TILESET_FILES:
+            with self.subTest(name=name):
+                source_time = os.path.getmtime(path) + 10
+                os.utime(os.path.join(self.dir, name), (source_time, source_time))
+
+                self.assertFalse(baked_region.is_fresh(self.region))
+                self.assertIsNone(baked_region.load_tiled_map(self.region))
+
+                path = baked_region.bake(self.region)
+                os.utime(path, (source_time + 1, source_time + 1))
+                self.assertTrue(baked_region.is_fresh(self.region))
+
+    def test_missing_source_makes_the_bake_stale(self):
+        baked_region.bake(self.region)
+        os.remove(os.path.join(self.dir, "interior-tileset.png"))
+
+        self.assertFalse(baked_region.is_fresh(self.region))
+
+    def test_missing_bake_is_ignored(self):
+        self.assertFalse(baked_region.is_fresh(self.region))
+        self.assertIsNone(baked_region.load_tiled_map(self.region))
+
+    def test_corrupt_bake_is_ignored(self):
+        for data in [b"", b"not a baked region", HEADER + b"junk"]:
+            with self.subTest(data=data):
+                with open(baked_region.baked_path(self.region), "wb") as out:
+                    out.write(data)
+
+                self.assertFalse(baked_region.is_fresh(self.region))
+                self.assertIsNone(baked_region.load_tiled_map(self.region))
+                with self.assertRaises(baked_region.BakeError):
+                    baked_region.BakedRegion.read(baked_region.baked_path(self.region))
+
+    def test_only_maps_are_unpickled(self):
+        for body in [
+            # Anything outside of pytiled_parser could run code when it's unpickled.
+            {"sources": [], "tiled_map": shutil.rmtree},
+            {"sources": [], "tiled_map": pytiled_parser.parse_map},
+            {"sources": [], "tiled_map": "not a map"},
+            [self.source],
+        ]:
+            with self.subTest(body=body):
+                self.write_baked(body)
+
+                self.assertIsNone(baked_region.load_tiled_map(self.region))
+                with self.assertRaises(baked_region.BakeError):
+                    baked_region.BakedRegion.read(baked_region.baked_path(self.region))
+
+        self.write_baked({"sources": [REGION_FILE], "tiled_map": self.source})
+        self.assertEqual(baked_region.load_tiled_map(self.region), self.source)
@@ -0,0 +1,257 @@
+import unittest
+from unittest import mock
+
+import arcade
+from PIL import Image
+
+from engine.model import culling
+
+TEXTURE = arcade.Texture("square", image=Image.new("RGBA", (10, 10)))
+
+
+def make_sprite(x, y, size=10, texture=TEXTURE):
+    sprite = arcade.Sprite(texture=texture)
+    sprite.width = size
+    sprite.height = size
+    sprite.center_x = x
+    sprite.center_y = y
+    return sprite
+
+
+def make_list(sprites):
+    # Lazy, so that no GL context is needed.
+    sprite_list = arcade.SpriteList(lazy=True)
+    sprite_list.extend(sprites)
+    return sprite_list
+
+
+class CulledLayerTest(unittest.TestCase):
+    def test_draws_everything_without_a_view(self):
+        source = make_list([make_sprite(0, 0)])
+        source.draw = mock.Mock()
+        layer = culling.CulledLayer(source)
+
+        layer.draw()
+
+        source.draw.assert_called_once()
+
+    def test_set_view(self):
+        near = make_sprite(50, 50)
+        edge = make_sprite(103, 50)
+        far = make_sprite(500, 500)
+        layer = culling.CulledLayer(make_list([near, edge, far]))
+
+        layer.set_view((0, 0, 100, 100))
+
+        self.assertEqual(layer.visible_count, 2)
+        self.assertIn(near, layer._visible)
+        self.assertIn(edge, layer._visible)
+
+        layer.set_view((400, 400, 600, 600))
+
+        self.assertEqual(list(layer._visible), [far])
+
+    def test_add_and_remove(self):
+        layer = culling.CulledLayer(make_list([]))
+        layer.set_view((0, 0, 100, 100))
+
+        near = make_sprite(50, 50)
+        far = make_sprite(500, 500)
+        layer.add(near)
+        layer.add(far)
+
+        self.assertEqual(len(layer), 2)
+        self.assertEqual(list(layer._visible), [near])
+
+        layer.remove(near)
+
+        self.assertEqual(len(layer), 1)
+        self.assertEqual(list(layer._visible), [])
+
+    def test_clear(self):
+        layer = culling.CulledLayer(make_list([make_sprite(50, 50)]))
+        layer.set_view((0, 0, 100, 100))
+
+        layer.clear()
+
+        self.assertEqual(len(layer), 0)
+        self.assertEqual(layer.visible_count, 0)
+
+    def test_move(self):
+        sprite = make_sprite(500, 500)
+        layer = culling.CulledLayer(make_list([sprite]))
+        layer.set_view((0, 0, 100, 100))
+        self.assertEqual(layer.visible_count, 0)
+
+        sprite.position = (50, 50)
+        layer.move(sprite)
+        self.assertEqual(list(layer._visible), [sprite])
+
+        sprite.position = (500, 50)
+        layer.move(sprite)
+        self.assertEqual(layer.visible_count, 0)
+
+    def test_sprites_without_textures_are_not_drawn(self):
+        zone = make_sprite(50, 50, texture=None)
+        layer = culling.CulledLayer(make_list([zone]))
+
+        layer.set_view((0, 0, 100, 100))
+        self.assertEqual(layer.visible_count, 0)
+
+        layer.move(zone)
+        self.assertEqual(len(layer), 1)
+        self.assertEqual(layer.visible_count, 0)
+
+    def test_move_ignores_other_sprites(self):
+        layer = culling.CulledLayer(make_list([]))
+        layer.set_view((0, 0, 100, 100))
+
+        layer.move(make_sprite(50, 50))
+
+        self.assertEqual(len(layer), 0)
+        self.assertEqual(layer.visible_count, 0)
+
+
+class SceneCullerTest(unittest.TestCase):
+    def make_scene(self):
+        scene = arcade.Scene()
+        self.ground = make_list([make_sprite(x, 0) for x in range(0, 2000, 10)])
+        self.player = make_list([make_sprite(0, 0)])
+        self.objects = make_list([make_sprite(1000, 0)])
+        scene.add_sprite_list("Ground", sprite_list=self.ground)
+        scene.add_sprite_list("Player", sprite_list=self.player)
+        scene.add_sprite_list("Objects", sprite_list=self.objects)
+        return scene
+
+    def test_draws_scene_without_a_view(self):
+        scene = self.make_scene()
+        scene.draw = mock.Mock()
+        culler = culling.SceneCuller(scene, ["Ground", "Objects"])
+
+        culler.draw()
+
+        scene.draw.assert_called_once()
+
+    def test_view_is_snapped(self):
+        culler = culling.SceneCuller(self.make_scene(), ["Ground"], margin=10)
+
+        culler.set_view((20, 20, 100, 100))
+
+        # (10, 10, 110, 110) with the margin, snapped out to (0, 0, 128, 128). The
+        # ground sprites from x=0 to x=130 touch that.
+        self.assertEqual(culler.visible_count, 14)
+
+        with mock.patch.object(culling.CulledLayer, "set_view") as set_view:
+            culler.set_view((30, 20, 110, 100))
+            set_view.assert_not_called()
+
+            culler.set_view((300, 20, 380, 100))
+            set_view.assert_called_once_with((256, 0, 512, 128))
+
+    def test_draw_order(self):
+        scene = self.make_scene()
+        culler = culling.SceneCuller(scene, ["Ground", "Objects"])
+        culler.set_view((0, 0, 100, 100))
+
+        drawn = []
+        self.player.draw = lambda: drawn.append("Player")
+        for name in ["Ground", "Objects"]:
+            visible = culler.layer(name)._visible
+            visible.draw = lambda name=name: drawn.append(name)
+
+        culler.draw()
+
+        self.assertEqual(drawn, ["Ground", "Player", "Objects"])
+
+    def test_layer_changes(self):
+        culler = culling.SceneCuller(self.make_scene(), ["Ground", "Objects"])
+        culler.set_view((800, 0, 1200, 100))
+        self.assertEqual(culler.layer("Objects").visible_count, 1)
+
+        culler.add("Objects", [make_sprite(900, 0)])
+        self.assertEqual(culler.layer("Objects").visible_count, 2)
+
+        culler.clear("Objects")
+        self.assertEqual(culler.layer("Objects").visible_count, 0)
+
+        # Layers that aren't culled are ignored.
+        culler.add("Player", [make_sprite(900, 0)])
+        self.assertIsNone(culler.layer("Player"))
+
+    def test_static_layers(self):
+        scene = self.make_scene()
+        culler = culling.SceneCuller(
+            scene,
+            ["Objects"],
+            static_layer_names=["Ground"],
+            chunk_size=(100, 100),
+        )
+        ground = culler.static_layer("Ground")
+        self.assertEqual(ground.num_chunks, 20)
+
+        culler.set_view((0, 0, 100, 100))
+
+        # The view is snapped out to (-128, -128, 256, 256).
+        self.assertEqual(ground.visible_chunks, 3)
+        self.assertEqual(culler.visible_count, 30)
+
+        drawn = []
+        self.player.draw = lambda: drawn.append("Player")
+        ground.draw = lambda: drawn.append("Ground")
+        culler.layer("Objects").draw = lambda: drawn.append("Objects")
+
+        culler.draw()
+
+        self.assertEqual(drawn, ["Ground", "Player", "Objects"])
+
+    def test_static_layers_share_chunks(self):
+        scene = arcade.Scene()
+        ground = make_list([make_sprite(x + 5, 5) for x in range(0, 200, 10)])
+        decor = make_list([make_sprite(55, 5)])
+        high = make_list([make_sprite(55, 5)])
+        scene.add_sprite_list("Ground", sprite_list=ground)
+        scene.add_sprite_list("Decor", sprite_list=decor)
+        scene.add_sprite_list("Player", sprite_list=make_list([make_sprite(0, 0)]))
+        scene.add_sprite_list("High", sprite_list=high)
+
+        culler = culling.SceneCuller(
+            scene,
+            [],
+            static_layer_names=["Ground", "Decor", "High"],
+            chunk_size=(100, 100),
+        )
+
+        self.assertIs(culler.static_layer("Ground"), culler.static_layer("Decor"))
+        self.assertIsNot(culler.static_layer("Decor"), culler.static_layer("High"))
+        self.assertEqual(len(culler.static_layer("Ground")), 21)
+
+    def test_static_layers_that_spill_are_kept_apart(self):
+        scene = arcade.Scene()
+        # Drawn over the edge of its chunk.
+        scene.add_sprite_list("Ground", sprite_list=make_list([make_sprite(98, 5)]))
+        scene.add_sprite_list("Decor", sprite_list=make_list([make_sprite(55, 5)]))
+
+        culler = culling.SceneCuller(
+            scene,
+            [],
+            static_layer_names=["Ground", "Decor"],
+            chunk_size=(100, 100),
+        )
+
+        self.assertIsNot(culler.static_layer("Ground"), culler.static_layer("Decor"))
+
+    def test_move(self):
+        scene = self.make_scene()
+        culler = culling.SceneCuller(scene, ["Objects"])
+        culler.set_view((0, 0, 100, 100))
+        self.assertEqual(culler.visible_count, 0)
+
+        sprite = self.objects[0]
+        sprite.position = (50, 50)
+        culler.move([sprite, self.player[0]])
+
+        self.assertEqual(culler.visible_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
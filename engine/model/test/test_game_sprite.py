@@ -0,0 +1,128 @@
+import unittest
+from unittest import mock
+
+import arcade
+from PIL import Image
+
+from engine.model import game_sprite
+from engine.test import factories
+
+
+def _texture() -> arcade.Texture:
+    return arcade.Texture("frame", image=Image.new("RGBA", (10, 10)))
+
+
+class TextureCacheTest(unittest.TestCase):
+    def setUp(self):
+        game_sprite.clear_texture_cache()
+        self.addCleanup(game_sprite.clear_texture_cache)
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_sprites_share_textures(self, load_spritesheet):
+        load_spritesheet.return_value = [_texture()]
+        sprite_spec = factories.fake_sprite_spec(root_directory="rat")
+
+        first = game_sprite.GameSprite("rat1", sprite_spec)
+        second = game_sprite.GameSprite("rat2", sprite_spec)
+
+        load_spritesheet.assert_called_once()
+        self.assertIs(
+            first.animations.animations["idle"].textures,
+            second.animations.animations["idle"].textures,
+        )
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_warm(self, load_spritesheet):
+        load_spritesheet.return_value = [_texture()]
+        rat = factories.fake_sprite_spec(root_directory="rat")
+        bat = factories.fake_sprite_spec(root_directory="bat")
+
+        game_sprite.warm_texture_cache([rat, bat])
+        self.assertEqual(load_spritesheet.call_count, 2)
+
+        game_sprite.GameSprite("rat1", rat)
+        game_sprite.GameSprite("bat1", bat)
+        self.assertEqual(load_spritesheet.call_count, 2)
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_frame_size_is_part_of_key(self, load_spritesheet):
+        load_spritesheet.return_value = [_texture()]
+
+        game_sprite.warm_texture_cache(
+            [
+                factories.fake_sprite_spec(root_directory="rat", width=10),
+                factories.fake_sprite_spec(root_directory="rat", width=20),
+            ]
+        )
+
+        self.assertEqual(load_spritesheet.call_count, 2)
+
+
+class AnimationTest(unittest.TestCase):
+    def setUp(self):
+        game_sprite.clear_texture_cache()
+        self.addCleanup(game_sprite.clear_texture_cache)
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_texture_only_set_on_new_frames(self, load_spritesheet):
+        load_spritesheet.side_effect = lambda *args, count, **kwargs: [
+            arcade.Texture(f"frame{i}", image=Image.new("RGBA", (10, 10)))
+            for i in range(count)
+        ]
+        sprite_spec = factories.fake_sprite_spec(
+            animations={"idle": {"frame_speed": 1.0, "num_frames": 2}}
+        )
+        sprite = game_sprite.GameSprite("rat", sprite_spec)
+        assert sprite.animations is not None
+
+        with mock.patch.object(
+            game_sprite.GameSprite,
+            "texture",
+            new_callable=mock.PropertyMock,
+        ) as texture:
+            sprite.on_update(0.5)
+            texture.assert_not_called()
+
+            sprite.on_update(0.5)
+            texture.assert_called_once_with(
+                sprite.animations.animations["idle"].textures[1]
+            )
+
+
+class AnimationTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = game_sprite.AnimationTable(
+            ["idle", "walk-left", "walk-right", "dead"]
+        )
+
+    def test_directional(self):
+        self.assertEqual(
+            self.table.resolve(
+                game_sprite.AnimationState.WALK, game_sprite.Direction.LEFT
+            ),
+            "walk-left",
+        )
+
+    def test_falls_back_to_state(self):
+        self.assertEqual(
+            self.table.resolve(
+                game_sprite.AnimationState.IDLE, game_sprite.Direction.UP
+            ),
+            "idle",
+        )
+
+    def test_custom_state(self):
+        self.assertEqual(self.table.resolve("dead", game_sprite.Direction.DOWN), "dead")
+        self.assertEqual(
+            self.table.resolve("walk", game_sprite.Direction.RIGHT),
+            "walk-right",
+        )
+
+    def test_shared_between_specs(self):
+        first = factories.fake_sprite_spec(root_directory="rat")
+        second = factories.fake_sprite_spec(root_directory="bat")
+
+        self.assertIs(
+            game_sprite.animation_table(first),
+            game_sprite.animation_table(second),
+        )
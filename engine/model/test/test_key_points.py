@@ -0,0 +1,66 @@
+import dataclasses
+import unittest
+
+import arcade
+
+from engine.model import key_points
+
+
+def make_table():
+    return key_points.KeyPointTable.from_objects(
+        [
+            arcade.TiledObject(name="Start", shape=[0, 0]),
+            arcade.TiledObject(
+                name="Rat Waypoint 1",
+                shape=[10, 20],
+                properties={"speed": 5},
+            ),
+            arcade.TiledObject(name="Rat Waypoint 10", shape=[30, 40]),
+            arcade.TiledObject(
+                name="Pond",
+                shape=[(0, 0), (10, 0), (10, 10), (0, 10)],
+            ),
+            arcade.TiledObject(name=None, shape=[0, 0]),
+        ]
+    )
+
+
+class KeyPointTableTest(unittest.TestCase):
+    def test_exact_lookup_shares_instances(self):
+        table = make_table()
+
+        point = table.get("Rat Waypoint 1")
+        self.assertEqual(point.location, (10, 20))
+        self.assertEqual(point.properties["speed"], 5)
+        self.assertIs(table.get("Rat Waypoint 1"), point)
+        self.assertIsNone(table.get("Rat Waypoint"))
+
+    def test_points_are_immutable(self):
+        point = make_table().get("Rat Waypoint 1")
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            point.name = "Something else"
+        with self.assertRaises(TypeError):
+            point.properties["speed"] = 10
+
+    def test_skips_unnamed_objects(self):
+        self.assertEqual(len(make_table()), 4)
+
+    def test_polygon_centers(self):
+        self.assertEqual(make_table().get("Pond").location, (5, 5))
+
+    def test_queries(self):
+        table = make_table()
+
+        self.assertEqual(
+            [point.name for point in table.containing("Waypoint 1")],
+            ["Rat Waypoint 1", "Rat Waypoint 10"],
+        )
+        self.assertEqual(
+            [point.name for point in table.with_prefix("Rat")],
+            ["Rat Waypoint 1", "Rat Waypoint 10"],
+        )
+        self.assertEqual(
+            [point.name for point in table.within((5, 5, 35, 45))],
+            ["Rat Waypoint 1", "Rat Waypoint 10", "Pond"],
+        )
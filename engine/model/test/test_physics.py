@@ -8,10 +8,18 @@ from unittest import mock
 import arcade
 
 from engine.model import (
+    game_sprite,
     physics,
+    wall_grid,
 )
 
 
+def make_sprite(name: str = "sprite") -> game_sprite.GameSprite:
+    sprite = game_sprite.GameSprite(name=name)
+    sprite.set_hit_box([(-2, -2), (2, -2), (2, 2), (-2, 2)])
+    return sprite
+
+
 @mock.patch("arcade.check_for_collision_with_list")
 class PhysicsTest(unittest.TestCase):
     def test_collide_with_wall(self, mock_collide):
@@ -23,7 +31,7 @@ class PhysicsTest(unittest.TestCase):
         # in the Y direction.
         mock_collide.side_effect = [[], [wall_sprite]]
 
-        player = arcade.Sprite()
+        player = make_sprite()
         player.center_x = 11
         player.center_y = 11
         player.change_x = 2
@@ -45,7 +53,7 @@ class PhysicsTest(unittest.TestCase):
         mock_collide.return_value = []
 
         # Check in the X direction.
-        player = arcade.Sprite()
+        player = make_sprite()
         player.center_x = 1
         player.center_y = 1
         player.change_x = -2
@@ -62,7 +70,7 @@ class PhysicsTest(unittest.TestCase):
         self.assertEqual(player.center_y, 1)
 
         # Check in the Y direction.
-        player = arcade.Sprite()
+        player = make_sprite()
         player.center_x = 1
         player.center_y = 1
         player.change_x = 0
@@ -85,14 +93,14 @@ class PhysicsTest(unittest.TestCase):
         mock_collide_list.return_value = []
         mock_collide_sprite.return_value = True
 
-        sprite1 = arcade.Sprite()
+        sprite1 = make_sprite()
         sprite1.center_x = 1
         sprite1.center_y = 1
         sprite1.change_x = 2
         sprite1.change_y = 0
         sprite1.properties = {"solid": True}
 
-        sprite2 = arcade.Sprite()
+        sprite2 = make_sprite()
         sprite2.center_x = 3
         sprite2.center_y = 1
         sprite2.change_x = -2
@@ -127,14 +135,14 @@ class PhysicsTest(unittest.TestCase):
         mock_collide_list.return_value = []
         mock_collide_sprite.return_value = True
 
-        sprite1 = arcade.Sprite()
+        sprite1 = make_sprite()
         sprite1.center_x = 1
         sprite1.center_y = 1
         sprite1.change_x = 2
         sprite1.change_y = 0
         sprite1.properties = {"solid": False}
 
-        sprite2 = arcade.Sprite()
+        sprite2 = make_sprite()
         sprite2.center_x = 3
         sprite2.center_y = 1
         sprite2.change_x = -2
@@ -161,3 +169,243 @@ class PhysicsTest(unittest.TestCase):
         self.assertEqual(sprite2.center_x, 1)
         self.assertEqual(sprite2.center_y, 1)
         self.assertTrue(called)
+
+    @mock.patch("arcade.check_for_collision")
+    def test_far_apart_sprites_skip_narrow_phase(
+        self,
+        mock_collide_sprite,
+        mock_collide_list,
+    ):
+        mock_collide_list.return_value = []
+        mock_collide_sprite.return_value = True
+
+        sprite1 = make_sprite()
+        sprite1.center_x = 10
+        sprite1.center_y = 10
+
+        sprite2 = make_sprite()
+        sprite2.center_x = 90
+        sprite2.center_y = 90
+
+        engine = physics.Engine(
+            [sprite1, sprite2],
+            arcade.SpriteList(),
+            map_size=(100, 100),
+        )
+        engine.update(1.0, lambda c1, c2: self.fail("Sprites should not collide."))
+
+        mock_collide_sprite.assert_not_called()
+
+    @mock.patch("arcade.check_for_collision")
+    def test_keeps_track_of_moved_and_removed_sprites(
+        self,
+        mock_collide_sprite,
+        mock_collide_list,
+    ):
+        mock_collide_list.return_value = []
+        mock_collide_sprite.return_value = True
+
+        sprites = [make_sprite(name) for name in ["a", "b", "c"]]
+        for i, sprite in enumerate(sprites):
+            sprite.center_x, sprite.center_y = 10 + 40 * i, 10
+
+        collisions = []
+
+        engine = physics.Engine(sprites, arcade.SpriteList(), map_size=(100, 100))
+        engine.update(1.0, lambda s1, s2: collisions.append((s1.name, s2.name)))
+        self.assertEqual(collisions, [])
+
+        # Moved between updates, like a script teleporting a sprite.
+        sprites[2].center_x = 12
+        engine.remove_sprite("b")
+        engine.update(1.0, lambda s1, s2: collisions.append((s1.name, s2.name)))
+
+        self.assertEqual(collisions, [("a", "c")])
+
+    @mock.patch("arcade.check_for_collision")
+    def test_collisions_are_reported_in_order(
+        self,
+        mock_collide_sprite,
+        mock_collide_list,
+    ):
+        mock_collide_list.return_value = []
+        mock_collide_sprite.return_value = True
+
+        names = ["e", "a", "d", "b", "c"]
+        sprites = [make_sprite(name) for name in names]
+        zones = [make_sprite(f"zone-{name}") for name in names]
+        for sprite in sprites + zones:
+            sprite.center_x, sprite.center_y = 10, 10
+
+        collisions = []
+
+        engine = physics.Engine(
+            sprites,
+            arcade.SpriteList(),
+            map_size=(100, 100),
+            static_sprites=zones,
+        )
+        engine.update(1.0, lambda s1, s2: collisions.append((s1.name, s2.name)))
+
+        self.assertEqual(
+            collisions,
+            [(s1, s2) for i, s1 in enumerate(names) for s2 in names[i + 1 :]]
+            + [(s1, f"zone-{s2}") for s1 in names for s2 in names],
+        )
+
+    @mock.patch("arcade.check_for_collision")
+    def test_static_sprites(self, mock_collide_sprite, mock_collide_list):
+        mock_collide_list.return_value = []
+        mock_collide_sprite.return_value = True
+
+        sprite = make_sprite()
+        sprite.center_x = 10
+        sprite.center_y = 10
+        sprite.change_x = 2
+        sprite.properties = {"solid": False}
+
+        zone = make_sprite("zone")
+        zone.center_x = 12
+        zone.center_y = 10
+        zone.change_x = 5
+        zone.properties = {"solid": True}
+
+        collisions = []
+
+        engine = physics.Engine(
+            [sprite],
+            arcade.SpriteList(),
+            map_size=(100, 100),
+            static_sprites=[zone],
+        )
+        engine.update(1.0, lambda s1, s2: collisions.append((s1, s2)))
+
+        # The moving sprite is pushed back by the solid zone, and the zone itself never
+        # moves even though it has a speed.
+        self.assertEqual(sprite.center_x, 10)
+        self.assertEqual(zone.center_x, 12)
+        self.assertEqual(collisions, [(sprite, zone)])
+        self.assertEqual(engine.moved_sprites, [])
+
+        engine.remove_sprite("zone")
+        collisions.clear()
+        engine.update(1.0, lambda s1, s2: collisions.append((s1, s2)))
+
+        self.assertEqual(sprite.center_x, 12)
+        self.assertEqual(collisions, [])
+        self.assertEqual(engine.moved_sprites, [sprite])
+
+
+def make_wall(left: float, bottom: float, right: float, top: float) -> arcade.Sprite:
+    wall = arcade.Sprite()
+    wall.center_x = (left + right) / 2
+    wall.center_y = (bottom + top) / 2
+    half_width = (right - left) / 2
+    half_height = (top - bottom) / 2
+    wall.set_hit_box(
+        [
+            (-half_width, -half_height),
+            (half_width, -half_height),
+            (half_width, half_height),
+            (-half_width, half_height),
+        ]
+    )
+    return wall
+
+
+class SweptPhysicsTest(unittest.TestCase):
+    def test_does_not_tunnel_through_thin_wall(self):
+        wall_list = arcade.SpriteList()
+        wall_list.append(make_wall(49, 0, 51, 100))
+
+        sprite = make_sprite()
+        sprite.center_x = 10
+        sprite.center_y = 10
+        sprite.change_x = 80
+
+        engine = physics.Engine(
+            [sprite],
+            wall_list,
+            map_size=(100, 100),
+            swept=True,
+        )
+        engine.update(1.0, lambda s1, s2: None)
+
+        # The sprite is 4 pixels wide, so it should stop right against the wall.
+        self.assertAlmostEqual(sprite.center_x, 47, places=1)
+        self.assertEqual(sprite.center_y, 10)
+
+    def test_slides_along_wall(self):
+        wall_list = arcade.SpriteList()
+        wall_list.append(make_wall(49, 0, 51, 100))
+
+        sprite = make_sprite()
+        sprite.center_x = 40
+        sprite.center_y = 10
+        sprite.change_x = 20
+        sprite.change_y = 20
+
+        engine = physics.Engine(
+            [sprite],
+            wall_list,
+            map_size=(100, 100),
+            swept=True,
+        )
+        engine.update(1.0, lambda s1, s2: None)
+
+        self.assertAlmostEqual(sprite.center_x, 47, places=1)
+        self.assertAlmostEqual(sprite.center_y, 30)
+
+        # Keep moving along the wall while pressed against it.
+        sprite.change_y = 30
+        engine.update(1.0, lambda s1, s2: None)
+
+        self.assertAlmostEqual(sprite.center_x, 47, places=1)
+        self.assertAlmostEqual(sprite.center_y, 60)
+
+    def test_stops_at_edge_of_map(self):
+        sprite = make_sprite()
+        sprite.center_x = 90
+        sprite.center_y = 10
+        sprite.change_x = 20
+
+        engine = physics.Engine(
+            [sprite],
+            arcade.SpriteList(),
+            map_size=(100, 100),
+            swept=True,
+        )
+        engine.update(1.0, lambda s1, s2: None)
+
+        self.assertEqual(sprite.center_x, 90)
+
+
+class WallGridPhysicsTest(unittest.TestCase):
+    @mock.patch("arcade.check_for_collision_with_list")
+    def test_uses_wall_grid(self, mock_collide):
+        walls = [make_wall(50, 0, 60, 10), make_wall(50, 10, 60, 20)]
+        wall_list = arcade.SpriteList()
+        wall_list.extend(walls)
+
+        sprite = make_sprite()
+        sprite.center_x = 45
+        sprite.center_y = 5
+        sprite.change_x = 4
+        sprite.change_y = 10
+
+        engine = physics.Engine(
+            [sprite],
+            wall_list,
+            map_size=(100, 100),
+            walls=wall_grid.WallGrid.from_sprites(
+                walls,
+                size=(10, 10),
+                tile_size=(10, 10),
+            ),
+        )
+        engine.update(1.0, lambda s1, s2: None)
+
+        # Moving right would overlap the wall, but moving up is fine.
+        self.assertEqual(sprite.center_x, 45)
+        self.assertEqual(sprite.center_y, 15)
+        mock_collide.assert_not_called()
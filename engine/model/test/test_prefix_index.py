@@ -0,0 +1,56 @@
+import unittest
+
+from engine.model import prefix_index
+
+
+class PrefixIndexTest(unittest.TestCase):
+    def test_exact_lookup(self):
+        index = prefix_index.PrefixIndex()
+        index.insert("rat", 1)
+        index.insert("rat_spawn1", 2)
+
+        self.assertEqual(index.get("rat"), 1)
+        self.assertEqual(index.get("rat_spawn1"), 2)
+        self.assertIsNone(index.get("ra"))
+        self.assertIsNone(index.get("bat"))
+        self.assertIn("rat", index)
+        self.assertNotIn("ra", index)
+        self.assertEqual(len(index), 2)
+
+    def test_prefix_lookup(self):
+        index = prefix_index.PrefixIndex()
+        for name in ["Rat Waypoint 1", "Rat Waypoint 2", "Rat Spawn", "Start"]:
+            index.insert(name, name)
+
+        self.assertEqual(
+            sorted(index.with_prefix("Rat W")),
+            ["Rat Waypoint 1", "Rat Waypoint 2"],
+        )
+        self.assertEqual(len(list(index.with_prefix(""))), 4)
+        self.assertEqual(list(index.with_prefix("Nope")), [])
+
+    def test_replace(self):
+        index = prefix_index.PrefixIndex()
+        index.insert("rat", 1)
+        index.insert("rat", 2)
+
+        self.assertEqual(index.get("rat"), 2)
+        self.assertEqual(len(index), 1)
+
+    def test_remove(self):
+        index = prefix_index.PrefixIndex()
+        index.insert("rat", 1)
+        index.insert("rat_spawn1", 2)
+
+        index.remove("rat_spawn1")
+        index.remove("missing")
+        index.remove("ra")
+
+        self.assertEqual(list(index.with_prefix("rat")), [1])
+        self.assertEqual(len(index), 1)
+        # The branch that's no longer used is pruned.
+        self.assertIsNone(index._find("rat_"))
+
+        index.remove("rat")
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index._root.children, {})
@@ -0,0 +1,143 @@
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from engine.model import region_cache
+from engine.test import factories
+
+
+def fake_tilemap(num_sprites):
+    sprite_list = mock.MagicMock()
+    sprite_list.__len__.return_value = num_sprites
+    return mock.Mock(sprite_lists={"Tiles": sprite_list})
+
+
+class RegionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.regions = {
+            name: factories.fake_region_spec(tiled_mapfile=f"{name}.json")
+            for name in ["a", "b", "c"]
+        }
+        self.built = []
+
+    def build(self, region, tiled_map):
+        self.built.append((region.tiled_mapfile, tiled_map))
+        return fake_tilemap(num_sprites=10)
+
+    def test_loads_lazily(self):
+        cache = region_cache.RegionCache(self.regions, build=self.build)
+
+        self.assertEqual(self.built, [])
+
+        tilemap = cache.get("a")
+
+        self.assertIs(cache.get("a"), tilemap)
+        self.assertEqual(self.built, [("a.json", None)])
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+
+    def test_evicts_least_recently_used(self):
+        cache = region_cache.RegionCache(
+            self.regions,
+            budget_bytes=2 * 10 * region_cache.BYTES_PER_TILE_SPRITE,
+            build=self.build,
+        )
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+
+        self.assertEqual(cache.loaded_regions, ["a", "c"])
+        self.assertEqual(cache.used_bytes, 2 * 10 * region_cache.BYTES_PER_TILE_SPRITE)
+
+        # Evicted regions get loaded again.
+        cache.get("b")
+        self.assertEqual(len(self.built), 4)
+
+    def test_keeps_current_region_over_budget(self):
+        cache = region_cache.RegionCache(self.regions, budget_bytes=0, build=self.build)
+
+        cache.get("a")
+        cache.get("b")
+
+        self.assertEqual(cache.loaded_regions, ["b"])
+
+    def test_prefetch_parses_in_background(self):
+        parsed = mock.Mock()
+        parse = mock.Mock(return_value=parsed)
+
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            cache = region_cache.RegionCache(
+                self.regions,
+                executor=executor,
+                parse=parse,
+                build=self.build,
+            )
+            cache.get("a")
+            cache.prefetch(["a", "b", "unknown"])
+            cache.get("b")
+
+        parse.assert_called_once_with(self.regions["b"])
+        self.assertEqual(self.built, [("a.json", None), ("b.json", parsed)])
+
+    def test_drops_prefetches_no_longer_wanted(self):
+        pending = {name: mock.Mock() for name in self.regions}
+        executor = mock.Mock()
+        executor.submit.side_effect = lambda parse, region: pending[
+            region.tiled_mapfile[0]
+        ]
+        cache = region_cache.RegionCache(
+            self.regions,
+            executor=executor,
+            build=self.build,
+        )
+
+        cache.prefetch(["b", "c"])
+        cache.prefetch(["a", "c"])
+
+        pending["b"].cancel.assert_called_once_with()
+        self.assertEqual(executor.submit.call_count, 3)
+
+        # Loading a region uses up its prefetch.
+        cache.get("a")
+        cache.prefetch([])
+
+        pending["a"].cancel.assert_not_called()
+        pending["c"].cancel.assert_called_once_with()
+
+    def test_close(self):
+        executor = mock.Mock()
+        cache = region_cache.RegionCache(
+            self.regions,
+            executor=executor,
+            build=self.build,
+        )
+        cache.prefetch(["b"])
+
+        cache.close()
+
+        executor.submit.return_value.cancel.assert_called_once_with()
+        executor.shutdown.assert_called_once_with(wait=False)
+
+        # Regions still load, just without prefetching.
+        cache.prefetch(["c"])
+        cache.get("b")
+        self.assertEqual(executor.submit.call_count, 1)
+        self.assertEqual(self.built, [("b.json", None)])
+
+    def test_falls_back_when_prefetch_fails(self):
+        parse = mock.Mock(side_effect=IOError("oops"))
+
+        with futures.ThreadPoolExecutor(max_workers=1) as executor:
+            cache = region_cache.RegionCache(
+                self.regions,
+                executor=executor,
+                parse=parse,
+                build=self.build,
+            )
+            cache.prefetch(["b"])
+            with self.assertLogs(region_cache.logger):
+                cache.get("b")
+
+        self.assertEqual(self.built, [("b.json", None)])
@@ -0,0 +1,141 @@
+import io
+import unittest
+
+from engine.model import save_codec
+
+
+class Point:
+    def __init__(self, x, y=0):
+        self.x = x
+        self.y = y
+
+
+class SaveCodecTest(unittest.TestCase):
+    def setUp(self):
+        save_codec.register(Point, 900, {"x": 1, "y": 2})
+        self.addCleanup(save_codec.unregister, Point)
+
+    def test_round_trip(self):
+        values = [
+            None,
+            True,
+            False,
+            0,
+            -1,
+            2**70,
+            -(2**70),
+            0.5,
+            0.1,
+            float("inf"),
+            1e300,
+            -1e39,
+            (1e39, 0.5),
+            (0.5, -1e300),
+            "",
+            "héllo",
+            b"\x00\xff",
+            [],
+            [1, [2, "three"]],
+            (1.5, -2.5),
+            {},
+            {"a": {"b": None}, 3: (True,)},
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                decoded = save_codec.loads(save_codec.dumps(value))
+                self.assertEqual(decoded, value)
+                self.assertIs(type(decoded), type(value))
+
+    def test_small_values_are_small(self):
+        self.assertEqual(len(save_codec.dumps(5)), 2)
+        self.assertEqual(len(save_codec.dumps(-5)), 2)
+        # Floats that fit in four bytes are stored in four.
+        self.assertEqual(len(save_codec.dumps(123.25)), 5)
+        self.assertEqual(len(save_codec.dumps(0.1)), 9)
+        # Floats too big for four bytes take eight.
+        self.assertEqual(len(save_codec.dumps(1e39)), 9)
+        self.assertEqual(len(save_codec.dumps((1.5, 2.5))), 9)
+        self.assertEqual(len(save_codec.dumps((1e39, 2.5))), 16)
+
+    def test_registered_types(self):
+        decoded = save_codec.loads(save_codec.dumps({"p": Point(3, [4])}))
+
+        self.assertIsInstance(decoded["p"], Point)
+        self.assertEqual((decoded["p"].x, decoded["p"].y), (3, [4]))
+
+    def test_unregistered_types(self):
+        with self.assertRaises(save_codec.EncodeError):
+            save_codec.dumps([object()])
+
+    def test_already_registered(self):
+        with self.assertRaises(ValueError):
+            save_codec.register(Point, 901, {})
+        with self.assertRaises(ValueError):
+            save_codec.register(int, 900, {})
+
+    def test_fields_can_change(self):
+        data = save_codec.dumps(Point(1, 2))
+        save_codec.unregister(Point)
+        # A field was dropped and another added, with a default.
+        save_codec.register(Point, 900, {"x": 1, "z": 3})
+
+        decoded = save_codec.loads(data)
+        self.assertEqual((decoded.x, decoded.y), (1, 0))
+
+    def test_custom_make(self):
+        save_codec.unregister(Point)
+        save_codec.register(
+            Point, 900, {"x": 1, "y": 2}, lambda x, y: Point(x * 10, y * 10)
+        )
+
+        decoded = save_codec.loads(save_codec.dumps(Point(1, 2)))
+        self.assertEqual((decoded.x, decoded.y), (10, 20))
+
+    def test_bad_data(self):
+        data = save_codec.dumps({"a": [1, 2, 3]})
+
+        with self.assertRaises(save_codec.TruncatedError):
+            save_codec.loads(data[:-1])
+        with self.assertRaises(save_codec.TruncatedError):
+            save_codec.loads(save_codec.dumps(0.1)[:-1])
+        with self.assertRaises(save_codec.DecodeError):
+            save_codec.loads(b"\x06\x01\xff")
+        with self.assertRaises(save_codec.DecodeError):
+            save_codec.loads(data + b"\x00")
+        with self.assertRaises(save_codec.DecodeError):
+            save_codec.loads(b"\xff")
+        with self.assertRaises(save_codec.DecodeError):
+            save_codec.loads(save_codec.dumps(Point(1))[:1] + b"\x7f\x00")
+
+    def test_frames(self):
+        stream = io.BytesIO()
+        save_codec.write_header(stream, 300)
+        save_codec.write_frame(stream, {"small": 1})
+        save_codec.write_frame(stream, ["big"] * 1000)
+        save_codec.write_frame(stream, Point(1, 2), compress_min_bytes=0)
+        self.assertLess(len(stream.getvalue()), 1000)
+
+        stream.seek(0)
+        self.assertEqual(save_codec.read_header(stream), 300)
+        frames = save_codec.iter_frames(stream)
+        self.assertEqual(next(frames), {"small": 1})
+        self.assertEqual(next(frames), ["big"] * 1000)
+        self.assertEqual(next(frames).y, 2)
+        self.assertEqual(list(frames), [])
+
+    def test_truncated_frames(self):
+        stream = io.BytesIO()
+        save_codec.write_frame(stream, "first")
+        save_codec.write_frame(stream, "second")
+        data = stream.getvalue()
+
+        frames = save_codec.iter_frames(io.BytesIO(data[:-2]))
+        self.assertEqual(next(frames), "first")
+        with self.assertRaises(save_codec.TruncatedError):
+            next(frames)
+
+    def test_bad_header(self):
+        with self.assertRaises(save_codec.DecodeError):
+            save_codec.read_header(io.BytesIO(b"nope"))
+        with self.assertRaises(save_codec.TruncatedError):
+            save_codec.read_header(io.BytesIO(save_codec.MAGIC[:2]))
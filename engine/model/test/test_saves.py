@@ -0,0 +1,514 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from engine.model import (
+    game_sprite,
+    save_codec,
+    saves,
+    world,
+)
+
+
+def sprite_state(x=0.0, y=0.0, **data):
+    return game_sprite.SpriteState(location=(x, y), facing=(1.0, 0.0), data=data)
+
+
+class Quest:
+    def __init__(self, step):
+        self.step = step
+
+
+class FakeSprite:
+    def __init__(self, name, state):
+        self.name = name
+        self.state = state
+
+
+class FakeWorld:
+    def __init__(self, active_region="Region1"):
+        self.active_region = active_region
+        self.region_states = {}
+        self.player_sprite = FakeSprite("player", sprite_state(5, 5))
+        self.sprites = {}
+
+    def add(self, name, state):
+        self.sprites[name] = FakeSprite(name, state)
+
+    def get_sprites(self, name):
+        assert name is None
+        return self.sprites.values()
+
+    def leave(self, region):
+        self.region_states[self.active_region] = world.RegionState(
+            sprite_states={name: sprite.state for name, sprite in self.sprites.items()}
+        )
+        self.active_region = region
+        self.sprites = {}
+
+
+class StateTrackerTest(unittest.TestCase):
+    def test_first_record_has_everything(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2, opened=False))
+        tracker = saves.StateTracker()
+
+        record = tracker.record(game_world)
+
+        self.assertEqual(list(record), ["reset", "active_region", "player", "sprites"])
+        self.assertTrue(record["reset"])
+        self.assertEqual(record["active_region"], "Region1")
+        self.assertEqual(record["player"].to_state(), sprite_state(5, 5))
+        self.assertEqual(list(record["sprites"]), ["Region1"])
+        self.assertEqual(
+            record["sprites"]["Region1"]["chest"].to_state(),
+            sprite_state(1, 2, opened=False),
+        )
+
+    def test_only_changes_are_recorded(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2, opened=False))
+        game_world.add("slime", sprite_state(10, 10))
+        tracker = saves.StateTracker()
+        tracker.record(game_world)
+
+        self.assertIsNone(tracker.record(game_world))
+
+        game_world.sprites["chest"].state = sprite_state(1, 2, opened=True)
+        record = tracker.record(game_world)
+
+        self.assertEqual(list(record), ["sprites"])
+        self.assertEqual(list(record["sprites"]["Region1"]), ["chest"])
+
+    def test_data_changed_in_place(self):
+        game_world = FakeWorld()
+        game_world.player_sprite.state.data["coins"] = 1
+        tracker = saves.StateTracker()
+        tracker.record(game_world)
+
+        game_world.player_sprite.state.data["coins"] = 2
+        record = tracker.record(game_world)
+
+        self.assertEqual(record["player"].to_state().data, {"coins": 2})
+
+    def test_objects_in_data(self):
+        save_codec.register(Quest, 900, {"step": 1})
+        self.addCleanup(save_codec.unregister, Quest)
+        game_world = FakeWorld()
+        game_world.player_sprite.state.data["quest"] = Quest("started")
+        tracker = saves.StateTracker()
+        tracker.record(game_world)
+
+        # Equal objects aren't recorded again, even though they're not the same object.
+        game_world.player_sprite.state.data["quest"] = Quest("started")
+        self.assertIsNone(tracker.record(game_world))
+
+        game_world.player_sprite.state.data["quest"].step = "finished"
+        record = tracker.record(game_world)
+        self.assertEqual(record["player"].to_state().data["quest"].step, "finished")
+
+    def test_sprites_that_cannot_be_saved(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2, opened=False))
+        game_world.add("door", sprite_state(3, 4))
+        game_world.add("rat", sprite_state(5, 6, quest=Quest("started")))
+        tracker = saves.StateTracker()
+
+        with self.assertLogs(saves.logger, "ERROR"):
+            record = tracker.record(game_world)
+        self.assertEqual(list(record["sprites"]["Region1"]), ["chest", "door"])
+
+        # Removing another sprite is still noticed.
+        del game_world.sprites["door"]
+        with self.assertLogs(saves.logger, "ERROR"):
+            record = tracker.record(game_world)
+        self.assertEqual(record["sprites"], {"Region1": {"door": None}})
+
+        game_world.sprites["rat"].state.data["quest"] = "started"
+        record = tracker.record(game_world)
+        self.assertEqual(list(record["sprites"]["Region1"]), ["rat"])
+
+    def test_removed_sprites(self):
+        game_world = FakeWorld()
+        game_world.add("slime", sprite_state(10, 10))
+        tracker = saves.StateTracker()
+        tracker.record(game_world)
+
+        del game_world.sprites["slime"]
+        game_world.add("slime2", sprite_state(10, 10))
+        record = tracker.record(game_world)
+
+        self.assertEqual(record["sprites"]["Region1"]["slime"], None)
+        self.assertIn("slime2", record["sprites"]["Region1"])
+
+    def test_regions(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2))
+        tracker = saves.StateTracker()
+        tracker.record(game_world)
+
+        game_world.leave("Region2")
+        record = tracker.record(game_world)
+
+        # The old region hasn't changed, and the new one is recorded even though it's
+        # empty.
+        self.assertEqual(record["active_region"], "Region2")
+        self.assertEqual(record["sprites"], {"Region2": {}})
+
+        # Unchanged regions that weren't left again aren't compared.
+        with mock.patch.object(saves, "_changed", return_value=False) as changed:
+            self.assertIsNone(tracker.record(game_world))
+            changed.assert_called_once()
+
+    def test_reset(self):
+        tracker = saves.StateTracker()
+        tracker.reset(
+            world.WorldState(
+                active_region="Region1",
+                player_state=sprite_state(5, 5),
+                region_states={
+                    "Region1": world.RegionState(
+                        sprite_states={"chest": sprite_state(1, 2)}
+                    ),
+                },
+            )
+        )
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2))
+
+        self.assertIsNone(tracker.record(game_world))
+
+
+class SaveJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def make_journal(self):
+        journal = saves.SaveJournal(self.directory.name, durable=False)
+        self.addCleanup(journal.close)
+        return journal
+
+    def read_snapshot_frames(self):
+        path = os.path.join(self.directory.name, saves.SNAPSHOT_NAME)
+        with open(path, "rb") as infile:
+            self.assertEqual(save_codec.read_header(infile), saves.FORMAT_VERSION)
+            with gzip.GzipFile(fileobj=infile) as stream:
+                return list(save_codec.iter_frames(stream))
+
+    def test_nothing_saved(self):
+        self.assertIsNone(self.make_journal().load())
+
+    def test_replay(self):
+        journal = self.make_journal()
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.append({"sprites": {"Region1": {"chest": {"opened": True}}}})
+        journal.append({"sprites": {"Region1": {"chest": None}, "Region2": {}}})
+
+        self.assertEqual(
+            journal.load(),
+            {
+                "active_region": "Region1",
+                "player": {},
+                "regions": {"Region1": {}, "Region2": {}},
+            },
+        )
+
+    def test_reopened(self):
+        journal = self.make_journal()
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.close()
+
+        journal = self.make_journal()
+        journal.append({"active_region": "Region2"})
+
+        self.assertEqual(journal.load()["active_region"], "Region2")
+        self.assertEqual(len(journal._segments()), 2)
+
+    def test_partial_record_is_ignored(self):
+        journal = self.make_journal()
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.append({"active_region": "Region2"})
+        journal.close()
+
+        path = journal._segment_path(1)
+        with open(path, "rb") as infile:
+            contents = infile.read()
+        with open(path, "wb") as outfile:
+            outfile.write(contents[:-5])
+
+        with self.assertLogs(saves.logger, "WARNING"):
+            state = self.make_journal().load()
+        self.assertEqual(state["active_region"], "Region1")
+
+    def test_compact(self):
+        journal = self.make_journal()
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.compact()
+        journal.append({"sprites": {"Region1": {"chest": {}}}})
+        journal.compact()
+        journal.append({"active_region": "Region2"})
+
+        self.assertEqual(journal._segments(), [3])
+        self.assertEqual(
+            self.read_snapshot_frames(),
+            [
+                {"segment": 2},
+                {"active_region": "Region1", "player": {}},
+                {"sprites": {"Region1": {"chest": {}}}},
+            ],
+        )
+
+        self.assertEqual(
+            journal.load(),
+            {
+                "active_region": "Region2",
+                "player": {},
+                "regions": {"Region1": {"chest": {}}},
+            },
+        )
+
+    def test_large_records_are_compressed(self):
+        journal = self.make_journal()
+        sprites = {f"sprite{i}": {"hp": 10} for i in range(100)}
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.append({"sprites": {"Region1": sprites}})
+
+        self.assertLess(journal.bytes_written, len(save_codec.dumps(sprites)))
+        self.assertEqual(journal.load()["regions"]["Region1"], sprites)
+
+    @mock.patch.object(saves, "SNAPSHOT_SPRITES_PER_FRAME", 2)
+    def test_large_regions_are_split_in_the_snapshot(self):
+        journal = self.make_journal()
+        sprites = {f"sprite{i}": {"hp": i} for i in range(5)}
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+        journal.append({"sprites": {"Region1": sprites, "Region2": {}}})
+        journal.compact()
+
+        frames = self.read_snapshot_frames()
+        self.assertEqual(
+            [list(frame["sprites"]["Region1"]) for frame in frames[2:5]],
+            [["sprite0", "sprite1"], ["sprite2", "sprite3"], ["sprite4"]],
+        )
+        self.assertEqual(frames[5], {"sprites": {"Region2": {}}})
+        self.assertEqual(
+            self.make_journal().load()["regions"],
+            {"Region1": sprites, "Region2": {}},
+        )
+
+    def test_failed_write_starts_a_new_segment(self):
+        journal = self.make_journal()
+        journal.append({"reset": True, "active_region": "Region1", "player": {}})
+
+        with mock.patch.object(journal._file, "write", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                journal.append({"active_region": "Region2"})
+
+        journal.append({"active_region": "Region3"})
+
+        self.assertEqual(journal._segments(), [1, 2])
+        self.assertEqual(journal.load()["active_region"], "Region3")
+
+    def test_durable_appends_are_synced(self):
+        journal = saves.SaveJournal(self.directory.name)
+        self.addCleanup(journal.close)
+
+        with mock.patch.object(saves, "_sync_data") as sync_data:
+            journal.append({"reset": True, "active_region": "Region1", "player": {}})
+
+        sync_data.assert_called_once_with(journal._file.fileno())
+
+    def test_unknown_version(self):
+        path = os.path.join(self.directory.name, saves.SNAPSHOT_NAME)
+        with open(path, "wb") as outfile:
+            save_codec.write_header(outfile, 0)
+
+        with self.assertRaises(saves.SaveError):
+            self.make_journal()
+
+
+class SaveManagerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # Old saves are moved next to the save, so keep them in the temporary directory.
+        self.parent = directory.name
+        self.directory = os.path.join(directory.name, "save")
+
+    def make_manager(self, **kwargs):
+        manager = saves.SaveManager(self.directory, durable=False, **kwargs)
+        self.addCleanup(manager.close)
+        return manager
+
+    def test_round_trip(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2, opened=False))
+        manager = self.make_manager(compact_every=2)
+        self.assertTrue(manager.save(game_world))
+        self.assertFalse(manager.save(game_world))
+
+        game_world.sprites["chest"].state = sprite_state(1, 2, opened=True)
+        game_world.leave("Region2")
+        game_world.add("slime", sprite_state(3, 4))
+        manager.save(game_world)
+        game_world.player_sprite.state = sprite_state(6, 7)
+        manager.save(game_world)
+        manager.close()
+
+        state = self.make_manager().load()
+
+        self.assertEqual(state.active_region, "Region2")
+        self.assertEqual(state.player_state, sprite_state(6, 7))
+        self.assertEqual(
+            state.region_states["Region1"].sprite_states,
+            {"chest": sprite_state(1, 2, opened=True)},
+        )
+        self.assertEqual(
+            state.region_states["Region2"].sprite_states,
+            {"slime": sprite_state(3, 4)},
+        )
+
+    def test_new_game_moves_old_save_aside(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2))
+        old_manager = self.make_manager()
+        old_manager.save(game_world)
+        old_manager.close()
+
+        game_world = FakeWorld("Region2")
+        manager = self.make_manager()
+        with self.assertLogs(saves.logger, "INFO"):
+            manager.save(game_world)
+            manager.flush()
+        # Later saves of the same game don't move anything.
+        game_world.player_sprite.state = sprite_state(6, 7)
+        manager.save(game_world)
+
+        state = manager.load()
+        self.assertEqual(state.active_region, "Region2")
+        self.assertEqual(list(state.region_states), ["Region2"])
+
+        (previous,) = [name for name in os.listdir(self.parent) if name != "save"]
+        self.assertTrue(previous.startswith("save.previous-"))
+        old_state = saves.SaveManager(
+            os.path.join(self.parent, previous), durable=False
+        ).load()
+        self.assertEqual(old_state.active_region, "Region1")
+
+    def test_corrupt_save_is_moved_aside(self):
+        os.makedirs(self.directory)
+        with open(os.path.join(self.directory, saves.SNAPSHOT_NAME), "wb") as outfile:
+            outfile.write(b"garbage")
+        game_spec = mock.Mock(save_dir=self.directory, autosave_secs=None)
+
+        with self.assertLogs(saves.logger, "ERROR"):
+            manager = saves.SaveManager.from_spec(game_spec)
+        self.addCleanup(manager.close)
+
+        self.assertIsNone(manager.load())
+        (corrupt,) = [name for name in os.listdir(self.parent) if name != "save"]
+        self.assertTrue(corrupt.startswith("save.corrupt-"))
+
+    def test_unreadable_save_turns_saving_off(self):
+        game_spec = mock.Mock(save_dir=self.directory, autosave_secs=None)
+
+        with mock.patch.object(
+            saves.SaveJournal, "_snapshot_segment", side_effect=saves.SaveError("bad")
+        ), self.assertLogs(saves.logger, "ERROR"):
+            self.assertIsNone(saves.SaveManager.from_spec(game_spec))
+
+    def test_save_after_load(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2))
+        old_manager = self.make_manager()
+        old_manager.save(game_world)
+        old_manager.close()
+
+        manager = self.make_manager()
+        manager.load()
+
+        self.assertFalse(manager.save(game_world))
+
+    def test_save_with_data_that_cannot_be_saved(self):
+        game_world = FakeWorld()
+        game_world.player_sprite.state.data["big"] = (1e39, 0.5)
+        game_world.add("chest", sprite_state(1, 2, quest=Quest("started")))
+        manager = self.make_manager()
+
+        with self.assertLogs(saves.logger, "ERROR"):
+            self.assertTrue(manager.save(game_world))
+        manager.close()
+
+        state = self.make_manager().load()
+        self.assertEqual(state.player_state.data, {"big": (1e39, 0.5)})
+        self.assertEqual(state.region_states["Region1"].sprite_states, {})
+
+    def test_save_if_due(self):
+        game_world = FakeWorld()
+        manager = self.make_manager(autosave_secs=10.0)
+
+        self.assertFalse(manager.save_if_due(game_world, 5.0))
+        self.assertTrue(manager.save_if_due(game_world, 10.0))
+
+        game_world.player_sprite.state = sprite_state(6, 7)
+        self.assertFalse(manager.save_if_due(game_world, 15.0))
+        self.assertTrue(manager.save_if_due(game_world, 20.0))
+
+    def test_writes_happen_on_the_writer(self):
+        manager = self.make_manager()
+        threads = []
+        original_append = manager.journal.append
+
+        def append(record):
+            threads.append(threading.current_thread().name)
+            original_append(record)
+
+        manager.journal.append = append
+        manager.save(FakeWorld())
+        manager.flush()
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("save-writer"))
+        self.assertEqual(manager.capture_times.count, 1)
+        self.assertEqual(manager.write_times.count, 1)
+        # The first save of a new game compacts the journal.
+        self.assertEqual(manager.compact_times.count, 1)
+
+    def test_failed_write(self):
+        game_world = FakeWorld()
+        game_world.add("chest", sprite_state(1, 2))
+        manager = self.make_manager()
+        manager.save(game_world)
+        manager.flush()
+
+        game_world.player_sprite.state = sprite_state(6, 7)
+        with mock.patch.object(
+            manager.journal, "append", side_effect=OSError("full")
+        ), self.assertLogs(saves.logger, "ERROR"):
+            manager.save(game_world)
+            manager.flush()
+
+        # Everything is written again, since it's not known what was lost.
+        records = []
+        original_append = manager.journal.append
+
+        def append(record):
+            records.append(record)
+            original_append(record)
+
+        manager.journal.append = append
+        manager.save(game_world)
+        manager.flush()
+
+        (record,) = records
+        self.assertTrue(record["reset"])
+        self.assertIn("chest", record["sprites"]["Region1"])
+        self.assertEqual(manager.load().player_state, sprite_state(6, 7))
+
+
+if __name__ == "__main__":
+    unittest.main()
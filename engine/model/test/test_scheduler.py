@@ -0,0 +1,155 @@
+import unittest
+from unittest import mock
+
+from engine import scripts
+from engine.model import scheduler
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowScript(scripts.Script):
+    def __init__(self, timer, cost, priority=scripts.TICK_PRIORITY_NORMAL):
+        super().__init__()
+        self.timer = timer
+        self.cost = cost
+        self.tick_priority = priority
+        self.deltas = []
+
+    def on_tick(self, game_time, delta_time):
+        self.timer.now += self.cost
+        self.deltas.append(delta_time)
+
+
+def make_sprite(name, script):
+    sprite = mock.Mock(script=script)
+    sprite.name = name
+    return sprite
+
+
+class ScriptSchedulerTest(unittest.TestCase):
+    def test_tracks_cost(self):
+        timer = FakeTimer()
+        sched = scheduler.ScriptScheduler(timer=timer)
+        sprites = [
+            make_sprite("a", SlowScript(timer, 0.002)),
+            make_sprite("b", SlowScript(timer, 0.004)),
+            make_sprite("c", None),
+        ]
+
+        sched.tick(sprites, 0.0, 0.1)
+        sched.tick(sprites, 0.1, 0.1)
+
+        stats = sched.stats
+        self.assertEqual(stats.by_sprite["a"].ticks, 2)
+        self.assertAlmostEqual(stats.by_sprite["b"].mean_secs, 0.004)
+        self.assertAlmostEqual(stats.by_sprite["b"].max_secs, 0.004)
+        self.assertNotIn("c", stats.by_sprite)
+
+        (class_cost,) = stats.by_class.values()
+        self.assertEqual(class_cost.ticks, 4)
+        self.assertAlmostEqual(class_cost.total_secs, 0.012)
+        self.assertAlmostEqual(stats.last_tick_secs, 0.006)
+
+    def test_defers_low_priority_over_budget(self):
+        timer = FakeTimer()
+        sched = scheduler.ScriptScheduler(budget_secs=0.005, timer=timer)
+
+        important = SlowScript(timer, 0.01)
+        low1 = SlowScript(timer, 0.001, priority=scripts.TICK_PRIORITY_LOW)
+        low2 = SlowScript(timer, 0.001, priority=scripts.TICK_PRIORITY_LOW)
+        sprites = [
+            make_sprite("low1", low1),
+            make_sprite("important", important),
+            make_sprite("low2", low2),
+        ]
+
+        sched.tick(sprites, 0.0, 0.1)
+
+        # The important script always runs, but it used up the budget.
+        self.assertEqual(important.deltas, [0.1])
+        self.assertEqual(low1.deltas, [])
+        self.assertEqual(low2.deltas, [])
+        self.assertEqual(sched.stats.deferred_last_tick, 2)
+        self.assertEqual(sched.stats.by_sprite["low1"].deferrals, 1)
+
+        # Once there's room, deferred scripts get all the time they missed.
+        important.cost = 0.0
+        sched.tick(sprites, 0.1, 0.1)
+
+        self.assertEqual(low1.deltas, [0.2])
+        self.assertEqual(low2.deltas, [0.2])
+
+    def test_does_not_defer_forever(self):
+        timer = FakeTimer()
+        sched = scheduler.ScriptScheduler(budget_secs=0.005, timer=timer)
+
+        important = SlowScript(timer, 0.01)
+        low = SlowScript(timer, 0.001, priority=scripts.TICK_PRIORITY_LOW)
+        sprites = [make_sprite("important", important), make_sprite("low", low)]
+
+        ticks = int(scheduler.MAX_DEFERRAL_SECS / 0.25) + 1
+        for i in range(ticks):
+            sched.tick(sprites, i * 0.25, 0.25)
+
+        self.assertEqual(len(low.deltas), 1)
+        self.assertAlmostEqual(low.deltas[0], scheduler.MAX_DEFERRAL_SECS)
+
+    def test_far_scripts_tick_less_often(self):
+        timer = FakeTimer()
+        sched = scheduler.ScriptScheduler(far_tick_interval=4, timer=timer)
+        sched.focus = (0, 0, 100, 100)
+
+        near = SlowScript(timer, 0.0)
+        far = SlowScript(timer, 0.0)
+        pinned = SlowScript(timer, 0.0)
+        pinned.always_tick = True
+
+        near_sprite = make_sprite("near", near)
+        near_sprite.center_x, near_sprite.center_y = 50, 50
+        far_sprite = make_sprite("far", far)
+        far_sprite.center_x, far_sprite.center_y = 500, 500
+        pinned_sprite = make_sprite("pinned", pinned)
+        pinned_sprite.center_x, pinned_sprite.center_y = 500, 500
+        sprites = [near_sprite, far_sprite, pinned_sprite]
+
+        for i in range(8):
+            sched.tick(sprites, i * 0.1, 0.1)
+
+        self.assertEqual(len(near.deltas), 8)
+        self.assertEqual(len(pinned.deltas), 8)
+
+        # The far script still gets all of the time, just in bigger chunks.
+        self.assertEqual(len(far.deltas), 2)
+        self.assertAlmostEqual(far.deltas[1], 0.4)
+
+        # Coming into view ticks it straight away with whatever it missed.
+        far_sprite.center_x, far_sprite.center_y = 60, 60
+        sched.tick(sprites, 0.8, 0.1)
+
+        self.assertEqual(len(far.deltas), 3)
+        self.assertAlmostEqual(sum(far.deltas), 0.9)
+
+    def test_forgets_removed_sprites(self):
+        timer = FakeTimer()
+        sched = scheduler.ScriptScheduler(budget_secs=0.005, timer=timer)
+
+        important = SlowScript(timer, 0.01)
+        low = SlowScript(timer, 0.001, priority=scripts.TICK_PRIORITY_LOW)
+        sprites = [make_sprite("important", important), make_sprite("low", low)]
+
+        sched.tick(sprites, 0.0, 0.1)
+        sched.forget_sprite("low")
+
+        self.assertNotIn("low", sched.stats.by_sprite)
+        self.assertIn("important", sched.stats.by_sprite)
+
+        # A new sprite with the same name doesn't get the old one's time.
+        important.cost = 0.0
+        sched.tick(sprites, 0.1, 0.1)
+        self.assertEqual(low.deltas, [0.1])
@@ -0,0 +1,80 @@
+import unittest
+
+from engine.model import spatial
+
+
+class SpatialGridTest(unittest.TestCase):
+    def test_query_finds_overlapping_items(self):
+        grid = spatial.SpatialGrid(cell_size=10)
+        grid.insert("a", (0, 0, 5, 5))
+        grid.insert("b", (4, 4, 25, 25))
+        grid.insert("c", (50, 50, 55, 55))
+
+        self.assertEqual(grid.query((1, 1, 2, 2)), {"a"})
+        self.assertEqual(grid.query((3, 3, 20, 20)), {"a", "b"})
+        self.assertEqual(grid.query((30, 30, 40, 40)), set())
+
+    def test_same_cell_without_overlap(self):
+        grid = spatial.SpatialGrid(cell_size=100)
+        grid.insert("a", (0, 0, 5, 5))
+        grid.insert("b", (10, 10, 15, 15))
+
+        self.assertEqual(grid.query((0, 0, 5, 5)), {"a"})
+
+    def test_negative_coordinates(self):
+        grid = spatial.SpatialGrid(cell_size=10)
+        grid.insert("a", (-15, -15, -12, -12))
+
+        self.assertEqual(grid.query_point(-13, -13), {"a"})
+
+    def test_reinsert_moves_item(self):
+        grid = spatial.SpatialGrid(cell_size=10)
+        grid.insert("a", (0, 0, 5, 5))
+        grid.insert("a", (40, 40, 45, 45))
+
+        self.assertEqual(len(grid), 1)
+        self.assertEqual(grid.query((0, 0, 5, 5)), set())
+        self.assertEqual(grid.query((40, 40, 41, 41)), {"a"})
+
+    def test_move_within_cell(self):
+        grid = spatial.SpatialGrid(cell_size=10)
+        grid.insert("a", (1, 1, 2, 2))
+        grid.insert("a", (6, 6, 8, 8))
+
+        self.assertEqual(grid.rect("a"), (6, 6, 8, 8))
+        self.assertEqual(grid.query((0, 0, 2, 2)), set())
+        self.assertEqual(grid.query((7, 7, 9, 9)), {"a"})
+
+    def test_remove(self):
+        grid = spatial.SpatialGrid(cell_size=10)
+        grid.insert("a", (0, 0, 25, 25))
+        grid.remove("a")
+        grid.remove("missing")
+
+        self.assertNotIn("a", grid)
+        self.assertEqual(grid.query((0, 0, 25, 25)), set())
+
+
+class SweepTest(unittest.TestCase):
+    def test_hit(self):
+        hit = spatial.sweep((0, 0, 10, 10), 100, 0, (50, 0, 60, 10))
+
+        self.assertIsNotNone(hit)
+        time, normal_x, normal_y = hit
+        self.assertAlmostEqual(time, 0.4)
+        self.assertEqual((normal_x, normal_y), (-1.0, 0.0))
+
+    def test_miss(self):
+        self.assertIsNone(spatial.sweep((0, 0, 10, 10), 100, 0, (50, 20, 60, 30)))
+        self.assertIsNone(spatial.sweep((0, 0, 10, 10), 10, 0, (50, 0, 60, 10)))
+
+    def test_already_overlapping(self):
+        self.assertIsNone(spatial.sweep((0, 0, 10, 10), 5, 0, (5, 0, 15, 10)))
+
+    def test_vertical_hit(self):
+        hit = spatial.sweep((0, 0, 10, 10), 0, -50, (0, -30, 10, -20))
+
+        self.assertIsNotNone(hit)
+        time, normal_x, normal_y = hit
+        self.assertAlmostEqual(time, 0.4)
+        self.assertEqual((normal_x, normal_y), (0.0, 1.0))
@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+
+from engine.model import sprite_index
+
+
+def make_sprite(name, x, y):
+    sprite = mock.Mock(center_x=x, center_y=y)
+    sprite.name = name
+    return sprite
+
+
+class SpriteIndexTest(unittest.TestCase):
+    def test_within(self):
+        near = make_sprite("near", 10, 10)
+        edge = make_sprite("edge", 13, 14)
+        corner = make_sprite("corner", 14, 14)
+        far = make_sprite("far", 500, 500)
+        index = sprite_index.SpriteIndex([near, edge, corner, far])
+
+        self.assertEqual(index.within((10, 10), 5), [edge, near])
+
+    def test_with_prefix(self):
+        sprites = [make_sprite(name, 0, 0) for name in ["rat_2", "rat_1", "bat"]]
+        index = sprite_index.SpriteIndex(sprites)
+
+        self.assertEqual(index.with_prefix("rat_"), [sprites[1], sprites[0]])
+        self.assertEqual(index.with_prefix("cat"), [])
+
+    def test_add_remove_and_move(self):
+        rat = make_sprite("rat", 10, 10)
+        bat = make_sprite("bat", 10, 10)
+        index = sprite_index.SpriteIndex([rat])
+        index.add(bat)
+        index.remove(rat)
+        index.remove(rat)
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.with_prefix(""), [bat])
+
+        bat.center_x, bat.center_y = 300, 300
+        index.move(bat)
+        # Sprites that were never added stay out.
+        index.move(rat)
+
+        self.assertEqual(index.within((10, 10), 5), [])
+        self.assertEqual(index.within((300, 300), 5), [bat])
@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+
+import arcade
+from PIL import Image
+
+from engine.model import tile_chunks
+
+TILE = 10
+TEXTURE = arcade.Texture("tile", image=Image.new("RGBA", (TILE, TILE)))
+
+
+def make_tile(column, row, size=TILE):
+    sprite = arcade.Sprite(texture=TEXTURE)
+    sprite.width = size
+    sprite.height = size
+    sprite.center_x = (column + 0.5) * TILE
+    sprite.center_y = (row + 0.5) * TILE
+    return sprite
+
+
+def make_layer(tiles):
+    # Lazy, so that no GL context is needed.
+    sprite_list = arcade.SpriteList(lazy=True)
+    sprite_list.extend(tiles)
+    return sprite_list
+
+
+class ChunkedLayerTest(unittest.TestCase):
+    def make_chunked(self, *layers):
+        return tile_chunks.ChunkedLayer(
+            [make_layer(tiles) for tiles in layers],
+            (4 * TILE, 4 * TILE),
+        )
+
+    def test_split(self):
+        layer = self.make_chunked(
+            [make_tile(column, row) for column in range(10) for row in range(6)]
+        )
+
+        self.assertEqual(len(layer), 60)
+        # 3 columns of chunks by 2 rows, the last ones partly filled.
+        self.assertEqual(layer.num_chunks, 6)
+        self.assertEqual(
+            sorted(len(chunk.sprites) for chunk in layer._chunks),
+            [4, 8, 8, 8, 16, 16],
+        )
+
+    def test_empty_chunks_are_skipped(self):
+        layer = self.make_chunked([make_tile(0, 0), make_tile(20, 20)])
+
+        self.assertEqual(layer.num_chunks, 2)
+
+    def test_set_view(self):
+        layer = self.make_chunked(
+            [make_tile(column, row) for column in range(12) for row in range(4)]
+        )
+        self.assertEqual(layer.visible_chunks, 3)
+
+        layer.set_view((0, 0, 35, 35))
+        self.assertEqual(layer.visible_chunks, 1)
+        self.assertEqual(layer.visible_count, 16)
+
+        layer.set_view((35, 0, 45, 35))
+        self.assertEqual(layer.visible_chunks, 2)
+
+        layer.set_view((200, 200, 300, 300))
+        self.assertEqual(layer.visible_chunks, 0)
+
+    def test_large_tiles_widen_their_chunk(self):
+        # Centered in the first chunk, but drawn well into the second.
+        layer = self.make_chunked([make_tile(3, 0, size=5 * TILE), make_tile(5, 0)])
+
+        layer.set_view((60, 0, 65, 5))
+
+        self.assertEqual(layer.visible_chunks, 2)
+        self.assertTrue(layer.spills)
+
+    def test_layers_share_chunks(self):
+        ground = make_tile(0, 0)
+        decor = make_tile(0, 0)
+        far_decor = make_tile(8, 0)
+        layer = self.make_chunked([ground], [decor, far_decor])
+
+        self.assertEqual(len(layer), 3)
+        self.assertEqual(layer.num_chunks, 2)
+        self.assertEqual(list(layer._chunks[0].sprites), [ground, decor])
+        self.assertFalse(layer.spills)
+
+    def test_draw(self):
+        layer = self.make_chunked([make_tile(0, 0), make_tile(8, 0)])
+        near, far = layer._chunks
+        near.sprites.draw = mock.Mock()
+        far.sprites.draw = mock.Mock()
+
+        layer.draw()
+        near.sprites.draw.assert_called_once()
+        far.sprites.draw.assert_called_once()
+
+        layer.set_view((0, 0, 10, 10))
+        layer.draw()
+        self.assertEqual(near.sprites.draw.call_count, 2)
+        self.assertEqual(far.sprites.draw.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import arcade
+
+from engine.model import wall_grid
+
+TILE = 10
+
+
+def make_sprite(x, y, hit_box):
+    sprite = arcade.Sprite()
+    sprite.set_hit_box(hit_box)
+    # Sprites without textures have no size, so arcade would never find collisions.
+    sprite.collision_radius = max(abs(c) for point in hit_box for c in point) * 2
+    sprite.center_x = x
+    sprite.center_y = y
+    return sprite
+
+
+def box(half_width, half_height=None):
+    half_height = half_width if half_height is None else half_height
+    return [
+        (-half_width, -half_height),
+        (half_width, -half_height),
+        (half_width, half_height),
+        (-half_width, half_height),
+    ]
+
+
+def wall(column, row, hit_box=None):
+    return make_sprite(
+        (column + 0.5) * TILE,
+        (row + 0.5) * TILE,
+        box(TILE / 2) if hit_box is None else hit_box,
+    )
+
+
+class WallGridTest(unittest.TestCase):
+    def make_grid(self, walls):
+        return wall_grid.WallGrid.from_sprites(
+            walls,
+            size=(10, 10),
+            tile_size=(TILE, TILE),
+        )
+
+    def test_filled_tiles(self):
+        grid = self.make_grid([wall(2, 3), wall(4, 4)])
+
+        self.assertEqual(grid.filled_tiles, 2)
+        self.assertEqual(grid.irregular_walls, 0)
+        self.assertTrue(grid.collides(make_sprite(25, 35, box(2))))
+        self.assertTrue(grid.collides(make_sprite(19, 31, box(2))))
+        self.assertFalse(grid.collides(make_sprite(35, 35, box(2))))
+
+    def test_touching_does_not_collide(self):
+        grid = self.make_grid([wall(2, 3)])
+
+        self.assertFalse(grid.collides(make_sprite(18, 35, box(2))))
+        self.assertTrue(grid.collides(make_sprite(18.5, 35, box(2))))
+
+    def test_polygon_hit_box(self):
+        grid = self.make_grid([wall(2, 3)])
+        diamond = [(-4, 0), (0, -4), (4, 0), (0, 4)]
+
+        # The bounding box overlaps the tile's corner, but the diamond doesn't.
+        self.assertFalse(grid.collides(make_sprite(17, 27, diamond)))
+        self.assertTrue(grid.collides(make_sprite(19, 29, diamond)))
+
+    def test_irregular_walls(self):
+        half = [(-5, -5), (0, -5), (0, 5), (-5, 5)]
+        grid = self.make_grid([wall(2, 3, hit_box=half)])
+
+        self.assertEqual(grid.filled_tiles, 0)
+        self.assertEqual(grid.irregular_walls, 1)
+        self.assertTrue(grid.collides(make_sprite(22, 35, box(1))))
+        self.assertFalse(grid.collides(make_sprite(28, 35, box(1))))
+
+    def test_off_the_map(self):
+        grid = self.make_grid([wall(9, 9), wall(0, 0)])
+
+        self.assertFalse(grid.collides(make_sprite(-50, -50, box(2))))
+        self.assertFalse(grid.collides(make_sprite(150, 150, box(2))))
+        self.assertTrue(grid.collides(make_sprite(-1, 5, box(2))))
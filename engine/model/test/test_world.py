@@ -2,14 +2,24 @@ import unittest
 from unittest import mock
 
 import arcade
+from PIL import Image
 
-from engine.model import world
+from engine.model import (
+    game_sprite,
+    world,
+)
 from engine.test import factories
 
+# Saved before it's mocked out below.
+REAL_GAME_SPRITE = game_sprite.GameSprite
 
-@mock.patch("engine.model.game_sprite.GameSprite")
+# Mocked sprites have no animations, so the physics engine doesn't try to animate them.
+NO_ANIMATIONS = {"return_value.animations": None}
+
+
+@mock.patch("engine.model.game_sprite.GameSprite", **NO_ANIMATIONS)
 @mock.patch("arcade.load_tilemap")
-@mock.patch("engine.model.player_sprite.PlayerSprite")
+@mock.patch("engine.model.player_sprite.PlayerSprite", **NO_ANIMATIONS)
 class CreateSpriteTest(unittest.TestCase):
     def test_cannot_add_existing_sprite(
         self,
@@ -48,9 +58,9 @@ class CreateSpriteTest(unittest.TestCase):
             w.create_sprite(sprite_spec, "sprite", (0, 0), script=mock.Mock())
 
 
-@mock.patch("engine.model.game_sprite.GameSprite")
+@mock.patch("engine.model.game_sprite.GameSprite", **NO_ANIMATIONS)
 @mock.patch("arcade.load_tilemap")
-@mock.patch("engine.model.player_sprite.PlayerSprite")
+@mock.patch("engine.model.player_sprite.PlayerSprite", **NO_ANIMATIONS)
 class RemoveSpriteTest(unittest.TestCase):
     def test_cannot_add_existing_sprite(
         self,
@@ -89,6 +99,287 @@ class RemoveSpriteTest(unittest.TestCase):
 
         self.assertEqual(len(list(w.get_sprites(name="sprite"))), 1)
 
+        w._scheduler = mock.Mock()
         w._remove_sprite("sprite")
 
         self.assertEqual(len(list(w.get_sprites(name="sprite"))), 0)
+        w._scheduler.forget_sprite.assert_called_once_with("sprite")
+
+
+class AdjacentRegionsTest(unittest.TestCase):
+    def test_finds_transitions(self):
+        tilemap = mock.Mock()
+        tilemap.object_lists = {
+            "Scripted Objects": [
+                arcade.TiledObject(
+                    name="Door",
+                    shape=[0, 0],
+                    properties={
+                        "on_collide": world.TRANSITION_SCRIPT,
+                        "on_collide_region": "Building",
+                        "on_collide_start_location": "Entryway",
+                    },
+                ),
+                arcade.TiledObject(
+                    name="Sign",
+                    shape=[0, 0],
+                    properties={"on_activate": "game.scripts.sign"},
+                ),
+                arcade.TiledObject(name="Nothing", shape=[0, 0]),
+            ],
+        }
+
+        self.assertEqual(world._adjacent_regions(tilemap), {"Building"})
+
+
+def fake_tilemap(*args, **kwargs):
+    tilemap = mock.Mock()
+    tilemap.object_lists = {
+        "Key Points": [
+            arcade.TiledObject(
+                name="Start",
+                shape=[0, 0],
+            ),
+        ],
+    }
+    tilemap.sprite_lists = {
+        "Wall Tiles": arcade.SpriteList(),
+    }
+    tilemap.width = 10
+    tilemap.height = 10
+    tilemap.tile_width = 10
+    tilemap.tile_height = 10
+    return tilemap
+
+
+@mock.patch("engine.model.game_sprite.GameSprite", **NO_ANIMATIONS)
+@mock.patch("arcade.load_tilemap", side_effect=fake_tilemap)
+@mock.patch("engine.model.player_sprite.PlayerSprite", **NO_ANIMATIONS)
+class WarmRegionTest(unittest.TestCase):
+    def make_world(self, **world_args):
+        regions = {
+            name: factories.fake_region_spec(tiled_mapfile=f"{name}.json")
+            for name in ["region1", "region2", "region3"]
+        }
+        spec = factories.fake_game_spec(world=dict(regions=regions, **world_args))
+        return world.World(mock.Mock(), spec, initial_player_data={})
+
+    def test_reentering_reuses_region(self, mocked_player, _, mocked_game_sprite):
+        mocked_game_sprite.return_value.name = "sprite"
+        w = self.make_world()
+        script = mock.Mock()
+        sprite = w.create_sprite(factories.fake_sprite_spec(), "sprite", (0, 0), script)
+        scene = w.scene
+        engine = w.physics_engine
+
+        w.load_region("region2", "Start")
+        self.assertIsNot(w.scene, scene)
+
+        sprite.script.set_api.reset_mock()
+        w.load_region("region1", "Start")
+
+        self.assertIs(w.scene, scene)
+        self.assertIs(w.physics_engine, engine)
+        self.assertEqual(len(list(w.get_sprites(name="sprite"))), 1)
+        # Event handlers were cleared on the way out, so scripts need to re-register.
+        sprite.script.set_api.assert_called_once()
+
+    def animate_player(self, load_spritesheet, mocked_player):
+        game_sprite.clear_texture_cache()
+        self.addCleanup(game_sprite.clear_texture_cache)
+        load_spritesheet.side_effect = lambda *args, count, **kwargs: [
+            arcade.Texture(f"frame{i}", image=Image.new("RGBA", (10, 10)))
+            for i in range(count)
+        ]
+        player_spec = factories.fake_sprite_spec(
+            animations={
+                "idle": {"frame_speed": 0.1, "num_frames": 2},
+                "walk-right": {"frame_speed": 0.1, "num_frames": 3},
+            }
+        )
+        mocked_player.side_effect = lambda *args, **kwargs: REAL_GAME_SPRITE(
+            "player", player_spec
+        )
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_animation_changes_in_another_region(
+        self, load_spritesheet, mocked_player, *_
+    ):
+        self.animate_player(load_spritesheet, mocked_player)
+        w = self.make_world()
+        player = w.player_sprite
+
+        # Start walking in region1, and keep walking into region2.
+        w.set_player_speed(vx=1)
+        w.on_update(0.05)
+        w.load_region("region2", "Start")
+        # Stop there, so the animation changes while region1 is warm.
+        w.set_player_speed(vx=0)
+        for _ in range(3):
+            w.on_update(0.05)
+
+        w.load_region("region1", "Start")
+        for _ in range(10):
+            w.on_update(0.05)
+
+        self.assertEqual(len(player.batches), 1)
+        idle = player.animations.animations["idle"]
+        self.assertEqual(player.animations.current_animation, "idle")
+        self.assertIn(player.texture, idle.textures)
+
+    @mock.patch("arcade.load_spritesheet")
+    def test_player_is_only_in_the_active_region(
+        self, load_spritesheet, mocked_player, *_
+    ):
+        self.animate_player(load_spritesheet, mocked_player)
+        w = self.make_world(warm_regions=1)
+        player = w.player_sprite
+
+        for region in ["region2", "region3", "region1", "region2", "region2"] * 3:
+            w.load_region(region, "Start")
+            w.on_update(0.05)
+        w.restore(w.state)
+
+        self.assertEqual(len(player.batches), 1)
+        self.assertIn(player, w.physics_engine.moveable_sprites)
+        self.assertEqual(w.physics_engine.moveable_sprites.count(player), 1)
+
+    def test_least_recently_left_region_goes_cold(self, mocked_player, *_):
+        w = self.make_world(warm_regions=1)
+        scene1 = w.scene
+
+        w.load_region("region2", "Start")
+        scene2 = w.scene
+        w.load_region("region3", "Start")
+        w.load_region("region2", "Start")
+        self.assertIs(w.scene, scene2)
+
+        w.load_region("region1", "Start")
+        self.assertIsNot(w.scene, scene1)
+
+    def test_disabled(self, mocked_player, *_):
+        w = self.make_world(warm_regions=0)
+        scene = w.scene
+
+        w.load_region("region2", "Start")
+        w.load_region("region1", "Start")
+
+        self.assertIsNot(w.scene, scene)
+
+
+@mock.patch("engine.model.game_sprite.GameSprite", **NO_ANIMATIONS)
+@mock.patch("arcade.load_tilemap", side_effect=fake_tilemap)
+@mock.patch("engine.model.player_sprite.PlayerSprite", **NO_ANIMATIONS)
+class RestoreTest(unittest.TestCase):
+    def test_restore(self, mocked_player, *_):
+        regions = {
+            name: factories.fake_region_spec(tiled_mapfile=f"{name}.json")
+            for name in ["region1", "region2"]
+        }
+        spec = factories.fake_game_spec(world=dict(regions=regions))
+        w = world.World(mock.Mock(), spec, initial_player_data={})
+        region_state = world.RegionState(sprite_states={})
+
+        w.restore(
+            world.WorldState(
+                active_region="region2",
+                player_state=game_sprite.SpriteState(
+                    location=(3, 4),
+                    facing=(-1, 0),
+                    data={"coins": 2},
+                ),
+                region_states={"region1": region_state, "region2": region_state},
+            )
+        )
+
+        self.assertEqual(w.active_region, "region2")
+        self.assertEqual(w.regions_loaded, {"region1", "region2"})
+        player = mocked_player.return_value
+        self.assertEqual(player.position, (3, 4))
+        self.assertEqual(player.data, {"coins": 2})
+        player.set_facing.assert_called_with(-1, 0)
+
+
+def named_sprite(name, **kwargs):
+    sprite = mock.MagicMock()
+    sprite.name = name
+    sprite.animations = None
+    return sprite
+
+
+@mock.patch("engine.model.game_sprite.GameSprite", side_effect=named_sprite)
+@mock.patch("arcade.load_tilemap")
+@mock.patch("engine.model.player_sprite.PlayerSprite", **NO_ANIMATIONS)
+class QueryTest(unittest.TestCase):
+    def make_world(self, mocked_tilemap):
+        tilemap = fake_tilemap()
+        tilemap.object_lists["Key Points"].extend(
+            [
+                arcade.TiledObject(name="Rat Waypoint 1", shape=[10, 10]),
+                arcade.TiledObject(name="Rat Waypoint 2", shape=[100, 100]),
+                arcade.TiledObject(name="Well", shape=[12, 14]),
+            ]
+        )
+        mocked_tilemap.return_value = tilemap
+        return world.World(
+            mock.Mock(),
+            factories.fake_game_spec(),
+            initial_player_data={},
+        )
+
+    def test_sprites_within(self, mocked_player, mocked_tilemap, _):
+        w = self.make_world(mocked_tilemap)
+        sprite_spec = factories.fake_sprite_spec()
+        w.create_sprite(sprite_spec, "near", (10, 10), script=mock.Mock())
+        w.create_sprite(sprite_spec, "edge", (13, 14), script=mock.Mock())
+        w.create_sprite(sprite_spec, "far", (500, 500), script=mock.Mock())
+
+        self.assertEqual(
+            [sprite.name for sprite in w.sprites_within((10, 10), 5)],
+            ["edge", "near"],
+        )
+
+        w._remove_sprite("near")
+        self.assertEqual(
+            [sprite.name for sprite in w.sprites_within((10, 10), 5)],
+            ["edge"],
+        )
+
+    def test_sprites_within_after_moving(self, mocked_player, mocked_tilemap, _):
+        w = self.make_world(mocked_tilemap)
+        sprite = w.create_sprite(
+            factories.fake_sprite_spec(), "rat", (10, 10), script=mock.Mock()
+        )
+        sprite.script = None
+        self.assertEqual(w.sprites_within((10, 10), 5), [sprite])
+
+        # Only sprites that the physics engine moved are looked at again.
+        w.physics_engine = mock.Mock(moveable_sprites=[], moved_sprites=[sprite])
+        sprite.center_x, sprite.center_y = 500, 500
+        w.on_update(0.1)
+
+        self.assertEqual(w.sprites_within((10, 10), 5), [])
+        self.assertEqual(w.sprites_within((500, 500), 5), [sprite])
+
+    def test_sprites_with_prefix(self, mocked_player, mocked_tilemap, _):
+        w = self.make_world(mocked_tilemap)
+        sprite_spec = factories.fake_sprite_spec()
+        for name in ["rat_spawn2", "rat_spawn1", "bat"]:
+            w.create_sprite(sprite_spec, name, (0, 0), script=mock.Mock())
+
+        self.assertEqual(
+            [sprite.name for sprite in w.sprites_with_prefix("rat_")],
+            ["rat_spawn1", "rat_spawn2"],
+        )
+
+    def test_key_points(self, mocked_player, mocked_tilemap, _):
+        w = self.make_world(mocked_tilemap)
+
+        self.assertEqual(
+            [point.name for point in w.key_points_with_prefix("Rat")],
+            ["Rat Waypoint 1", "Rat Waypoint 2"],
+        )
+        self.assertEqual(
+            [point.name for point in w.key_points_within((5, 5, 20, 20))],
+            ["Rat Waypoint 1", "Well"],
+        )
@@ -0,0 +1,155 @@
+"""Splits tile layers that never change into chunks that are drawn whole.
+
+Each chunk is its own sprite list holding the tiles of a block of the map. Its vertex
+buffers are filled the first time it's drawn and never touched again, so drawing it is
+a single call no matter how many tiles it has. Only the chunks near the view are drawn,
+and choosing them means checking a handful of rectangles rather than every tile.
+
+Layers that are drawn one after the other can share chunks, with each chunk holding
+their tiles in layer order. That's only the same as drawing the layers one at a time if
+no tile is drawn past the edge of its chunk's block, which holds for maps where every
+tile is the size of a grid cell.
+"""
+
+import math
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import arcade
+
+from engine.model import spatial
+
+# How many tiles wide and high each chunk is.
+CHUNK_TILES = 16
+
+# The size of a chunk in pixels, for maps with 32x32 pixel tiles.
+DEFAULT_CHUNK_SIZE = (CHUNK_TILES * 32.0, CHUNK_TILES * 32.0)
+
+# How far a tile may be drawn past its chunk's block and still count as inside it.
+_EPSILON = 1e-6
+
+
+class _Chunk:
+    """The tiles in one block of the map."""
+
+    sprites: arcade.SpriteList
+    # The area of the map the chunk covers.
+    block: spatial.Rect
+    # The area the chunk's tiles cover when drawn, which can spill past its block.
+    rect: spatial.Rect
+
+    def __init__(self, block: spatial.Rect):
+        # Lazy, so that it's only given GL buffers once it's drawn.
+        self.sprites = arcade.SpriteList(lazy=True)
+        self.block = block
+        self.rect = (math.inf, math.inf, -math.inf, -math.inf)
+
+    def append(self, sprite: arcade.Sprite) -> None:
+        """Adds a tile to the chunk."""
+        rect = spatial.draw_rect(sprite)
+        self.sprites.append(sprite)
+        self.rect = (
+            min(self.rect[0], rect[0]),
+            min(self.rect[1], rect[1]),
+            max(self.rect[2], rect[2]),
+            max(self.rect[3], rect[3]),
+        )
+
+    @property
+    def spills(self) -> bool:
+        """Determines if any tile is drawn past the edge of the chunk's block."""
+        return (
+            self.rect[0] < self.block[0] - _EPSILON
+            or self.rect[1] < self.block[1] - _EPSILON
+            or self.rect[2] > self.block[2] + _EPSILON
+            or self.rect[3] > self.block[3] + _EPSILON
+        )
+
+
+class ChunkedLayer:
+    """Draws one or more static tile layers a chunk at a time."""
+
+    sources: List[arcade.SpriteList]
+
+    # In the order of their first tile in the sources, to keep overlapping tiles drawn
+    # the same way.
+    _chunks: List[_Chunk]
+    _visible: Optional[List[_Chunk]]
+
+    def __init__(
+        self,
+        sources: Sequence[arcade.SpriteList],
+        chunk_size: Tuple[float, float],
+    ):
+        """Splits layers into chunks.
+
+        Args:
+            sources: The layers' sprites, in the order they're drawn. They must not
+                     change once the layers are split.
+            chunk_size: The size of a chunk in pixels.
+        """
+        self.sources = list(sources)
+        self._visible = None
+
+        chunk_width, chunk_height = chunk_size
+        chunks: Dict[Tuple[int, int], _Chunk] = {}
+        for source in self.sources:
+            for sprite in source:
+                column = math.floor(sprite.center_x / chunk_width)
+                row = math.floor(sprite.center_y / chunk_height)
+                chunk = chunks.get((column, row))
+                if chunk is None:
+                    chunk = chunks[(column, row)] = _Chunk(
+                        (
+                            column * chunk_width,
+                            row * chunk_height,
+                            (column + 1) * chunk_width,
+                            (row + 1) * chunk_height,
+                        )
+                    )
+                chunk.append(sprite)
+
+        self._chunks = list(chunks.values())
+
+    def __len__(self) -> int:
+        return sum(len(source) for source in self.sources)
+
+    @property
+    def num_chunks(self) -> int:
+        """Gets how many chunks the layers were split into."""
+        return len(self._chunks)
+
+    @property
+    def spills(self) -> bool:
+        """Determines if any tile is drawn past the edge of its chunk's block.
+
+        If so, layers sharing chunks may not overlap the way they should.
+        """
+        return any(chunk.spills for chunk in self._chunks)
+
+    @property
+    def visible_chunks(self) -> int:
+        """Gets how many chunks would be drawn."""
+        return len(self._chunks if self._visible is None else self._visible)
+
+    @property
+    def visible_count(self) -> int:
+        """Gets how many tiles would be drawn."""
+        chunks = self._chunks if self._visible is None else self._visible
+        return sum(len(chunk.sprites) for chunk in chunks)
+
+    def set_view(self, rect: spatial.Rect) -> None:
+        """Sets the area to draw chunks from."""
+        self._visible = [
+            chunk for chunk in self._chunks if spatial.rects_overlap(rect, chunk.rect)
+        ]
+
+    def draw(self) -> None:
+        """Draws the chunks near the view, or all of them if there's no view."""
+        for chunk in self._chunks if self._visible is None else self._visible:
+            chunk.sprites.draw()
@@ -0,0 +1,163 @@
+"""A bitmap of which tiles in a region are walls, for fast collision checks.
+
+Walls sit on the tile grid, and nearly all of them fill their tile completely. Rather
+than testing a sprite's hit box against every nearby wall polygon, the tiles under the
+sprite's bounding box are looked up in the bitmap. Walls whose hit boxes aren't their
+whole tile are kept to one side and checked the slow way.
+"""
+
+import math
+from typing import (
+    Iterable,
+    List,
+    Tuple,
+)
+
+import arcade
+import numpy as np
+
+from engine.model import spatial
+
+# How far a wall's hit box may be from its tile's edges and still count as filling it.
+_EPSILON = 1e-6
+
+
+def _is_box(points: arcade.PointList, rect: spatial.Rect) -> bool:
+    """Determines if a hit box is exactly its own bounding box."""
+    if len(points) != 4:
+        return False
+
+    left, bottom, right, top = rect
+    return all(
+        (abs(x - left) < _EPSILON or abs(x - right) < _EPSILON)
+        and (abs(y - bottom) < _EPSILON or abs(y - top) < _EPSILON)
+        for x, y in points
+    )
+
+
+class WallGrid:
+    """Records which tiles of a region are filled by walls."""
+
+    tile_width: float
+    tile_height: float
+
+    # Indexed by [row, column], with row 0 at the bottom of the map.
+    _cells: np.ndarray
+    # Walls that don't fill their tile, which are checked against their hit boxes.
+    _irregular: spatial.SpatialGrid[arcade.Sprite]
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        tile_size: Tuple[float, float],
+    ):
+        """Constructs an empty grid.
+
+        Args:
+            size: How many tiles wide and high the map is.
+            tile_size: The size of a tile in pixels.
+        """
+        columns, rows = size
+        self.tile_width, self.tile_height = tile_size
+        self._cells = np.zeros((rows, columns), dtype=np.bool_)
+        self._irregular = spatial.SpatialGrid(max(tile_size))
+
+    @classmethod
+    def from_sprites(
+        cls,
+        walls: Iterable[arcade.Sprite],
+        size: Tuple[int, int],
+        tile_size: Tuple[float, float],
+    ) -> "WallGrid":
+        """Builds a grid from the sprites in a region's wall layer."""
+        grid = cls(size, tile_size)
+        for wall in walls:
+            grid.add(wall)
+        return grid
+
+    def add(self, wall: arcade.Sprite) -> None:
+        """Adds a wall to the grid."""
+        rect = spatial.sprite_rect(wall)
+        left, bottom, right, top = rect
+
+        column = round(left / self.tile_width)
+        row = round(bottom / self.tile_height)
+        rows, columns = self._cells.shape
+
+        fills_tile = (
+            0 <= column < columns
+            and 0 <= row < rows
+            and abs(left - column * self.tile_width) < _EPSILON
+            and abs(bottom - row * self.tile_height) < _EPSILON
+            and abs(right - left - self.tile_width) < _EPSILON
+            and abs(top - bottom - self.tile_height) < _EPSILON
+            and _is_box(wall.get_adjusted_hit_box(), rect)
+        )
+
+        if fills_tile:
+            self._cells[row, column] = True
+        else:
+            self._irregular.insert(wall, rect)
+
+    @property
+    def filled_tiles(self) -> int:
+        """Gets how many tiles are completely filled by walls."""
+        return int(np.count_nonzero(self._cells))
+
+    @property
+    def irregular_walls(self) -> int:
+        """Gets how many walls have to be checked against their hit boxes."""
+        return len(self._irregular)
+
+    def collides(self, sprite: arcade.Sprite) -> bool:
+        """Determines if a sprite overlaps any wall.
+
+        Like arcade's collision checks, touching a wall doesn't count.
+        """
+        points = sprite.get_adjusted_hit_box()
+        if len(points) == 0:
+            return False
+
+        x_points = [point[0] for point in points]
+        y_points = [point[1] for point in points]
+        rect = (min(x_points), min(y_points), max(x_points), max(y_points))
+
+        block, first_row, first_column = self._tiles_under(rect)
+        if block.any():
+            # A rectangular hit box overlaps every tile under its bounding box.
+            if _is_box(points, rect):
+                return True
+
+            for row, column in np.argwhere(block).tolist():
+                tile = self._tile_polygon(first_row + row, first_column + column)
+                if arcade.are_polygons_intersecting(points, tile):
+                    return True
+
+        return any(
+            arcade.check_for_collision(sprite, wall)
+            for wall in self._irregular.query(rect)
+        )
+
+    def _tiles_under(self, rect: spatial.Rect) -> Tuple[np.ndarray, int, int]:
+        """Gets the part of the grid that a rectangle strictly overlaps.
+
+        Returns the cells along with the row and column that they start at.
+        """
+        left, bottom, right, top = rect
+        rows, columns = self._cells.shape
+
+        # Clamped so that rectangles off the edge of the map don't wrap around.
+        first_column = min(max(math.floor(left / self.tile_width), 0), columns)
+        last_column = min(max(math.ceil(right / self.tile_width), 0), columns)
+        first_row = min(max(math.floor(bottom / self.tile_height), 0), rows)
+        last_row = min(max(math.ceil(top / self.tile_height), 0), rows)
+
+        block = self._cells[first_row:last_row, first_column:last_column]
+        return block, first_row, first_column
+
+    def _tile_polygon(self, row: int, column: int) -> List[Tuple[float, float]]:
+        left = column * self.tile_width
+        bottom = row * self.tile_height
+        right = left + self.tile_width
+        top = bottom + self.tile_height
+        return [(left, bottom), (right, bottom), (right, top), (left, top)]
@@ -1,6 +1,9 @@
+import collections
 import dataclasses
-import numbers
+import logging
 import operator
+import time
+from concurrent import futures
 from typing import (
     Any,
     cast,
@@ -8,8 +11,10 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Protocol,
     Set,
     Tuple,
+    Union,
 )
 
 import arcade
@@ -17,19 +22,28 @@ import arcade.tilemap
 from pyglet import math as pmath
 
 from engine import (
+    clock,
     events,
+    profiler,
     scripts,
     spec,
 )
 from engine.model import (
+    culling,
     game_sprite,
+    key_points,
     physics,
     player_sprite,
+    region_cache,
+    scheduler,
     script_zone,
-    shapes,
+    spatial,
+    sprite_index,
+    tile_chunks,
+    wall_grid,
 )
 
-TILE_SCALING = 1
+logger = logging.getLogger(__name__)
 
 PLAYER_MOVEMENT_SPEED = 250
 PLAYER_Z_INDEX = 1
@@ -42,6 +56,10 @@ KEY_POINTS = "Key Points"
 SCRIPTED_OBJECTS = "Scripted Objects"
 NPCS = "NPCs"
 
+# Scripted objects that call this move the player to another region.
+TRANSITION_SCRIPT = "engine.builtin.transition_region"
+TRANSITION_EVENTS = ("on_activate", "on_collide", "on_hit")
+
 
 class SceneNotInitialized(Exception):
     """Raised when methods are called on the model before the scene was initialized."""
@@ -72,7 +90,19 @@ class WorldState:
     region_states: Dict[str, RegionState]
 
 
-class _Core(scripts.GameAPI):
+@dataclasses.dataclass
+class _WarmRegion:
+    """Everything built for a region, kept so that re-entering it is quick."""
+
+    tilemap: arcade.tilemap.TileMap
+    key_points: key_points.KeyPointTable
+    scene: arcade.Scene
+    culler: culling.SceneCuller
+    game_sprites: Dict[str, game_sprite.GameSprite]
+    physics_engine: physics.Engine
+
+
+class _Core(scripts.GameAPI, Protocol):
     """Extended API for interacting with the core."""
 
     def clear_events(self) -> None:
@@ -97,6 +127,9 @@ class World:
     scene: Optional[arcade.Scene]
     physics_engine: Optional[physics.Engine]
 
+    # Draws the parts of the scene near the camera.
+    _culler: Optional[culling.SceneCuller]
+
     sec_passed: float
 
     # The tile map is created by the Tiled tool and loaded by our system. Most of the
@@ -111,7 +144,11 @@ class World:
     #
     # The initial tile map must have:
     # * An object layer called "Key Points", containing an object named "Start".
-    tilemaps: Dict[str, arcade.tilemap.TileMap]
+    #
+    # Tile maps are loaded when they're first needed, and dropped again once they
+    # haven't been used in a while.
+    region_cache: region_cache.RegionCache
+    _tilemap: arcade.tilemap.TileMap
     active_region: str
     region_states: Dict[str, RegionState]
     regions_loaded: Set[str]
@@ -124,6 +161,29 @@ class World:
     _sprites_to_add: Dict[str, game_sprite.GameSprite]
     _sprites_to_remove: Set[str]
 
+    # The simulation runs in fixed steps, independent of the frame rate. Sprites are
+    # drawn interpolated between where they were before the last step and where they
+    # are now.
+    _timestep: clock.FixedTimestep
+    _previous_locations: Dict[game_sprite.GameSprite, Tuple[float, float]]
+
+    # Times each phase of an update. Disabled unless someone turns it on.
+    profiler: profiler.Profiler
+
+    _scheduler: scheduler.ScriptScheduler
+
+    # Recently left regions, from least to most recently left. These are restored
+    # rather than rebuilt when the player comes back.
+    _warm_regions: "collections.OrderedDict[str, _WarmRegion]"
+    # How long the last call to load_region took.
+    last_load_secs: float
+
+    # Indexes the active region's sprites for name and location queries.
+    _sprite_index: sprite_index.SpriteIndex
+
+    # The active region's key points, parsed once when it's built.
+    _key_points: key_points.KeyPointTable
+
     def __init__(
         self,
         core: _Core,
@@ -140,7 +200,6 @@ class World:
             initial_data=initial_player_data,
         )
 
-        self.tilemaps = {}
         self.region_states = {}
         self._game_sprites = {}
         self.active_region = ""
@@ -150,29 +209,108 @@ class World:
         self._sprites_to_add = {}
         self._sprites_to_remove = set()
 
-        for region_name, region in game_spec.world.regions.items():
-            self.tilemaps[region_name] = arcade.load_tilemap(
-                region.tiled_mapfile,
-                TILE_SCALING,
-                {
-                    region.wall_layer: {
-                        "use_spatial_hash": True,
-                    },
-                },
-            )
+        self._timestep = clock.FixedTimestep()
+        self._previous_locations = {}
+        self.profiler = profiler.Profiler()
+        self._scheduler = scheduler.ScriptScheduler(
+            budget_secs=game_spec.world.script_budget_secs,
+            far_tick_interval=game_spec.world.far_script_tick_interval,
+        )
+
+        self._warm_regions = collections.OrderedDict()
+        self.last_load_secs = 0.0
+        self.scene = None
+        self.physics_engine = None
+        self._culler = None
+
+        self._sprite_index = sprite_index.SpriteIndex()
+        self._key_points = key_points.KeyPointTable()
+
+        self.region_cache = region_cache.RegionCache(
+            game_spec.world.regions,
+            budget_bytes=game_spec.world.region_cache_bytes,
+            executor=(
+                futures.ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="region-prefetch",
+                )
+                if game_spec.world.prefetch_regions
+                else None
+            ),
+        )
 
         self.load_region(game_spec.world.initial_region, "Start")
 
-    def load_region(self, region_name: str, start_location: str) -> None:
-        """Loads a region by name."""
+    def load_region(
+        self,
+        region_name: str,
+        start_location: Union[str, Tuple[float, float]],
+    ) -> None:
+        """Loads a region by name, with the player at a key point or a location."""
+        load_start = time.perf_counter()
+
+        # Take the new region out first, so keeping the old one warm can't evict it.
+        warm = self._warm_regions.pop(region_name, None)
+
+        # The player only belongs to the active region's physics engine, so it isn't
+        # left in the animation batches of regions that are warm or gone.
+        if self.physics_engine is not None:
+            self.physics_engine.remove_sprite(self._player_sprite.name)
+
         if self.active_region != "":
             self.region_states[self.active_region] = self._region_state(
                 self.active_region
             )
+            self._keep_warm()
 
         self.active_region = region_name
-        tilemap = self.tilemaps[region_name]
+
+        self._core.clear_events()
+        self._core.register_handler(events.SPRITE_REMOVED, self._queue_sprite_removal)
+
+        # Nothing from the old region should be interpolated into the new one, and
+        # nothing should be owed time from it either.
+        self._previous_locations = {}
+        self._scheduler.forget_pending()
+        # The old focus is somewhere in the old region, so tick everything until the
+        # view tells us where it's looking in this one.
+        self._scheduler.focus = None
+
+        if warm is None:
+            self._build_region(region_name)
+        else:
+            self._restore_region(warm)
+
+        # Likewise, draw everything until the view says what's on screen.
+        assert self._culler is not None
+        self._culler.set_view(None)
+
+        if isinstance(start_location, str):
+            start = self._key_points.get(start_location)
+            if start is None:
+                raise ValueError(f"No start location {start_location} defined.")
+            start_location = start.location
+        self._player_sprite.position = start_location
+        self._sprite_index = sprite_index.SpriteIndex(self._game_sprites.values())
+
+        # Get a head start on loading anywhere the player can go from here.
+        self.region_cache.prefetch(_adjacent_regions(self._tilemap))
+
+        self.last_load_secs = time.perf_counter() - load_start
+        logger.debug(
+            "Loaded region %s in %.1fms (%s).",
+            region_name,
+            self.last_load_secs * 1000,
+            "cold" if warm is None else "warm",
+        )
+
+    def _build_region(self, region_name: str) -> None:
+        """Builds everything for a region from its tile map and saved state."""
+        tilemap = self._tilemap = self.region_cache.get(region_name)
         region_spec = self._spec.world.regions[region_name]
+        self._key_points = key_points.KeyPointTable.from_objects(
+            tilemap.object_lists.get(KEY_POINTS, [])
+        )
 
         if region_name not in self.region_states:
             region_state = RegionState(sprite_states={})
@@ -182,26 +320,85 @@ class World:
         is_first_load = region_name not in self.regions_loaded
         self.regions_loaded.add(region_name)
 
-        self._core.clear_events()
-        self._core.register_handler(events.SPRITE_REMOVED, self._queue_sprite_removal)
-
         self._build_scene(tilemap)
         self._load_scripted_objects(tilemap, region_state, is_first_load)
 
-        self._reset_player(start_location, tilemap)
-
+        # Script zones never move, so the physics engine only needs to index them once
+        # rather than moving and checking them every tick.
         physics_objs: List[game_sprite.GameSprite] = [self._player_sprite]
-        physics_objs.extend(self._game_sprites.values())
+        static_objs: List[game_sprite.GameSprite] = []
+        for sprite in self._game_sprites.values():
+            if isinstance(sprite, script_zone.ScriptZone):
+                static_objs.append(sprite)
+            else:
+                physics_objs.append(sprite)
 
+        walls = tilemap.sprite_lists[region_spec.wall_layer]
         self.physics_engine = physics.Engine(
             physics_objs,
-            tilemap.sprite_lists[region_spec.wall_layer],
+            walls,
             map_size=(
                 self.width * self.tile_width,
                 self.height * self.tile_height,
             ),
+            static_sprites=static_objs,
+            swept=self._spec.world.swept_collisions,
+            frame_profiler=self.profiler,
+            walls=wall_grid.WallGrid.from_sprites(
+                walls,
+                size=(self.width, self.height),
+                tile_size=(self.tile_width, self.tile_height),
+            ),
+        )
+
+    def _keep_warm(self) -> None:
+        """Holds on to what was built for the active region, to be quick to go back."""
+        if self._spec.world.warm_regions <= 0:
+            return
+
+        assert self.scene is not None
+        assert self._culler is not None
+        assert self.physics_engine is not None
+
+        self._warm_regions[self.active_region] = _WarmRegion(
+            tilemap=self._tilemap,
+            key_points=self._key_points,
+            scene=self.scene,
+            culler=self._culler,
+            game_sprites=self._game_sprites,
+            physics_engine=self.physics_engine,
         )
 
+        while len(self._warm_regions) > self._spec.world.warm_regions:
+            self._warm_regions.popitem(last=False)
+
+    def _restore_region(self, warm: _WarmRegion) -> None:
+        """Makes a warm region active again.
+
+        Its sprites and scripts were left as they were, so their state doesn't need to
+        be reloaded. Event handlers were cleared when the region was left though, so
+        scripts are given the API again to register theirs.
+        """
+        self._tilemap = warm.tilemap
+        self._key_points = warm.key_points
+        self.scene = warm.scene
+        self._culler = warm.culler
+        self._game_sprites = warm.game_sprites
+        self.physics_engine = warm.physics_engine
+        self.physics_engine.add_sprites([self._player_sprite])
+
+        for sprite in self._game_sprites.values():
+            if sprite.script is not None:
+                sprite.script.set_api(self._core)
+
+    def close(self) -> None:
+        """Stops any work the world is doing in the background."""
+        self.region_cache.close()
+
+    def get_tilemap(self, region_name: str) -> arcade.tilemap.TileMap:
+        """Gets the tile map for a region, loading it if needed."""
+        return self.region_cache.get(region_name)
+
     def _build_scene(self, tilemap: arcade.TileMap) -> None:
         self.scene = arcade.Scene()
 
@@ -229,18 +426,32 @@ class World:
         for name, layer, _ in layers:
             self.scene.add_sprite_list(name, sprite_list=layer)
 
+        # Tile layers and scripted objects can cover the whole map, but the player is
+        # always on screen. Tiles never change once the map is loaded, so they're drawn
+        # in chunks.
+        self._culler = culling.SceneCuller(
+            self.scene,
+            [SCRIPTED_OBJECTS],
+            static_layer_names=tilemap.sprite_lists,
+            chunk_size=(
+                tile_chunks.CHUNK_TILES * tilemap.tile_width,
+                tile_chunks.CHUNK_TILES * tilemap.tile_height,
+            ),
+        )
+
     def _load_scripted_objects(
         self,
         tilemap: arcade.TileMap,
         region_state: RegionState,
         is_first_load: bool,
     ) -> None:
-        if self.scene is None:
+        if self.scene is None or self._culler is None:
             raise SceneNotInitialized()
 
         self._game_sprites = {}
         scripted_objects = self.scene.get_sprite_list(SCRIPTED_OBJECTS)
         scripted_objects.clear()
+        self._culler.clear(SCRIPTED_OBJECTS)
 
         sprites = []
         script: Optional[scripts.Script] = None
@@ -300,6 +511,7 @@ class World:
             sprite.properties["solid"] = obj.properties.get("solid", False)
 
         scripted_objects.extend(sprites)
+        self._culler.add(SCRIPTED_OBJECTS, sprites)
 
     def create_sprite(
         self,
@@ -325,7 +537,7 @@ class World:
         script: Optional[scripts.Script],
         is_first_load: bool,
     ) -> game_sprite.GameSprite:
-        if self.scene is None:
+        if self.scene is None or self._culler is None:
             raise SceneNotInitialized()
 
         if not script:
@@ -343,11 +555,13 @@ class World:
         sprite.center_y = start_location[1]
 
         self.scene.get_sprite_list(SCRIPTED_OBJECTS).append(sprite)
+        self._culler.add(SCRIPTED_OBJECTS, [sprite])
 
         if self.in_update:
             self._sprites_to_add[name] = sprite
         else:
             self._game_sprites[name] = sprite
+            self._sprite_index.add(sprite)
 
         if is_first_load:
             script.on_start(sprite)
@@ -357,27 +571,6 @@ class World:
 
         return sprite
 
-    def _reset_player(self, start_location: str, tilemap: arcade.TileMap):
-        start = [
-            obj
-            for obj in tilemap.object_lists[KEY_POINTS]
-            if obj.name == start_location
-        ]
-        if not start:
-            raise ValueError("No start location defined.")
-
-        shape = start[0].shape
-
-        if not isinstance(shape, list) or len(shape) != 2:
-            raise TypeError("Start location must be a point.")
-
-        x, y = shape
-        if not isinstance(x, numbers.Number) or not isinstance(y, numbers.Number):
-            raise TypeError("Start location must be a point.")
-
-        self._player_sprite.center_x = start[0].shape[0]  # type: ignore
-        self._player_sprite.center_y = start[0].shape[1]  # type: ignore
-
     def _script_from_tiled_object(
         self,
         tiled_obj: arcade.TiledObject,
@@ -417,27 +610,71 @@ class World:
         obj.set_api(self._core)
         return obj
 
+    def advance(self, frame_time: float) -> int:
+        """Advances the model by a frame's worth of real time.
+
+        The model is updated in fixed-size steps, so this may run several updates or
+        none at all. Returns the number of updates that were run.
+        """
+        steps = self._timestep.advance(frame_time)
+
+        for _ in range(steps):
+            self.on_update(self._timestep.step)
+
+        return steps
+
     def on_update(self, delta_time: float) -> None:
-        """Updates the model."""
+        """Updates the model by a single step."""
         if self.physics_engine is None:
             raise SceneNotInitialized()
 
+        self._previous_locations = {
+            sprite: (sprite.center_x, sprite.center_y)
+            for sprite in self.physics_engine.moveable_sprites
+        }
+
         self.in_update = True
 
-        for sprite in self._game_sprites.values():
-            if sprite.script is None:
-                continue
-            sprite.script.on_tick(self.sec_passed, delta_time)
+        with self.profiler.span("scripts"):
+            self._scheduler.tick(
+                self._game_sprites.values(),
+                self.sec_passed,
+                delta_time,
+            )
+
+        with self.profiler.span("physics"):
+            self.physics_engine.update(delta_time, on_collide=self._handle_collision)
 
-        self.physics_engine.update(delta_time, on_collide=self._handle_collision)
+        if self._culler is not None:
+            self._culler.move(self.physics_engine.moveable_sprites)
+        for sprite in self.physics_engine.moved_sprites:
+            self._sprite_index.move(sprite)
 
         self._adjust_sprites()
 
         self.sec_passed += delta_time
         self.in_update = False
 
+    def set_view_rect(self, rect: Optional[spatial.Rect]) -> None:
+        """Sets the area of the map that is on screen.
+
+        Only sprites near it are drawn. None means that everything is drawn.
+        """
+        if self._culler is not None:
+            self._culler.set_view(rect)
+
+    def set_script_focus(self, rect: Optional[spatial.Rect]) -> None:
+        """Sets the area of the map that is being watched.
+
+        Scripts whose owners are outside of it tick less often. None means that
+        everything is being watched.
+        """
+        self._scheduler.focus = rect
+
     def _adjust_sprites(self):
         """Adds or removes sprites from the game."""
+        for sprite in self._sprites_to_add.values():
+            self._sprite_index.add(sprite)
         self._game_sprites.update(self._sprites_to_add)
         self.physics_engine.add_sprites(self._sprites_to_add.values())
         self._sprites_to_add = {}
@@ -533,29 +770,19 @@ class World:
             obj.script.on_hit(obj, self._player_sprite)
 
     def get_key_points(self, name: Optional[str]) -> List[scripts.KeyPoint]:
-        """Queries for key points in the active region."""
-
-        tilemap = self.tilemaps[self.active_region]
-
-        key_points = []
-
-        for point in tilemap.object_lists[KEY_POINTS]:
-            if point.name is None:
-                continue
+        """Queries for key points in the active region.
 
-            if name is not None and name not in point.name:
-                continue
+        Args:
+            name: If set, acts as a substring filter for names.
+        """
+        if name is None:
+            return list(self._key_points)
 
-            shape = shapes.tiled_object_shape(point)
-            key_points.append(
-                scripts.KeyPoint(
-                    name=point.name,
-                    location=(shape.center_x, shape.center_y),
-                    properties=point.properties or {},
-                )
-            )
+        return self._key_points.containing(name)
 
-        return key_points
+    def get_key_point(self, name: str) -> Optional[scripts.KeyPoint]:
+        """Gets a key point in the active region by its exact name."""
+        return self._key_points.get(name)
 
     def get_sprites(self, name: Optional[str]) -> Iterable[game_sprite.GameSprite]:
         """Queries for sprites in the active region.
@@ -569,6 +796,26 @@ class World:
 
         return (sprite for sprite in self._game_sprites.values() if name in sprite.name)
 
+    def sprites_with_prefix(self, prefix: str) -> List[game_sprite.GameSprite]:
+        """Gets the sprites in the active region whose names start with a prefix."""
+        return self._sprite_index.with_prefix(prefix)
+
+    def sprites_within(
+        self,
+        location: Tuple[float, float],
+        radius: float,
+    ) -> List[game_sprite.GameSprite]:
+        """Gets the sprites whose centers are within a radius of a location."""
+        return self._sprite_index.within(location, radius)
+
+    def key_points_with_prefix(self, prefix: str) -> List[scripts.KeyPoint]:
+        """Gets the key points whose names start with a prefix."""
+        return self._key_points.with_prefix(prefix)
+
+    def key_points_within(self, rect: spatial.Rect) -> List[scripts.KeyPoint]:
+        """Gets the key points inside a rectangle of (left, bottom, right, top)."""
+        return self._key_points.within(rect)
+
     def _queue_sprite_removal(
         self,
         _event_name: str,
@@ -587,28 +834,38 @@ class World:
         assert self.physics_engine is not None
 
         sprite = self._game_sprites.pop(name)
+        self._sprite_index.remove(sprite)
         self.scene.get_sprite_list(SCRIPTED_OBJECTS).remove(sprite)
         self.physics_engine.remove_sprite(name)
+        self._scheduler.forget_sprite(name)
+
+        if self._culler is not None:
+            self._culler.remove(SCRIPTED_OBJECTS, sprite)
 
     @property
     def width(self) -> int:
         """Gets the width of the map in number of tiles."""
-        return self.tilemaps[self.active_region].width
+        return self._tilemap.width
 
     @property
     def height(self) -> int:
         """Gets the height of the map in number of tiles."""
-        return self.tilemaps[self.active_region].height
+        return self._tilemap.height
 
     @property
     def tile_width(self) -> int:
         """Gets the tile width of the map in pixels."""
-        return self.tilemaps[self.active_region].tile_width
+        return self._tilemap.tile_width
 
     @property
     def tile_height(self) -> int:
         """Gets the tile height of the map in pixels."""
-        return self.tilemaps[self.active_region].tile_height
+        return self._tilemap.tile_height
+
+    @property
+    def script_stats(self) -> scripts.ScriptStats:
+        """Gets how much time scripts have spent ticking."""
+        return self._scheduler.stats
 
     @property
     def game_time_sec(self) -> float:
@@ -620,10 +877,42 @@ class World:
         """Gets the player sprite."""
         return self._player_sprite
 
+    def interpolated_location(
+        self,
+        sprite: game_sprite.GameSprite,
+    ) -> Tuple[float, float]:
+        """Gets where a sprite should be drawn, between the last two updates."""
+        previous = self._previous_locations.get(sprite)
+        if previous is None:
+            return (sprite.center_x, sprite.center_y)
+
+        alpha = self._timestep.alpha
+        return (
+            previous[0] + (sprite.center_x - previous[0]) * alpha,
+            previous[1] + (sprite.center_y - previous[1]) * alpha,
+        )
+
     def draw(self) -> None:
         """Renders the model."""
-        if self.scene is not None:
+        if self.scene is None:
+            return
+
+        # Temporarily move everything to its interpolated location while drawing.
+        actual_locations = []
+        for sprite in self._previous_locations:
+            location = (sprite.center_x, sprite.center_y)
+            interpolated = self.interpolated_location(sprite)
+            if interpolated != location:
+                actual_locations.append((sprite, location))
+                sprite.position = interpolated
+
+        if self._culler is None:
             self.scene.draw()
+        else:
+            self._culler.draw()
+
+        for sprite, location in actual_locations:
+            sprite.position = location
 
     def _region_state(self, name: str) -> RegionState:
         if name != self.active_region:
@@ -635,6 +924,18 @@ class World:
             },
         )
 
+    def restore(self, state: WorldState) -> None:
+        """Puts the world back the way it was when a state was saved."""
+        self._warm_regions.clear()
+        self.region_states = dict(state.region_states)
+        self.regions_loaded = set(state.region_states)
+        self._player_sprite.data = state.player_state.data
+        self._player_sprite.set_facing(*state.player_state.facing)
+
+        # Nothing from the current region should be kept.
+        self.active_region = ""
+        self.load_region(state.active_region, state.player_state.location)
+
     @property
     def state(self) -> WorldState:
         """Gets the state of the world."""
@@ -650,3 +951,16 @@ class World:
             )
 
         return state
+
+
+def _adjacent_regions(tilemap: arcade.tilemap.TileMap) -> Set[str]:
+    """Finds the regions that scripted objects in a tile map can transition to."""
+    regions = set()
+
+    for obj in tilemap.object_lists.get(SCRIPTED_OBJECTS, []):
+        properties = obj.properties or {}
+        for event in TRANSITION_EVENTS:
+            if properties.get(event) == TRANSITION_SCRIPT:
+                regions.add(properties[f"{event}_region"])
+
+    return regions
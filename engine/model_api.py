@@ -0,0 +1,208 @@
+import logging
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+import arcade
+
+from engine import (
+    event_manager,
+    events,
+    scripts,
+    spec,
+)
+from engine.model import (
+    saves,
+    world,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GameNotInitializedError(Exception):
+    """Raised when functions are called before the game was properly initialized."""
+
+
+class ModelAPI:
+    """Implements the parts of scripts.GameAPI that only need the model.
+
+    This is shared between the windowed core and the headless one. Classes using it must
+    set `world`, `_spec`, `_events` and `_saves`, and implement `start_game`.
+    """
+
+    world: Optional[world.World]
+    _spec: spec.GameSpec
+    _events: event_manager.EventManager
+    # None if the game can't be saved.
+    _saves: Optional[saves.SaveManager]
+
+    def start_game(self) -> None:
+        """Starts the game."""
+        raise NotImplementedError()
+
+    def save_game(self) -> None:
+        """Saves whatever changed in the world since it was last saved."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        if self._saves is not None:
+            self._saves.save(self.world)
+
+    def load_game(self) -> None:
+        """Starts the game from where it was last saved.
+
+        If nothing was saved, or the save can't be read, a new game is started.
+        """
+        self.start_game()
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        if self._saves is None:
+            return
+
+        try:
+            state = self._saves.load()
+        except saves.SaveError as error:
+            # The save's files are kept. Since nothing was loaded, the next save starts
+            # a new game and moves them aside.
+            logger.error("Unable to load the save, starting a new game: %s", error)
+            return
+
+        if state is not None:
+            self.world.restore(state)
+
+    def change_region(self, name: str, start_location: str) -> None:
+        """Changes the region of the game."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        self.world.load_region(name, start_location)
+
+    def create_sprite(
+        self,
+        spec_name: str,
+        name: str,
+        start_location: Tuple[float, float],
+        script: Optional[scripts.Script],
+    ) -> scripts.Entity:
+        """Creates a sprite."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        _spec = self._spec.sprites[spec_name]
+        return self.world.create_sprite(_spec, name, start_location, script)
+
+    def get_key_points(self, name: Optional[str] = None) -> Iterable[scripts.KeyPoint]:
+        """Queries for key points in the current region."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.get_key_points(name)
+
+    def get_key_point(self, name: str) -> Optional[scripts.KeyPoint]:
+        """Gets a key point in the current region by its exact name."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.get_key_point(name)
+
+    def get_sprites(self, name: Optional[str] = None) -> Iterable[arcade.Sprite]:
+        """Gets all sprites with the given name."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.get_sprites(name)
+
+    def sprites_with_prefix(self, prefix: str) -> Iterable[arcade.Sprite]:
+        """Gets all sprites whose names start with a prefix, in name order."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.sprites_with_prefix(prefix)
+
+    def sprites_within(
+        self,
+        location: Tuple[float, float],
+        radius: float,
+    ) -> Iterable[arcade.Sprite]:
+        """Gets all sprites whose centers are within a radius of a location."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.sprites_within(location, radius)
+
+    def key_points_with_prefix(self, prefix: str) -> Iterable[scripts.KeyPoint]:
+        """Gets all key points whose names start with a prefix, in name order."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.key_points_with_prefix(prefix)
+
+    def key_points_within(
+        self,
+        rect: Tuple[float, float, float, float],
+    ) -> Iterable[scripts.KeyPoint]:
+        """Gets all key points inside a rectangle of (left, bottom, right, top)."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.key_points_within(rect)
+
+    def remove_sprite(self, name: str) -> None:
+        """Removes a sprite by name."""
+        self.fire_event(events.SPRITE_REMOVED, events.SpriteRemoved(name))
+
+    def register_handler(self, event_name: str, handler: scripts.EventHandler) -> None:
+        """Registers an event handler for a custom event."""
+        self._events.register_handler(event_name, handler)
+
+    def unregister_handler(
+        self,
+        event_name: str,
+        handler: scripts.EventHandler,
+    ) -> None:
+        """Unregisters an event handler."""
+        self._events.unregister_handler(event_name, handler)
+
+    def fire_event(self, event_name: str, data: Any) -> None:
+        """Fires an event."""
+        self._events.fire_event(event_name, data)
+
+    def clear_events(self) -> None:
+        """Clears all events."""
+        self._events.clear_events()
+
+    @property
+    def player_data(self) -> Dict[str, Any]:
+        """Gets the player's data."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.player_sprite.data
+
+    @player_data.setter
+    def player_data(self, value: Dict[str, Any]):
+        """Sets the player's data."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        self.world.player_sprite.data = value
+
+    @property
+    def current_time_secs(self) -> float:
+        """Gets the current time in seconds."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.game_time_sec
+
+    def get_script_stats(self) -> scripts.ScriptStats:
+        """Gets how much time scripts have spent ticking."""
+        if self.world is None:
+            raise GameNotInitializedError()
+
+        return self.world.script_stats
@@ -0,0 +1,239 @@
+"""A lightweight profiler for finding out where the time in a frame goes.
+
+Code marks out named spans:
+
+    with profiler.span("physics"):
+        ...
+
+When the profiler is disabled, `span` hands back a shared do-nothing context manager,
+so leaving spans in hot code costs next to nothing.
+
+Work that doesn't happen every frame, like saving, is better summed up by a
+`Histogram` of how long each run took.
+"""
+
+import collections
+import contextlib
+import json
+import math
+import threading
+import time
+from typing import (
+    ContextManager,
+    Deque,
+    Dict,
+    List,
+    Tuple,
+)
+
+# How many frames the rolling averages cover.
+DEFAULT_WINDOW_FRAMES = 60
+
+# The most spans kept around for a trace. Older spans are dropped first.
+DEFAULT_MAX_TRACE_EVENTS = 100_000
+
+# The upper bound of a histogram's first bucket, in seconds. Each bucket after it is
+# twice as wide as the last.
+HISTOGRAM_FIRST_BUCKET_SECS = 1e-6
+HISTOGRAM_BUCKETS = 32
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    """Times a single span and reports it back to the profiler."""
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._profiler.record(self._name, self._start, time.perf_counter())
+
+
+class Profiler:
+    """Collects timings of named spans, frame by frame."""
+
+    enabled: bool
+    _window_frames: int
+    # Total time spent in each span during the current frame.
+    _frame_totals: Dict[str, float]
+    # Totals for each span over the last few frames.
+    _history: Dict[str, Deque[float]]
+    _frames: int
+    # Spans as (name, start, end) tuples, for exporting traces.
+    _trace: Deque[Tuple[str, float, float]]
+    _epoch: float
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        window_frames: int = DEFAULT_WINDOW_FRAMES,
+        max_trace_events: int = DEFAULT_MAX_TRACE_EVENTS,
+    ):
+        self.enabled = enabled
+        self._window_frames = window_frames
+        self._frame_totals = {}
+        self._history = {}
+        self._frames = 0
+        self._trace = collections.deque(maxlen=max_trace_events)
+        self._epoch = time.perf_counter()
+
+    def span(self, name: str) -> ContextManager[None]:
+        """Times the code run inside the returned context manager."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Records a span that started and ended at the given perf_counter times."""
+        self._frame_totals[name] = self._frame_totals.get(name, 0.0) + end - start
+        self._trace.append((name, start, end))
+
+    def end_frame(self) -> None:
+        """Marks the end of a frame, adding its totals to the rolling averages."""
+        if not self.enabled:
+            return
+
+        for name in self._frame_totals.keys() | self._history.keys():
+            history = self._history.setdefault(
+                name,
+                collections.deque(maxlen=self._window_frames),
+            )
+            history.append(self._frame_totals.get(name, 0.0))
+
+        self._frame_totals = {}
+        self._frames += 1
+
+    def averages(self) -> Dict[str, float]:
+        """Gets the average time per frame spent in each span, in seconds."""
+        return {
+            name: sum(history) / len(history)
+            for name, history in sorted(self._history.items())
+            if history
+        }
+
+    def overlay_lines(self) -> List[str]:
+        """Formats the rolling averages as lines of text for an on-screen overlay."""
+        return [
+            f"{name:<22} {secs * 1000:7.3f} ms"
+            for name, secs in self.averages().items()
+        ]
+
+    def reset(self) -> None:
+        """Throws away everything that has been recorded."""
+        self._frame_totals = {}
+        self._history = {}
+        self._frames = 0
+        self._trace.clear()
+
+    def chrome_trace(self) -> Dict[str, List[Dict[str, object]]]:
+        """Gets the recorded spans in Chrome's trace event format.
+
+        The result can be loaded in chrome://tracing or https://ui.perfetto.dev.
+        """
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._epoch) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                for name, start, end in self._trace
+            ],
+        }
+
+    def dump_chrome_trace(self, path: str) -> None:
+        """Writes the recorded spans to a file in Chrome's trace event format."""
+        with open(path, "w") as outfile:
+            json.dump(self.chrome_trace(), outfile)
+
+
+class Histogram:
+    """Counts how long something took, in buckets that double in size.
+
+    Times can be recorded from any thread.
+    """
+
+    _counts: List[int]
+    _total_secs: float
+    _max_secs: float
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._counts = [0] * HISTOGRAM_BUCKETS
+        self._total_secs = 0.0
+        self._max_secs = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, secs: float) -> None:
+        """Records one time, in seconds."""
+        bucket = 0
+        if secs > HISTOGRAM_FIRST_BUCKET_SECS:
+            bucket = min(
+                math.ceil(math.log2(secs / HISTOGRAM_FIRST_BUCKET_SECS)),
+                HISTOGRAM_BUCKETS - 1,
+            )
+
+        with self._lock:
+            self._counts[bucket] += 1
+            self._total_secs += secs
+            self._max_secs = max(self._max_secs, secs)
+
+    @property
+    def count(self) -> int:
+        """Gets how many times were recorded."""
+        return sum(self._counts)
+
+    @property
+    def mean_secs(self) -> float:
+        """Gets the average time, or 0 if none were recorded."""
+        count = self.count
+        return self._total_secs / count if count else 0.0
+
+    @property
+    def max_secs(self) -> float:
+        """Gets the longest time recorded."""
+        return self._max_secs
+
+    def percentile(self, pct: float) -> float:
+        """Gets the upper bound of the bucket holding a percentile, in seconds."""
+        with self._lock:
+            counts = list(self._counts)
+
+        rank = max(1, math.ceil(pct / 100 * sum(counts)))
+        seen = 0
+        for bucket, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_upper_secs(bucket)
+        return 0.0
+
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Gets (upper bound in seconds, count) for each bucket with anything in it."""
+        with self._lock:
+            return [
+                (_bucket_upper_secs(bucket), count)
+                for bucket, count in enumerate(self._counts)
+                if count
+            ]
+
+    def reset(self) -> None:
+        """Throws away everything that has been recorded."""
+        with self._lock:
+            self._counts = [0] * HISTOGRAM_BUCKETS
+            self._total_secs = 0.0
+            self._max_secs = 0.0
+
+
+def _bucket_upper_secs(bucket: int) -> float:
+    return HISTOGRAM_FIRST_BUCKET_SECS * 2**bucket
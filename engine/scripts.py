@@ -5,6 +5,7 @@ from typing import (
     Callable,
     Dict,
     Iterable,
+    Mapping,
     Optional,
     Protocol,
     Type,
@@ -28,13 +29,49 @@ class GUI(Protocol):
         """Sets the UI manager for this GUI."""
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class KeyPoint:
-    """Represents a point of interest in the map."""
+    """Represents a point of interest in the map.
+
+    Key points are shared between everything that looks them up, so they can't be
+    changed.
+    """
 
     name: str
     location: Tuple[float, float]
-    properties: Dict[str, Any]
+    properties: Mapping[str, Any]
+
+
+@dataclasses.dataclass
+class ScriptCost:
+    """Tracks how much time a script, or a group of scripts, spends ticking."""
+
+    ticks: int = 0
+    total_secs: float = 0.0
+    max_secs: float = 0.0
+    # How many times the script's tick was put off to keep within the budget.
+    deferrals: int = 0
+
+    @property
+    def mean_secs(self) -> float:
+        """Gets the average time per tick."""
+        return self.total_secs / self.ticks if self.ticks else 0.0
+
+
+@dataclasses.dataclass
+class ScriptStats:
+    """A report on how much time scripts are spending in their ticks."""
+
+    by_class: Dict[str, ScriptCost]
+    by_sprite: Dict[str, ScriptCost]
+    # The per-tick budget for scripts, or None if there isn't one.
+    budget_secs: Optional[float]
+    # How long all scripts took on the last tick.
+    last_tick_secs: float
+    # How many scripts were put off on the last tick because of the budget.
+    deferred_last_tick: int
+    # How many scripts were skipped on the last tick because they were off-screen.
+    far_skipped_last_tick: int
 
 
 class Entity(Protocol):
@@ -62,6 +99,12 @@ class GameAPI(Protocol):
     def start_game(self) -> None:
         """Starts the game."""
 
+    def save_game(self) -> None:
+        """Saves the game."""
+
+    def load_game(self) -> None:
+        """Starts the game from where it was last saved."""
+
     def change_region(self, name: str, start_location: str) -> None:
         """Switches the region of the game."""
 
@@ -80,9 +123,31 @@ class GameAPI(Protocol):
     def get_key_points(self, name: Optional[str] = None) -> Iterable[KeyPoint]:
         """Queries for key points within the active region."""
 
+    def get_key_point(self, name: str) -> Optional[KeyPoint]:
+        """Gets a key point within the active region by its exact name."""
+
     def get_sprites(self, name: Optional[str] = None) -> Iterable[arcade.Sprite]:
         """Gets all sprites with the given name."""
 
+    def sprites_with_prefix(self, prefix: str) -> Iterable[arcade.Sprite]:
+        """Gets all sprites whose names start with a prefix, in name order."""
+
+    def sprites_within(
+        self,
+        location: Tuple[float, float],
+        radius: float,
+    ) -> Iterable[arcade.Sprite]:
+        """Gets all sprites whose centers are within a radius of a location."""
+
+    def key_points_with_prefix(self, prefix: str) -> Iterable[KeyPoint]:
+        """Gets all key points whose names start with a prefix, in name order."""
+
+    def key_points_within(
+        self,
+        rect: Tuple[float, float, float, float],
+    ) -> Iterable[KeyPoint]:
+        """Gets all key points inside a rectangle of (left, bottom, right, top)."""
+
     def remove_sprite(self, name: str) -> None:
         """Removes a sprite by name."""
 
@@ -110,6 +175,9 @@ class GameAPI(Protocol):
     def current_time_secs(self) -> float:
         """Gets the current time in seconds."""
 
+    def get_script_stats(self) -> ScriptStats:
+        """Gets how much time scripts have spent ticking."""
+
 
 GameCallable = Callable[[GameAPI], None]
 
@@ -169,11 +237,25 @@ class ScriptOwner(Protocol):
         """Sets the custom animation of the script owner."""
 
 
+# Priorities for script ticks. When scripts go over their time budget for a tick,
+# scripts with a priority below normal may have their tick put off until a later one.
+TICK_PRIORITY_LOW = -1
+TICK_PRIORITY_NORMAL = 0
+TICK_PRIORITY_HIGH = 1
+
+
 class Script:
     """Base class for all scripts."""
 
     _state: Dict[str, Any]
 
+    # How important it is that this script's on_tick runs on time. See TICK_PRIORITY_*.
+    tick_priority: int = TICK_PRIORITY_NORMAL
+
+    # Scripts whose owners are far from the camera tick less often. Set this for scripts
+    # that need to tick every time no matter where they are.
+    always_tick: bool = False
+
     def __init__(self):
         self._state = {}
 
@@ -190,7 +272,12 @@ class Script:
         """Triggered when the owner is loaded for the first time."""
 
     def on_tick(self, game_time: float, delta_time: float) -> None:
-        """Triggered on every clock tick."""
+        """Triggered on every clock tick.
+
+        `delta_time` is the time since this script last ticked. Low priority scripts and
+        scripts whose owners are off-screen may have ticks put off, in which case it
+        covers all the ticks that were skipped.
+        """
 
     def on_collide(self, owner: ScriptOwner, other: Entity) -> None:
         """Triggered when the owner collides with another entity."""
@@ -58,12 +58,40 @@ class WorldSpec:
     hit_sound: Optional[str]
     activate_sound: Optional[str]
 
+    # Use continuous collision detection against walls, so that fast sprites can't pass
+    # through them. See physics.Engine for details.
+    swept_collisions: bool
+
+    # How long scripts may spend ticking each tick before low priority ones are put
+    # off, or None for no limit.
+    script_budget_secs: Optional[float]
+
+    # Scripts whose owners are off-screen only tick once every this many ticks. Set to
+    # 1 to tick everything every time.
+    far_script_tick_interval: int
+
+    # Regions are loaded when they're first needed. The ones next to the current region
+    # are prefetched in the background if this is set.
+    prefetch_regions: bool
+    # Roughly how many bytes loaded regions may take up before old ones are dropped.
+    region_cache_bytes: int
+    # How many recently left regions to keep fully built, so that going back to them
+    # doesn't need to rebuild anything. Their tile maps are kept on top of
+    # region_cache_bytes.
+    warm_regions: int
+
     def __init__(
         self,
         regions: Dict[str, Any],
         initial_region: str,
         hit_sound: Optional[str] = None,
         activate_sound: Optional[str] = None,
+        swept_collisions: bool = False,
+        script_budget_secs: Optional[float] = None,
+        far_script_tick_interval: int = 4,
+        prefetch_regions: bool = True,
+        region_cache_bytes: int = 32 * 1024 * 1024,
+        warm_regions: int = 2,
     ):
         self.regions = {
             region_name: r if isinstance(r, RegionSpec) else RegionSpec(**r)
@@ -72,6 +100,12 @@ class WorldSpec:
         self.initial_region = initial_region
         self.hit_sound = hit_sound
         self.activate_sound = activate_sound
+        self.swept_collisions = swept_collisions
+        self.script_budget_secs = script_budget_secs
+        self.far_script_tick_interval = far_script_tick_interval
+        self.prefetch_regions = prefetch_regions
+        self.region_cache_bytes = region_cache_bytes
+        self.warm_regions = warm_regions
 
 
 @dataclasses.dataclass
@@ -94,6 +128,12 @@ class GameSpec:
     sprites: Dict[str, GameSpriteSpec]
     guis: Dict[str, widgets.GUISpec]
     sounds: Dict[str, SoundSpec]
+    # Path to the manifest of a texture atlas holding the game's images, if it has one.
+    atlas: Optional[str]
+    # Directory the game is saved to. If not set, the game can't be saved.
+    save_dir: Optional[str]
+    # How often to save while the game runs, in seconds of game time.
+    autosave_secs: Optional[float]
 
     def __init__(
         self,
@@ -102,9 +142,15 @@ class GameSpec:
         sprites: Dict[str, Any],
         guis: Dict[str, Any],
         sounds: Dict[str, Any],
+        atlas: Optional[str] = None,
+        save_dir: Optional[str] = None,
+        autosave_secs: Optional[float] = None,
     ):
         self.world = WorldSpec(**world)
         self.player_spec = GameSpriteSpec(**player_spec)
         self.sprites = {name: GameSpriteSpec(**spec) for name, spec in sprites.items()}
         self.guis = {name: widgets.GUISpec(**spec) for name, spec in guis.items()}
         self.sounds = {name: SoundSpec(**spec) for name, spec in sounds.items()}
+        self.atlas = atlas
+        self.save_dir = save_dir
+        self.autosave_secs = autosave_secs
@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from engine import atlas
+
+
+class PackTest(unittest.TestCase):
+    def test_no_overlaps(self):
+        sizes = {f"image{i}": (10 + i, 20 - i) for i in range(10)}
+
+        placements = atlas.pack(sizes, page_size=40)
+
+        self.assertEqual(set(placements), set(sizes))
+        for name, first in placements.items():
+            self.assertLessEqual(first.x + first.width, 40)
+            self.assertLessEqual(first.y + first.height, 40)
+
+            for other_name, second in placements.items():
+                if name == other_name or first.page != second.page:
+                    continue
+                overlaps = (
+                    first.x < second.x + second.width
+                    and second.x < first.x + first.width
+                    and first.y < second.y + second.height
+                    and second.y < first.y + first.height
+                )
+                self.assertFalse(overlaps, f"{name} overlaps {other_name}")
+
+    def test_new_page_when_full(self):
+        placements = atlas.pack({"a": (30, 30), "b": (30, 30)}, page_size=40)
+
+        self.assertEqual({p.page for p in placements.values()}, {0, 1})
+
+    def test_too_big(self):
+        with self.assertRaises(atlas.AtlasError):
+            atlas.pack({"a": (50, 10)}, page_size=40)
+
+
+class AtlasTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.addCleanup(atlas.uninstall)
+
+        self.sheet = self._image("sheet.png", (20, 10), [(255, 0, 0), (0, 255, 0)])
+        self.button = self._image("button.png", (8, 8), [(0, 0, 255)])
+        self.manifest = atlas.build(
+            [self.sheet, self.button],
+            os.path.join(self.directory, "atlas"),
+        )
+
+    def _image(self, name, size, colours):
+        """Makes an image with a vertical stripe of each colour."""
+        image = Image.new("RGBA", size)
+        stripe = size[0] // len(colours)
+        for i, colour in enumerate(colours):
+            image.paste(colour + (255,), (i * stripe, 0, (i + 1) * stripe, size[1]))
+
+        path = os.path.join(self.directory, name)
+        image.save(path)
+        return path
+
+    def test_round_trip(self):
+        loaded = atlas.Atlas.load(self.manifest)
+
+        self.assertEqual(len(loaded), 2)
+        self.assertIn(self.sheet, loaded)
+
+        with Image.open(self.button) as expected:
+            texture = loaded.load_texture(self.button)
+            self.assertEqual(texture.image.tobytes(), expected.tobytes())
+
+    def test_spritesheet(self):
+        loaded = atlas.Atlas.load(self.manifest)
+
+        frames = loaded.load_spritesheet(
+            self.sheet, sprite_width=10, sprite_height=10, columns=2, count=2
+        )
+
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].image.getpixel((5, 5)), (255, 0, 0, 255))
+        self.assertEqual(frames[1].image.getpixel((5, 5)), (0, 255, 0, 255))
+
+    def test_textures_are_shared(self):
+        loaded = atlas.Atlas.load(self.manifest)
+
+        self.assertIs(
+            loaded.load_texture(self.button), loaded.load_texture(self.button)
+        )
+
+    def test_changed_images_are_left_out(self):
+        stat = os.stat(self.button)
+        os.utime(self.button, (stat.st_atime, stat.st_mtime + 10))
+
+        loaded = atlas.Atlas.load(self.manifest)
+
+        self.assertNotIn(self.button, loaded)
+        self.assertIn(self.sheet, loaded)
+
+    def test_bad_manifest(self):
+        with open(self.manifest, "w") as outfile:
+            outfile.write("not json")
+
+        with self.assertRaises(atlas.AtlasError):
+            atlas.Atlas.load(self.manifest)
+
+    @mock.patch("arcade.load_texture")
+    def test_installed(self, load_texture):
+        atlas.install(self.manifest)
+
+        atlas.load_texture(self.button)
+        load_texture.assert_not_called()
+
+        atlas.load_texture("somewhere/else.png")
+        load_texture.assert_called_once_with("somewhere/else.png")
+
+    @mock.patch("arcade.load_texture")
+    def test_missing_atlas(self, load_texture):
+        self.assertIsNone(atlas.install(os.path.join(self.directory, "nope.json")))
+
+        atlas.load_texture(self.button)
+        load_texture.assert_called_once_with(self.button)
@@ -0,0 +1,33 @@
+import unittest
+
+from engine import clock
+
+
+class FixedTimestepTest(unittest.TestCase):
+    def test_whole_steps(self):
+        timestep = clock.FixedTimestep(step=0.25, max_steps=10)
+
+        self.assertEqual(timestep.advance(0.5), 2)
+        self.assertEqual(timestep.alpha, 0.0)
+
+    def test_carries_remainder(self):
+        timestep = clock.FixedTimestep(step=0.25, max_steps=10)
+
+        self.assertEqual(timestep.advance(0.125), 0)
+        self.assertEqual(timestep.alpha, 0.5)
+        self.assertEqual(timestep.advance(0.125), 1)
+        self.assertEqual(timestep.alpha, 0.0)
+
+    def test_caps_catch_up(self):
+        timestep = clock.FixedTimestep(step=0.25, max_steps=2)
+
+        self.assertEqual(timestep.advance(1.125), 2)
+        self.assertEqual(timestep.alpha, 0.5)
+        # The backlog was dropped, so the next frame doesn't try to catch up.
+        self.assertEqual(timestep.advance(0.125), 1)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            clock.FixedTimestep(step=0)
+        with self.assertRaises(ValueError):
+            clock.FixedTimestep(max_steps=0)
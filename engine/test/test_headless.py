@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from engine import (
+    headless,
+    model_api,
+)
+from engine.model import saves
+from engine.test import factories
+
+
+class HeadlessCoreTest(unittest.TestCase):
+    def test_not_initialized(self):
+        api = headless.HeadlessCore(factories.fake_game_spec(), {})
+
+        with self.assertRaises(model_api.GameNotInitializedError):
+            api.get_sprites()
+
+    @mock.patch("engine.model.game_sprite.warm_texture_cache")
+    @mock.patch("engine.model.world.World")
+    def test_run(self, mock_world, mock_warm):
+        game_world = mock_world.return_value
+        game_world.game_time_sec = 0.0
+
+        def on_update(delta_time):
+            game_world.game_time_sec += delta_time
+
+        game_world.on_update.side_effect = on_update
+
+        api = headless.HeadlessCore(factories.fake_game_spec(), {})
+        stats = api.run(10, delta_time=0.5)
+
+        self.assertEqual(game_world.on_update.call_count, 10)
+        self.assertEqual(stats.ticks, 10)
+        self.assertEqual(stats.game_time_secs, 5.0)
+        self.assertGreater(stats.ticks_per_sec, 0)
+        mock_warm.assert_called_once()
+
+    def test_no_sound(self):
+        api = headless.HeadlessCore(factories.fake_game_spec(), {})
+        api.play_sound("anything")
+
+    @mock.patch("engine.model.game_sprite.warm_texture_cache")
+    @mock.patch("engine.model.world.World")
+    def test_load_unreadable_save(self, mock_world, _):
+        with tempfile.TemporaryDirectory() as directory:
+            save_dir = os.path.join(directory, "save")
+            os.makedirs(save_dir)
+            path = os.path.join(save_dir, saves.SEGMENT_NAME.format(segment=1))
+            with open(path, "wb") as outfile:
+                outfile.write(b"garbage")
+
+            api = headless.HeadlessCore(factories.fake_game_spec(save_dir=save_dir), {})
+            with self.assertLogs(model_api.logger, "ERROR"):
+                api.load_game()
+
+            mock_world.return_value.restore.assert_not_called()
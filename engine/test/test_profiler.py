@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+
+from engine import profiler
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        prof = profiler.Profiler()
+
+        with prof.span("work"):
+            pass
+        prof.end_frame()
+
+        self.assertEqual(prof.averages(), {})
+        self.assertEqual(prof.chrome_trace()["traceEvents"], [])
+
+    def test_rolling_averages(self):
+        prof = profiler.Profiler(enabled=True, window_frames=2)
+
+        prof.record("work", 0.0, 1.0)
+        prof.record("work", 1.0, 2.0)
+        prof.end_frame()
+        self.assertEqual(prof.averages(), {"work": 2.0})
+
+        prof.record("work", 2.0, 6.0)
+        prof.end_frame()
+        self.assertEqual(prof.averages(), {"work": 3.0})
+
+        # Frames where a span doesn't happen count as zero, and old frames fall off.
+        prof.end_frame()
+        self.assertEqual(prof.averages(), {"work": 2.0})
+
+    def test_span(self):
+        prof = profiler.Profiler(enabled=True)
+
+        with prof.span("work"):
+            pass
+        prof.end_frame()
+
+        self.assertIn("work", prof.averages())
+        self.assertEqual(len(prof.overlay_lines()), 1)
+
+    def test_chrome_trace(self):
+        prof = profiler.Profiler(enabled=True)
+
+        with prof.span("work"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "trace.json")
+            prof.dump_chrome_trace(path)
+
+            with open(path) as infile:
+                trace = json.load(infile)
+
+        (event,) = trace["traceEvents"]
+        self.assertEqual(event["name"], "work")
+        self.assertEqual(event["ph"], "X")
+        self.assertGreaterEqual(event["dur"], 0)
+
+
+class HistogramTest(unittest.TestCase):
+    def test_empty(self):
+        histogram = profiler.Histogram()
+
+        self.assertEqual(histogram.count, 0)
+        self.assertEqual(histogram.mean_secs, 0.0)
+        self.assertEqual(histogram.percentile(50), 0.0)
+        self.assertEqual(histogram.buckets(), [])
+
+    def test_record(self):
+        histogram = profiler.Histogram()
+
+        histogram.record(0.5e-6)
+        histogram.record(3e-6)
+        histogram.record(3.5e-6)
+        histogram.record(1.0)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.max_secs, 1.0)
+        self.assertAlmostEqual(histogram.mean_secs, (1.0 + 7e-6) / 4)
+        self.assertEqual(
+            histogram.buckets(), [(1e-6, 1), (4e-6, 2), (2**20 * 1e-6, 1)]
+        )
+        self.assertEqual(histogram.percentile(50), 4e-6)
+        self.assertEqual(histogram.percentile(99), 2**20 * 1e-6)
+
+    def test_long_times_go_in_the_last_bucket(self):
+        histogram = profiler.Histogram()
+
+        histogram.record(1e9)
+
+        self.assertEqual(
+            histogram.buckets(),
+            [(2 ** (profiler.HISTOGRAM_BUCKETS - 1) * 1e-6, 1)],
+        )
+
+    def test_reset(self):
+        histogram = profiler.Histogram()
+        histogram.record(1.0)
+
+        histogram.reset()
+
+        self.assertEqual(histogram.count, 0)
@@ -0,0 +1,41 @@
+"""Bakes every region in the game into the binary format that loads quickly.
+
+Run with:
+
+    python -m game.bake
+"""
+
+import argparse
+
+from engine.model import baked_region
+from game import main as game_main
+
+
+def bake_all(force: bool) -> None:
+    """Bakes every region that has changed since it was last baked."""
+    game_spec = game_main.load_spec()
+
+    for region_name, region in game_spec.world.regions.items():
+        if not force and baked_region.is_fresh(region):
+            print(f"{region_name}: up to date")
+            continue
+
+        path = baked_region.bake(region)
+        print(f"{region_name}: baked to {path}")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Bake regions even if they haven't changed.",
+    )
+    args = parser.parse_args()
+
+    bake_all(args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,14 @@ class Rat(scripts.SavesOwner, health.DamagesPlayer, scripts.Script):
                     events.CreatureKilled("rat"),
                 )
 
+    def _waypoint(self, name: str) -> scripts.KeyPoint:
+        assert self.api is not None
+
+        waypoint = self.api.get_key_point(name)
+        if waypoint is None:
+            raise ValueError(f"No key point named '{name}' for rat waypoint.")
+        return waypoint
+
     def on_tick(self, game_time: float, delta_time: float) -> None:
         """Handles game ticks."""
         if self.owner is None or self.api is None:
@@ -75,10 +83,7 @@ class Rat(scripts.SavesOwner, health.DamagesPlayer, scripts.Script):
         if self._navigator is None:
             self._navigator = waypoints.Navigator(
                 owner=self.owner,
-                waypoints=[
-                    next(iter(self.api.get_key_points(name)))
-                    for name in self._waypoint_names
-                ],
+                waypoints=[self._waypoint(name) for name in self._waypoint_names],
             )
 
         self._navigator.on_tick(game_time)
@@ -0,0 +1,65 @@
+"""Runs the game without a window and reports how fast the simulation goes.
+
+Run with:
+
+    python -m game.headless --ticks 6000 --region Region2
+"""
+
+import argparse
+from typing import (
+    Optional,
+)
+
+from engine import headless
+from engine.model import world
+from game import main as game_main
+from game.quests import all as quests
+
+DEFAULT_TICKS = 3600
+
+
+def first_key_point(game_world: world.World, region: str) -> str:
+    """Gets the name of the first key point in a region, to use as a start location."""
+    for point in game_world.get_tilemap(region).object_lists[world.KEY_POINTS]:
+        if point.name:
+            return point.name
+
+    raise ValueError(f"Region '{region}' has no key points.")
+
+
+def run(ticks: int, region: Optional[str], start_location: Optional[str]) -> None:
+    """Runs the simulation and prints the results."""
+    quests.register()
+
+    api = headless.HeadlessCore(
+        game_main.load_spec(),
+        game_main.initial_player_state(),
+    )
+    api.start_game()
+    assert api.world is not None
+
+    if region is not None:
+        api.change_region(region, start_location or first_key_point(api.world, region))
+
+    stats = api.run(ticks)
+
+    print(f"region:        {api.world.active_region}")
+    print(f"ticks:         {stats.ticks}")
+    print(f"game time:     {stats.game_time_secs:.1f}s")
+    print(f"real time:     {stats.elapsed_secs:.3f}s")
+    print(f"ticks per sec: {stats.ticks_per_sec:.1f}")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=DEFAULT_TICKS)
+    parser.add_argument("--region", default=None)
+    parser.add_argument("--start", default=None, help="Key point to start at.")
+    args = parser.parse_args()
+
+    run(args.ticks, args.region, args.start)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 import json
+from typing import (
+    Any,
+    Dict,
+)
 
 from engine import (
     core,
@@ -12,16 +16,34 @@ from game.gui import (
 from game.quests import all as quests
 from game.scripts import health
 
+GAME_SPEC_PATH = "assets/game-spec.json"
+
 STARTING_HP = 10
 STARTING_GOLD = 50
 STARTING_DAMAGE = 4
 
 
+def load_spec() -> spec.GameSpec:
+    """Loads the game spec."""
+    with open(GAME_SPEC_PATH) as infile:
+        data = json.loads(infile.read())
+        return spec.GameSpec(**data)
+
+
+def initial_player_state() -> Dict[str, Any]:
+    """Creates the state the player starts the game with."""
+    return {
+        "hp": health.Health(STARTING_HP),
+        "gold": STARTING_GOLD,
+        "base_damage": STARTING_DAMAGE,
+        "quests": {},
+        "last_damage_time": 0.0,
+    }
+
+
 def run() -> None:
     """Runs the game."""
-    with open("assets/game-spec.json") as infile:
-        data = json.loads(infile.read())
-        game_spec = spec.GameSpec(**data)
+    game_spec = load_spec()
 
     def create_start_screen(api: scripts.GameAPI) -> scripts.GUI:
         return spec_gui.SpecGUI(api, game_spec.guis["start-screen"])
@@ -39,11 +61,5 @@ def run() -> None:
         ingame_gui=create_hud,
         menu_gui=create_menu_gui,
         game_spec=game_spec,
-        initial_player_state={
-            "hp": health.Health(STARTING_HP),
-            "gold": STARTING_GOLD,
-            "base_damage": STARTING_DAMAGE,
-            "quests": {},
-            "last_damage_time": 0.0,
-        },
+        initial_player_state=initial_player_state(),
     ).run()
@@ -0,0 +1,63 @@
+"""Packs the game's sprite sheets and GUI images into a texture atlas.
+
+Run with:
+
+    python -m game.pack_atlas
+
+The atlas is written to where the game spec says it lives. Tilesets aren't packed,
+since arcade loads them itself when it reads a region's map.
+"""
+
+import argparse
+import os
+from typing import (
+    List,
+)
+
+from engine import (
+    atlas,
+    spec,
+)
+from game import main as game_main
+
+
+def atlas_sources(game_spec: spec.GameSpec) -> List[str]:
+    """Finds every image that belongs in the atlas."""
+    sources = []
+
+    for sprite_spec in [game_spec.player_spec, *game_spec.sprites.values()]:
+        for name in sprite_spec.animations:
+            sources.append(os.path.join(sprite_spec.root_directory, f"{name}.png"))
+
+    for gui_spec in game_spec.guis.values():
+        sources.extend(asset.path for asset in gui_spec.assets)
+
+    return sources
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=atlas.DEFAULT_PAGE_SIZE,
+        help="Width and height of each atlas page, in pixels.",
+    )
+    args = parser.parse_args()
+
+    game_spec = game_main.load_spec()
+    if game_spec.atlas is None:
+        raise SystemExit("The game spec doesn't say where the atlas goes.")
+
+    sources = atlas_sources(game_spec)
+    path = atlas.build(
+        sources,
+        os.path.dirname(game_spec.atlas),
+        page_size=args.page_size,
+    )
+    print(f"Packed {len(set(sources))} images into {path}")
+
+
+if __name__ == "__main__":
+    main()
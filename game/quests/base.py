@@ -6,6 +6,10 @@ from typing import (
 )
 
 from engine import scripts
+from engine.model import save_codec
+
+# The save_codec type id of QuestState.
+QUEST_STATE_TYPE_ID = 101
 
 
 @dataclasses.dataclass
@@ -33,3 +37,10 @@ class QuestState:
     current_step: str
     data: Dict[str, Any]
     timestamp: float
+
+
+save_codec.register(
+    QuestState,
+    QUEST_STATE_TYPE_ID,
+    {"current_step": 1, "data": 2, "timestamp": 3},
+)
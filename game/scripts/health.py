@@ -5,7 +5,13 @@ from typing import (
 )
 
 from engine import scripts
-from engine.model import player_sprite
+from engine.model import (
+    player_sprite,
+    save_codec,
+)
+
+# The save_codec type id of Health.
+HEALTH_TYPE_ID = 100
 
 
 class Health:
@@ -37,6 +43,14 @@ class Health:
         return self.hp <= 0
 
 
+def _restore_health(hp: int, max_hp: int) -> Health:
+    health = Health(max_hp)
+    health.hp = hp
+    return health
+
+
+save_codec.register(Health, HEALTH_TYPE_ID, {"hp": 1, "max_hp": 2}, _restore_health)
+
 INVINCIBLE_TIME = 1.5
 
 